@@ -8,13 +8,24 @@ from subprocess import call
 from config import DB_CONFIG
 from sqlalchemy import create_engine, text
 from subprocess import call
-from preprocessing import run_preprocessing
+from preprocessing import run_preprocessing, recompute_stages
 from pembagian import split_data_logic
 from collections import Counter
-from ekstraksi import main_feature_extraction_pipeline
-from model_naive_bayes import train_and_evaluate_nb
+from ekstraksi import main_feature_extraction_pipeline, main_hashing_extraction_pipeline, resolve_balancing, DEFAULT_MAX_FEATURES, DEFAULT_NGRAM_RANGE, HASHING_N_FEATURES, HASHING_CHUNK_SIZE, HASHING_BALANCING_MODES
+from feature_cache import clear_feature_cache
+from vectorizer_artifact import VECTORIZER_ARTIFACT_PATH
+from incremental_tfidf import clear_incremental_state
+from feature_store import load_feature_run, list_feature_runs, prune_feature_runs
+from term_index import TERM_INDEX_PATH, load_term_index, query_terms, query_term, query_documents, query_classes
+from model_naive_bayes import train_and_evaluate_nb, train_and_evaluate_nb_streaming
+from model_registry import load_active_model, list_model_versions, promote_model, rollback_model, get_model_metadata
+from prediction_service import predict, ModelNotReadyError, MAX_TEXTS_PER_REQUEST
+from hyperparameter_search import run_hyperparameter_search
+from cross_validation import run_cross_validation, DEFAULT_N_SPLITS
+from classification_results import clear_results, query_results, get_result_run, get_latest_result_run_id, RESULT_PAGE_SIZE
 from werkzeug.utils import secure_filename
 import io
+import time
 
 
 
@@ -40,10 +51,30 @@ UPLOAD_FOLDER = 'uploads'
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 UPLOAD_FOLDER2 = 'uploads'
 app.config['UPLOAD_FOLDER2'] = UPLOAD_FOLDER2
+# jumlah worker proses untuk preprocessing (1 = serial, 0 = semua core CPU)
+app.config['PREPROCESSING_WORKERS'] = 1
+# preprocessing inkremental (hanya baris baru/berubah) sebagai default
+app.config['PREPROCESSING_INCREMENTAL'] = False
+# ukuran chunk mode streaming preprocessing (0 = baca seluruh tabel sekaligus)
+app.config['PREPROCESSING_CHUNK_SIZE'] = 0
+# mode ringkas: tabel preprocessing hanya menyimpan teks sumber dan hasil stemming
+app.config['PREPROCESSING_COMPACT'] = False
+# threshold kemiripan near-duplicate (None = nonaktif) dan aksinya ('drop', 'merge', 'flag')
+app.config['PREPROCESSING_NEAR_DUP_THRESHOLD'] = None
+app.config['PREPROCESSING_NEAR_DUP_ACTION'] = 'drop'
 
 from auth import auth_bp
 app.register_blueprint(auth_bp)
 
+# Memanaskan cache model aktif saat aplikasi dimulai. Request /predict dan /klasifikasi tetap memanggil
+# load_active_model(), yang memakai cache ini dan memuat ulang hanya jika registry.json berubah.
+try:
+    warmed_model = load_active_model()
+    if warmed_model:
+        app.logger.info(f"Cache model aktif dipanaskan dengan versi {warmed_model['version']}.")
+except Exception as e:
+    app.logger.error(f"Gagal memuat model aktif dari registry: {e}", exc_info=True)
+
 from functools import wraps
 def login_required(f):
     @wraps(f)
@@ -418,9 +449,34 @@ def preprocessing_page():
 def jalankan_preprocessing_route():
     """API Endpoint untuk MENJALANKAN skrip preprocessing."""
     try:
-        hasil = run_preprocessing()
+        # Jumlah worker bisa dikirim lewat body JSON, jika tidak memakai konfigurasi aplikasi
+        payload = request.get_json(silent=True) or {}
+        n_workers = int(payload.get('n_workers', app.config['PREPROCESSING_WORKERS']))
+        # Mode inkremental hanya memproses tweet yang baru atau berubah sejak run sebelumnya
+        incremental = bool(payload.get('incremental', app.config['PREPROCESSING_INCREMENTAL']))
+        # Ukuran chunk > 0 mengaktifkan mode streaming (baca-proses-tulis per chunk)
+        chunk_size = int(payload.get('chunk_size', app.config['PREPROCESSING_CHUNK_SIZE']) or 0)
+        # Mode ringkas tidak menyimpan tahap antara; tahap tersebut dihitung ulang per halaman tampilan
+        compact = bool(payload.get('compact', app.config['PREPROCESSING_COMPACT']))
+        # Threshold kemiripan (0-1) mengaktifkan deteksi near-duplicate; aksi 'drop', 'merge', atau 'flag'
+        near_dup_threshold = payload.get('near_dup_threshold', app.config['PREPROCESSING_NEAR_DUP_THRESHOLD'])
+        near_dup_action = payload.get('near_dup_action', app.config['PREPROCESSING_NEAR_DUP_ACTION'])
+        if near_dup_action not in ('drop', 'merge', 'flag'):
+            return jsonify({'status': 'error', 'message': "near_dup_action harus 'drop', 'merge', atau 'flag'."}), 400
+        if incremental and chunk_size:
+            return jsonify({'status': 'error', 'message': 'Mode inkremental tidak bisa digabung dengan chunk_size (mode streaming).'}), 400
+        hasil = run_preprocessing(
+            n_workers=n_workers, incremental=incremental, chunk_size=chunk_size, compact=compact,
+            near_dup_threshold=float(near_dup_threshold) if near_dup_threshold else None,
+            near_dup_action=near_dup_action
+        )
         if hasil.get('success'):
-            return jsonify({'status': 'success', 'message': 'Proses preprocessing berhasil dijalankan.'})
+            # Ringkasan run (jumlah baris, waktu, throughput, memori, dan statistik per tahap) ikut dikirim
+            return jsonify({
+                'status': 'success',
+                'message': 'Proses preprocessing berhasil dijalankan.',
+                'result': {key: value for key, value in hasil.items() if key != 'success'}
+            })
         else:
             error_message = hasil.get('error', 'Kesalahan tidak diketahui di skrip preprocessing.')
             return jsonify({'status': 'error', 'message': error_message}), 500
@@ -431,17 +487,49 @@ def jalankan_preprocessing_route():
 @app.route('/get-processed-data', methods=['GET'])
 @login_required
 def get_processed_data_route():
-    """API Endpoint untuk MENGAMBIL data dari tabel 'preprocessing'."""
+    """
+    API Endpoint untuk MENGAMBIL data dari tabel 'preprocessing'.
+    Pada mode ringkas hanya teks sumber dan hasil stemming yang dikirim (compact = true).
+    """
     try:
         cur = mysql.connection.cursor()
-        cur.execute("SELECT full_text, case_folding, cleansing, tokenizing, normalized, stopwords, stemming FROM preprocessing")
+        # Cek kolom yang tersedia karena tabel mode ringkas tidak menyimpan tahap antara
+        cur.execute("SELECT * FROM preprocessing LIMIT 0")
+        available = {desc[0] for desc in cur.description}
+        wanted = ['source_id', 'full_text', 'case_folding', 'cleansing', 'tokenizing', 'normalized', 'stopwords', 'stemming']
+        columns = [column for column in wanted if column in available]
+        cur.execute(f"SELECT {', '.join(columns)} FROM preprocessing")
         column_names = [desc[0] for desc in cur.description]
         data = [dict(zip(column_names, row)) for row in cur.fetchall()]
         cur.close()
-        return jsonify({'status': 'success', 'data': data})
+        return jsonify({'status': 'success', 'data': data, 'compact': 'case_folding' not in available})
     except Exception as e:
         return jsonify({'status': 'error', 'message': f'Gagal mengambil data: {str(e)}'}), 500
 
+# Endpoint untuk MENGHITUNG ULANG tahap antara (mode ringkas) hanya untuk baris yang sedang ditampilkan
+@app.route('/get-processed-stages', methods=['POST'])
+@login_required
+def get_processed_stages_route():
+    """API Endpoint untuk menghitung ulang tahap preprocessing dari teks sumber berdasarkan daftar source_id."""
+    try:
+        data = request.get_json() or {}
+        # Batasi jumlah baris per request, cukup untuk satu halaman tabel
+        ids = [int(i) for i in data.get('ids', [])][:100]
+        if not ids:
+            return jsonify({'status': 'success', 'data': []})
+
+        cur = mysql.connection.cursor()
+        placeholders = ', '.join(['%s'] * len(ids))
+        cur.execute(f"SELECT source_id, full_text FROM preprocessing WHERE source_id IN ({placeholders})", ids)
+        rows = cur.fetchall()
+        cur.close()
+
+        stages = recompute_stages([row[1] for row in rows])
+        result = [{'source_id': row[0], **stage} for row, stage in zip(rows, stages)]
+        return jsonify({'status': 'success', 'data': result})
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': f'Gagal menghitung ulang tahap preprocessing: {str(e)}'}), 500
+
 # Endpoint untuk MENGHAPUS data hasil proses
 @app.route('/hapus-data-preprocessing', methods=['POST'])
 @login_required
@@ -519,6 +607,23 @@ def download_preprocessing_csv_route():
 def ekstraksi_page():
     return render_template('ekstraksi.html')
 
+def get_extraction_params(payload):
+    """
+    Mengambil parameter ekstraksi fitur dari body JSON (dipakai /proses-ekstraksi dan /latih-dan-evaluasi).
+    'balancing' memilih mode penyeimbangan ('none', 'smote', 'class_prior', 'sample_weight', 'random_oversample');
+    jika tidak dikirim, 'use_smote' lama yang dipakai.
+    'incremental' memperbarui vocabulary/IDF ekstraksi sebelumnya (vocabulary maksimal 'max_vocabulary' term).
+    """
+    max_vocabulary = payload.get('max_vocabulary')
+    return {
+        'use_smote': payload.get('use_smote', False),
+        'balancing': resolve_balancing(payload.get('balancing'), payload.get('use_smote', False)),
+        'max_features': int(payload.get('max_features', DEFAULT_MAX_FEATURES)),
+        'ngram_range': tuple(int(n) for n in payload.get('ngram_range', DEFAULT_NGRAM_RANGE)),
+        'incremental': bool(payload.get('incremental', False)),
+        'max_vocabulary': int(max_vocabulary) if max_vocabulary else None
+    }
+
 @app.route('/proses-ekstraksi', methods=['POST'])
 @login_required
 def proses_ekstraksi_route():
@@ -528,10 +633,10 @@ def proses_ekstraksi_route():
     """
     try:
         # Mengambil parameter dari body request JSON
-        use_smote = request.json.get('use_smote', False)
+        params = get_extraction_params(request.json)
         
         # Memanggil pipeline backend dengan parameter yang sesuai
-        full_result = main_feature_extraction_pipeline(use_smote=use_smote)
+        full_result = main_feature_extraction_pipeline(**params)
 
         if not full_result.get('success'):
             return jsonify(full_result), 500
@@ -547,21 +652,103 @@ def proses_ekstraksi_route():
         app.logger.error(f"Error di route /proses-ekstraksi: {e}", exc_info=True)
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/fitur-run', methods=['GET'])
+@login_required
+def fitur_run_route():
+    """Daftar run ekstraksi yang tersimpan di feature store (terbaru lebih dulu). Parameter: limit."""
+    try:
+        runs = list_feature_runs(limit=min(request.args.get('limit', 20, type=int), 200))
+        return jsonify({'success': True, 'runs': runs})
+    except Exception as e:
+        app.logger.error(f"Error di route /fitur-run: {e}", exc_info=True)
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+# --- API Eksplorasi Fitur (indeks statistik term hasil ekstraksi terakhir) ---
+def get_term_index_or_error():
+    index = load_term_index()
+    if index is None:
+        return None, (jsonify({'success': False, 'error': 'Indeks term belum ada. Jalankan ekstraksi fitur terlebih dahulu.'}), 404)
+    return index, None
+
+@app.route('/indeks-term', methods=['GET'])
+@login_required
+def indeks_term_route():
+    """
+    Daftar term (paginasi) dengan document frequency, total TF-IDF, dan total per kelas.
+    Parameter: page, per_page, sort ('df', 'total', 'term'), q (filter substring).
+    Jika parameter 'term' dikirim, mengembalikan detail term tersebut beserta dokumen yang memuatnya.
+    """
+    try:
+        index, error = get_term_index_or_error()
+        if error:
+            return error
+        page = request.args.get('page', 1, type=int)
+        per_page = request.args.get('per_page', 50, type=int)
+        term = request.args.get('term')
+        if term:
+            result = query_term(index, term, page, per_page)
+            if result is None:
+                return jsonify({'success': False, 'error': f"Term '{term}' tidak ada di vocabulary."}), 404
+            return jsonify({'success': True, **result})
+        result = query_terms(index, page, per_page, sort=request.args.get('sort', 'df'), q=request.args.get('q'))
+        return jsonify({'success': True, **result})
+    except Exception as e:
+        app.logger.error(f"Error di route /indeks-term: {e}", exc_info=True)
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/indeks-dokumen', methods=['GET'])
+@login_required
+def indeks_dokumen_route():
+    """Daftar dokumen latih (paginasi) beserta label dan top-k term. Parameter: page, per_page, label."""
+    try:
+        index, error = get_term_index_or_error()
+        if error:
+            return error
+        result = query_documents(
+            index,
+            request.args.get('page', 1, type=int),
+            request.args.get('per_page', 50, type=int),
+            label=request.args.get('label')
+        )
+        return jsonify({'success': True, **result})
+    except Exception as e:
+        app.logger.error(f"Error di route /indeks-dokumen: {e}", exc_info=True)
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/indeks-kelas', methods=['GET'])
+@login_required
+def indeks_kelas_route():
+    """Ringkasan per kelas: jumlah dokumen dan top-k term berdasarkan total bobot TF-IDF."""
+    try:
+        index, error = get_term_index_or_error()
+        if error:
+            return error
+        return jsonify({'success': True, 'classes': query_classes(index)})
+    except Exception as e:
+        app.logger.error(f"Error di route /indeks-kelas: {e}", exc_info=True)
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 # Ganti route '/hapus_ekstraksi' yang lama dengan versi API ini
 @app.route('/hapus-ekstraksi', methods=['POST'])
 @login_required
 def hapus_ekstraksi_route():
     """
-    API Endpoint untuk menghapus hasil ekstraksi (file model & vectorizer).
+    API Endpoint untuk menghapus hasil ekstraksi (file vectorizer, cache fitur, feature store, dan indeks term).
     """
     try:
-        # Hapus file vectorizer jika ada
-        if os.path.exists('tfidf_vectorizer.pkl'):
-            os.remove('tfidf_vectorizer.pkl')
+        # Hapus file vectorizer jika ada (artefak ringkas dan format pickle lama)
+        for vectorizer_path in (VECTORIZER_ARTIFACT_PATH, 'tfidf_vectorizer.pkl'):
+            if os.path.exists(vectorizer_path):
+                os.remove(vectorizer_path)
             
-        # Hapus juga file model jika ada (asumsi nama file)
-        if os.path.exists('model_sentimen.pkl'):
-            os.remove('model_sentimen.pkl')
+        # Model terlatih disimpan per versi di registry model (folder models/) dan tidak ikut dihapus di sini.
+
+        # Hapus cache fitur, state TF-IDF inkremental, dan indeks term agar ekstraksi berikutnya dihitung ulang dari awal
+        clear_feature_cache()
+        clear_incremental_state()
+        prune_feature_runs(keep=0)
+        if os.path.exists(TERM_INDEX_PATH):
+            os.remove(TERM_INDEX_PATH)
         
         # Mengosongkan session jika Anda menyimpan sesuatu di sana
         session.pop('extractionResult', None)
@@ -661,8 +848,86 @@ def delete_split_data():
 @app.route('/klasifikasi')
 @login_required
 def klasifikasi_page():
-    """Menampilkan halaman untuk pelatihan dan evaluasi model."""
-    return render_template('klasifikasi_naive_bayes1.html')
+    """Menampilkan halaman untuk pelatihan dan evaluasi model, beserta metrik tersimpan dari versi model aktif."""
+    try:
+        active_metadata = get_model_metadata()
+    except Exception as e:
+        app.logger.error(f"Gagal membaca metadata model aktif: {e}", exc_info=True)
+        active_metadata = None
+    return render_template('klasifikasi_naive_bayes1.html', active_model=active_metadata)
+
+@app.route('/model-versi', methods=['GET'])
+@login_required
+def model_versi_route():
+    """Daftar versi model di registry (terbaru lebih dulu) beserta metrik ringkas dan versi aktif."""
+    try:
+        return jsonify({'success': True, 'versions': list_model_versions()})
+    except Exception as e:
+        app.logger.error(f"Error di route /model-versi: {e}", exc_info=True)
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/model-versi/promosi', methods=['POST'])
+@login_required
+def promosi_model_route():
+    """Menjadikan versi tertentu sebagai model aktif. Body JSON: {'version': 'v0002'}."""
+    try:
+        version = (request.get_json(silent=True) or {}).get('version')
+        if not version:
+            return jsonify({'success': False, 'error': "Parameter 'version' wajib diisi."}), 400
+        promote_model(version)
+        load_active_model()
+        return jsonify({'success': True, 'active': version})
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 404
+    except Exception as e:
+        app.logger.error(f"Error di route /model-versi/promosi: {e}", exc_info=True)
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/model-versi/rollback', methods=['POST'])
+@login_required
+def rollback_model_route():
+    """Mengaktifkan kembali versi model sebelumnya."""
+    try:
+        version = rollback_model()
+        load_active_model()
+        return jsonify({'success': True, 'active': version})
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        app.logger.error(f"Error di route /model-versi/rollback: {e}", exc_info=True)
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/predict', methods=['POST'])
+@login_required
+def predict_route():
+    """
+    Mengklasifikasi teks baru dengan versi model aktif.
+    Body JSON: {'text': '...'} atau {'texts': ['...', ...]} (maksimal MAX_TEXTS_PER_REQUEST teks).
+    'explain': true menambahkan term dengan kontribusi terbesar per kelas untuk setiap teks.
+    Request yang datang bersamaan digabung menjadi micro-batch (lihat prediction_service.py).
+    """
+    start_time = time.perf_counter()
+    payload = request.get_json(silent=True) or {}
+    texts = payload.get('texts')
+    if texts is None and 'text' in payload:
+        texts = [payload['text']]
+    if not isinstance(texts, list) or not texts or not all(isinstance(t, str) for t in texts):
+        return jsonify({'success': False, 'error': "Kirim 'text' (string) atau 'texts' (list string yang tidak kosong)."}), 400
+    if len(texts) > MAX_TEXTS_PER_REQUEST:
+        return jsonify({'success': False, 'error': f'Maksimal {MAX_TEXTS_PER_REQUEST} teks per request.'}), 400
+    try:
+        predictions = predict(texts, explain=bool(payload.get('explain', False)))
+    except ModelNotReadyError as e:
+        return jsonify({'success': False, 'error': str(e)}), 503
+    except Exception as e:
+        app.logger.error(f"Error di route /predict: {e}", exc_info=True)
+        return jsonify({'success': False, 'error': str(e)}), 500
+    return jsonify({
+        'success': True,
+        'model_version': predictions[0]['model_version'],
+        'predictions': [{key: value for key, value in item.items() if key != 'model_version'} for item in predictions],
+        'latency_ms': round((time.perf_counter() - start_time) * 1000, 2)
+    })
 
 # API Endpoint untuk menjalankan seluruh alur (ekstraksi + pelatihan)
 @app.route('/latih-dan-evaluasi', methods=['POST'])
@@ -671,21 +936,52 @@ def latih_dan_evaluasi_route():
     """
     API Endpoint yang dipanggil oleh frontend untuk melatih dan mengevaluasi model.
     Menerima 'use_smote' sebagai parameter.
+    Response hanya berisi metrik ringkas dan 'result_run_id'; hasil prediksi per dokumen dibaca lewat /hasil-klasifikasi.
     """
     try:
         # 1. Ambil parameter dari request
-        use_smote = request.json.get('use_smote', False)
+        params = get_extraction_params(request.json)
+
+        # Mode 'hashing' membaca dan melatih per chunk (out-of-core) untuk data yang tidak muat di memori
+        if request.json.get('extraction_mode', 'tfidf') == 'hashing':
+            if params['balancing'] not in HASHING_BALANCING_MODES:
+                return jsonify({'success': False, 'error': f"Mode penyeimbangan '{params['balancing']}' tidak didukung pada mode hashing. "
+                                                           f"Pilihan: {', '.join(HASHING_BALANCING_MODES)}."}), 400
+            hashing_results = main_hashing_extraction_pipeline(
+                n_features=int(request.json.get('n_features', HASHING_N_FEATURES)),
+                ngram_range=params['ngram_range'],
+                chunk_size=int(request.json.get('chunk_size', HASHING_CHUNK_SIZE)),
+                balancing=params['balancing']
+            )
+            if not hashing_results.get('success'):
+                return jsonify(hashing_results), 500
+            return jsonify(train_and_evaluate_nb_streaming(hashing_results, model_params={
+                'ngram_range': params['ngram_range'],
+                'n_features': hashing_results['stats']['feature_count']
+            }))
         
         # 2. Jalankan pipeline ekstraksi fitur dari ekstraksi.py
-        # Parameter use_smote akan menentukan apakah SMOTE dijalankan atau tidak
-        feature_results = main_feature_extraction_pipeline(use_smote=use_smote)
-        if not feature_results.get('success'):
-            # Jika ekstraksi gagal, langsung kembalikan errornya
-            return jsonify(feature_results), 500
+        # Parameter use_smote akan menentukan apakah SMOTE dijalankan atau tidak.
+        # Jika /proses-ekstraksi sudah dijalankan dengan data dan parameter yang sama, hasilnya diambil dari cache.
+        # Jika 'feature_run_id' dikirim, fitur dimuat dari feature store tanpa ekstraksi ulang.
+        feature_run_id = request.json.get('feature_run_id')
+        if feature_run_id:
+            feature_results = load_feature_run(feature_run_id)
+            if feature_results is None:
+                return jsonify({'success': False, 'error': f"Fitur run '{feature_run_id}' tidak ditemukan."}), 404
+        else:
+            feature_results = main_feature_extraction_pipeline(**params)
+            if not feature_results.get('success'):
+                # Jika ekstraksi gagal, langsung kembalikan errornya
+                return jsonify(feature_results), 500
 
         # 3. Jalankan pipeline pelatihan dan evaluasi dari model_naive_bayes.py
         # Berikan hasil dari langkah 2 sebagai input
-        evaluation_results = train_and_evaluate_nb(feature_results)
+        model_params = {key: params[key] for key in ('max_features', 'ngram_range', 'incremental', 'max_vocabulary')}
+        evaluation_results = train_and_evaluate_nb(feature_results, model_params={
+            **(feature_results.get('params', {}) if feature_run_id else model_params),
+            'extraction_mode': 'tfidf'
+        })
         
         # Hapus objek model yang tidak bisa dikirim sebagai JSON
         if 'model' in evaluation_results:
@@ -698,25 +994,95 @@ def latih_dan_evaluasi_route():
         app.logger.error(f"Error di route /latih-dan-evaluasi: {e}", exc_info=True)
         return jsonify({'success': False, 'error': str(e)}), 500
 
+# API Endpoint untuk menelusuri hasil prediksi data uji per halaman
+@app.route('/hasil-klasifikasi', methods=['GET'])
+@login_required
+def hasil_klasifikasi_route():
+    """
+    Satu halaman hasil klasifikasi dari tabel hasil_klasifikasi (keyset pagination).
+    Query string: run_id (bawaan: run terbaru), after (next_after dari halaman sebelumnya), limit,
+    actual, predicted, dan misclassified=1 untuk hanya menampilkan prediksi yang salah.
+    """
+    try:
+        run_id = request.args.get('run_id') or get_latest_result_run_id()
+        if not run_id:
+            return jsonify({'success': False, 'error': 'Belum ada hasil klasifikasi. Latih model terlebih dahulu.'}), 404
+        run = get_result_run(run_id)
+        if run is None:
+            return jsonify({'success': False, 'error': f"Hasil klasifikasi '{run_id}' tidak ditemukan."}), 404
+        page = query_results(
+            run_id,
+            after=request.args.get('after', type=int),
+            limit=request.args.get('limit', RESULT_PAGE_SIZE, type=int),
+            actual=request.args.get('actual') or None,
+            predicted=request.args.get('predicted') or None,
+            misclassified=request.args.get('misclassified', '0').lower() in ('1', 'true', 'ya')
+        )
+        return jsonify({'success': True, 'run': run, **page})
+    except Exception as e:
+        app.logger.error(f"Error di route /hasil-klasifikasi: {e}", exc_info=True)
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+
+@app.route('/cari-hyperparameter', methods=['POST'])
+@login_required
+def cari_hyperparameter_route():
+    """
+    API Endpoint untuk pencarian hyperparameter.
+    Body JSON: {'grid': {'max_features': [...], 'ngram_range': [[1, 1], [1, 2]], 'min_df': [...],
+    'balancing': [...], 'alpha': [...]}, 'n_workers': 4}. Parameter yang tidak dikirim memakai nilai bawaan.
+    """
+    try:
+        payload = request.get_json(silent=True) or {}
+        n_workers = payload.get('n_workers')
+        result = run_hyperparameter_search(payload.get('grid'), n_workers=int(n_workers) if n_workers else None)
+        if not result.get('success'):
+            return jsonify(result), 400
+        return jsonify(result)
+    except Exception as e:
+        app.logger.error(f"Error di route /cari-hyperparameter: {e}", exc_info=True)
+        return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/validasi-silang', methods=['POST'])
+@login_required
+def validasi_silang_route():
+    """
+    API Endpoint untuk evaluasi stratified k-fold (paralel) pada seluruh data berlabel.
+    Body JSON: {'n_splits': 5, 'n_repeats': 1, 'alpha': 1.0, 'n_workers': 4, 'compare_serial': false,
+    serta parameter ekstraksi 'balancing'/'use_smote', 'max_features', 'ngram_range'}.
+    """
+    try:
+        payload = request.get_json(silent=True) or {}
+        params = get_extraction_params(payload)
+        n_workers = payload.get('n_workers')
+        result = run_cross_validation(
+            n_splits=int(payload.get('n_splits', DEFAULT_N_SPLITS)),
+            n_repeats=int(payload.get('n_repeats', 1)),
+            balancing=params['balancing'],
+            alpha=float(payload.get('alpha', 1.0)),
+            max_features=params['max_features'],
+            ngram_range=params['ngram_range'],
+            n_workers=int(n_workers) if n_workers else None,
+            compare_serial=bool(payload.get('compare_serial', False))
+        )
+        if not result.get('success'):
+            return jsonify(result), 400
+        return jsonify(result)
+    except Exception as e:
+        app.logger.error(f"Error di route /validasi-silang: {e}", exc_info=True)
+        return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/hapus_hasil_pelatihan', methods=['POST'])
 def hapus_hasil_pelatihan():
     """
-    API Endpoint untuk menghapus semua data dari tabel hasil_klasifikasi.
+    API Endpoint untuk menghapus semua data dari tabel hasil_klasifikasi beserta daftar run-nya.
     """
     try:
-        db_url = f"mysql+pymysql://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['host']}/{DB_CONFIG['database']}"
-        engine = create_engine(db_url)
-        with engine.connect() as connection:
-            # Gunakan TRUNCATE TABLE untuk mereset tabel dengan cepat
-            connection.execute(text("TRUNCATE TABLE hasil_klasifikasi"))
-            # Perlu import text dari sqlalchemy: from sqlalchemy import text
-        
+        clear_results()
         return jsonify({'success': True, 'message': 'Tabel hasil_klasifikasi berhasil dikosongkan.'})
     except Exception as e:
-        # Log error di sisi server
-        print(f"ERROR saat menghapus hasil pelatihan: {e}")
+        app.logger.error(f"ERROR saat menghapus hasil pelatihan: {e}", exc_info=True)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 if __name__ == '__main__':
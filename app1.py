@@ -1,5 +1,5 @@
 from flask import Flask, render_template, request, redirect, make_response, jsonify
-import re
+from text_pipeline import TextPipeline
 from sentiment_labeler import SentimentLabeler
 
 app = Flask(__name__)
@@ -10,36 +10,16 @@ except Exception as e:
     print(f"Error: {e}")
     labeler = None
 
-# Fungsi untuk memuat kamus normalisasi
-def load_normalization_dict(filepath):
-    norm_dict = {}
-    with open(filepath, 'r', encoding='utf-8') as f:
-        for line in f:
-            if '\t' in line:
-                slang, formal = line.strip().split('\t')
-                norm_dict[slang] = formal
-    return norm_dict
+# Pipeline teks yang sama dengan preprocessing.py; kamus normalisasi dan stopword diambil dari
+# leksikon terkompilasi pada setiap panggilan sehingga perubahan kamus langsung berlaku.
+pipeline = TextPipeline()
 
-# Fungsi case folding dan cleansing
-def preprocess(text):
-    text = text.lower()
-    text = re.sub(r'https?://\S+|www\.\S+', '', text)
-    text = re.sub(r'@\w+|#\w+', '', text)
-    text = re.sub(r'[^\w\s]', ' ', text)
-    text = re.sub(r'\s+', ' ', text).strip()
-    return text
-
-# Tokenize
-def tokenize(text):
-    return text.split()
-
-# Normalisasi
-def normalize_tokens(tokens, norm_dict):
-    return [norm_dict.get(token, token) for token in tokens]
+# Fungsi untuk menjalankan case folding, cleansing, tokenizing, dan normalisasi pada satu teks
+def normalize_text(text):
+    return ' '.join(pipeline(text, with_stages=True).normalized_tokens)
 
 # @app.route('/', methods=['GET', 'POST'])
 # def index():
-#     norm_dict = load_normalization_dict('kamus/normalisasi.txt')
 #     history = request.cookies.get('history', '').split('|') if request.cookies.get('history') else []
     
 #     original_text = ""
@@ -47,10 +27,7 @@ def normalize_tokens(tokens, norm_dict):
     
 #     if request.method == 'POST':
 #         original_text = request.form['text']
-#         cleaned = preprocess(original_text)
-#         tokens = tokenize(cleaned)
-#         normalized_tokens = normalize_tokens(tokens, norm_dict)
-#         normalized_text = ' '.join(normalized_tokens)
+#         normalized_text = normalize_text(original_text)
 
 #         # Simpan ke history
 #         new_entry = f"{original_text} → {normalized_text}"
@@ -0,0 +1,44 @@
+# --- Micro-benchmark Mesin Pembersih Teks ---
+# Membandingkan waktu case folding + cleansing versi re.sub berantai (legacy_clean) dengan mesin gabungan
+# (per teks dan versi kolom pandas) pada kolom 'full_text' dari CSV di folder uploads/.
+# Kesamaan hasilnya diperiksa oleh tests/test_text_cleaner.py.
+# Contoh:
+#   python benchmark_text_cleaner.py --repeat 5
+import os
+import csv
+import glob
+import timeit
+import argparse
+import pandas as pd
+from text_cleaner import clean_text, fold_and_clean_series, legacy_clean
+
+def load_upload_texts(folder='uploads'):
+    """Semua nilai kolom 'full_text' dari CSV di folder; file tanpa kolom tersebut dilewati."""
+    texts = []
+    for path in sorted(glob.glob(os.path.join(folder, '*.csv'))):
+        with open(path, 'r', encoding='utf-8', errors='replace', newline='') as f:
+            reader = csv.DictReader(f)
+            if not reader.fieldnames or 'full_text' not in reader.fieldnames:
+                continue
+            texts.extend(row['full_text'] for row in reader if isinstance(row.get('full_text'), str))
+    return texts
+
+def main():
+    parser = argparse.ArgumentParser(description='Micro-benchmark mesin pembersih teks')
+    parser.add_argument('--folder', default='uploads')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    texts = load_upload_texts(args.folder)
+    if not texts:
+        raise SystemExit(f"Tidak ada kolom 'full_text' pada CSV di '{args.folder}'.")
+    series = pd.Series(texts)
+    legacy_time = min(timeit.repeat(lambda: [legacy_clean(t) for t in texts], number=1, repeat=args.repeat))
+    fused_time = min(timeit.repeat(lambda: [clean_text(t) for t in texts], number=1, repeat=args.repeat))
+    series_time = min(timeit.repeat(lambda: fold_and_clean_series(series), number=1, repeat=args.repeat))
+    print(f"{len(texts)} teks | re.sub berantai: {legacy_time:.3f} s | mesin gabungan: {fused_time:.3f} s "
+          f"(speedup {legacy_time / fused_time:.2f}x) | versi kolom pandas: {series_time:.3f} s "
+          f"(speedup {legacy_time / series_time:.2f}x)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,251 @@
+# --- Penyimpanan Hasil Klasifikasi (Append-only per Run) ---
+# Setiap pelatihan/evaluasi mendapat run_id; hasil prediksi data uji ditambahkan ke 'hasil_klasifikasi'
+# (tidak pernah menimpa run sebelumnya) dan ringkasan run dicatat di 'run_klasifikasi'.
+# Penulisan dilakukan oleh satu thread writer di latar belakang dengan INSERT multi-baris per batch,
+# sehingga response HTTP tidak menunggu database. Semua penulisan memakai satu engine bersama.
+import json
+import uuid
+import logging
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import create_engine, inspect, text
+from config import DB_CONFIG
+
+logger = logging.getLogger(__name__)
+
+RESULTS_TABLE = 'hasil_klasifikasi'
+RESULT_RUN_TABLE = 'run_klasifikasi'
+# Tabel hasil format lama (tanpa run_id) diganti namanya menjadi tabel ini saat pertama kali dimigrasi.
+LEGACY_RESULTS_TABLE = 'hasil_klasifikasi_lama'
+# Jumlah baris per INSERT multi-baris.
+RESULT_INSERT_BATCH_ROWS = 2000
+# Ukuran halaman bawaan dan maksimum untuk query_results.
+RESULT_PAGE_SIZE = 50
+MAX_RESULT_PAGE_SIZE = 500
+
+_CREATE_TABLES = (
+    f"""
+    CREATE TABLE IF NOT EXISTS {RESULT_RUN_TABLE} (
+        run_id VARCHAR(32) NOT NULL PRIMARY KEY,
+        created_at DATETIME NOT NULL,
+        finished_at DATETIME NULL,
+        status VARCHAR(16) NOT NULL,
+        n_rows INT NOT NULL DEFAULT 0,
+        accuracy DOUBLE NULL,
+        model_version VARCHAR(16) NULL,
+        params TEXT NULL,
+        KEY idx_run_klasifikasi_created (created_at)
+    )
+    """,
+    f"""
+    CREATE TABLE IF NOT EXISTS {RESULTS_TABLE} (
+        run_id VARCHAR(32) NOT NULL,
+        row_no INT NOT NULL,
+        teks TEXT NOT NULL,
+        sentimen_aktual VARCHAR(32) NOT NULL,
+        sentimen_prediksi VARCHAR(32) NOT NULL,
+        benar TINYINT(1) NOT NULL,
+        PRIMARY KEY (run_id, row_no),
+        KEY idx_hasil_aktual (run_id, sentimen_aktual, row_no),
+        KEY idx_hasil_prediksi (run_id, sentimen_prediksi, row_no),
+        KEY idx_hasil_benar (run_id, benar, row_no)
+    )
+    """
+)
+
+_engine = None
+_tables_ready = False
+_engine_lock = threading.Lock()
+
+def get_results_engine():
+    """Engine SQLAlchemy bersama untuk semua baca/tulis hasil klasifikasi (dibuat sekali per proses)."""
+    global _engine, _tables_ready
+    with _engine_lock:
+        if _engine is None:
+            db_url = f"mysql+pymysql://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['host']}/{DB_CONFIG['database']}"
+            _engine = create_engine(db_url, pool_pre_ping=True)
+        if not _tables_ready:
+            ensure_result_tables(_engine)
+            _tables_ready = True
+        return _engine
+
+def ensure_result_tables(engine):
+    """Membuat tabel jika belum ada; tabel hasil format lama (tanpa run_id) disimpan dengan nama lain."""
+    inspector = inspect(engine)
+    if inspector.has_table(RESULTS_TABLE):
+        columns = {column['name'] for column in inspector.get_columns(RESULTS_TABLE)}
+        if 'run_id' not in columns:
+            legacy_name = LEGACY_RESULTS_TABLE
+            if inspector.has_table(legacy_name):
+                legacy_name = f"{LEGACY_RESULTS_TABLE}_{datetime.now():%Y%m%d%H%M%S}"
+            with engine.begin() as conn:
+                conn.execute(text(f"RENAME TABLE {RESULTS_TABLE} TO {legacy_name}"))
+            logger.info(f"Tabel '{RESULTS_TABLE}' format lama dipindahkan ke '{legacy_name}'.")
+    with engine.begin() as conn:
+        for statement in _CREATE_TABLES:
+            conn.execute(text(statement))
+
+# Satu thread writer: pekerjaan dijalankan berurutan (run dibuat -> baris ditambahkan -> run diselesaikan).
+_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='hasil-klasifikasi-writer')
+# Run yang masih ditulis di latar belakang (run_id -> jumlah baris yang sudah dijadwalkan). Run dikeluarkan
+# saat selesai atau gagal, sehingga pekerjaan untuk run yang sudah tidak ada di sini (gagal) dilewati.
+_pending = {}
+_pending_lock = threading.Lock()
+
+def new_result_run_id():
+    return uuid.uuid4().hex
+
+def _submit(run_id, job, *args):
+    def run_job():
+        with _pending_lock:
+            if run_id not in _pending:
+                return
+        try:
+            job(*args)
+        except Exception as e:
+            logger.error(f"Gagal menulis hasil klasifikasi run {run_id}: {e}", exc_info=True)
+            _mark_failed(run_id)
+    return _writer.submit(run_job)
+
+def _mark_failed(run_id):
+    with _pending_lock:
+        _pending.pop(run_id, None)
+    try:
+        with get_results_engine().begin() as conn:
+            conn.execute(text(f"UPDATE {RESULT_RUN_TABLE} SET status = 'failed', finished_at = :now WHERE run_id = :run_id"),
+                         {'now': datetime.now(), 'run_id': run_id})
+    except Exception as e:
+        logger.warning(f"Gagal menandai run {run_id} sebagai gagal: {e}")
+
+def _insert_run(run_id, params):
+    with get_results_engine().begin() as conn:
+        conn.execute(text(f"""
+            INSERT INTO {RESULT_RUN_TABLE} (run_id, created_at, status, params)
+            VALUES (:run_id, :created_at, 'writing', :params)
+        """), {'run_id': run_id, 'created_at': datetime.now(), 'params': json.dumps(params or {}, default=str)})
+
+def _insert_rows(run_id, start_row, texts, actual_labels, predicted_labels):
+    rows = [
+        (run_id, start_row + i, text_value if isinstance(text_value, str) else '', str(actual), str(predicted),
+         int(str(actual) == str(predicted)))
+        for i, (text_value, actual, predicted) in enumerate(zip(texts, actual_labels, predicted_labels))
+    ]
+    statement = (f"INSERT INTO {RESULTS_TABLE} (run_id, row_no, teks, sentimen_aktual, sentimen_prediksi, benar) "
+                 f"VALUES (%s, %s, %s, %s, %s, %s)")
+    with get_results_engine().begin() as conn:
+        for start in range(0, len(rows), RESULT_INSERT_BATCH_ROWS):
+            # executemany PyMySQL menggabungkan baris-baris ini menjadi satu INSERT ... VALUES (...), (...), ...
+            conn.exec_driver_sql(statement, rows[start:start + RESULT_INSERT_BATCH_ROWS])
+    logger.info(f"{len(rows)} baris hasil klasifikasi run {run_id} ditambahkan.")
+
+def _finish_run(run_id, summary, status):
+    with get_results_engine().begin() as conn:
+        n_rows = conn.execute(text(f"SELECT COUNT(*) FROM {RESULTS_TABLE} WHERE run_id = :run_id"),
+                              {'run_id': run_id}).scalar()
+        conn.execute(text(f"""
+            UPDATE {RESULT_RUN_TABLE}
+            SET status = :status, finished_at = :now, n_rows = :n_rows, accuracy = :accuracy, model_version = :model_version
+            WHERE run_id = :run_id
+        """), {
+            'status': status,
+            'now': datetime.now(),
+            'n_rows': int(n_rows),
+            'accuracy': summary.get('accuracy'),
+            'model_version': summary.get('model_version'),
+            'run_id': run_id
+        })
+    with _pending_lock:
+        _pending.pop(run_id, None)
+    logger.info(f"Hasil klasifikasi run {run_id} selesai ditulis ({n_rows} baris).")
+
+def start_result_run(run_id, params=None):
+    """Menjadwalkan pembuatan run baru (status 'writing')."""
+    with _pending_lock:
+        _pending[run_id] = 0
+    return _submit(run_id, _insert_run, run_id, params)
+
+def append_results(run_id, texts, actual_labels, predicted_labels, start_row=0):
+    """Menjadwalkan penambahan baris hasil prediksi; start_row dipakai saat hasil ditulis per chunk."""
+    texts = list(texts)
+    with _pending_lock:
+        if run_id in _pending:
+            _pending[run_id] += len(texts)
+    return _submit(run_id, _insert_rows, run_id, start_row, texts, list(actual_labels), list(predicted_labels))
+
+def finish_result_run(run_id, summary=None, status='done'):
+    """Menjadwalkan penandaan run selesai ('done'/'failed') beserta ringkasannya (akurasi, versi model)."""
+    return _submit(run_id, _finish_run, run_id, summary or {}, status)
+
+def get_result_run(run_id):
+    """Ringkasan satu run; status 'writing' jika masih ditulis oleh proses ini. None jika tidak ada."""
+    with _pending_lock:
+        if run_id in _pending:
+            return {'run_id': run_id, 'status': 'writing', 'n_rows': _pending[run_id]}
+    with get_results_engine().connect() as conn:
+        row = conn.execute(text(f"SELECT * FROM {RESULT_RUN_TABLE} WHERE run_id = :run_id"),
+                           {'run_id': run_id}).mappings().first()
+    if row is None:
+        return None
+    return {
+        **row,
+        'created_at': row['created_at'].isoformat() if row['created_at'] else None,
+        'finished_at': row['finished_at'].isoformat() if row['finished_at'] else None,
+        'params': json.loads(row['params']) if row['params'] else {}
+    }
+
+def get_latest_result_run_id():
+    """run_id terbaru yang tercatat (termasuk yang masih ditulis oleh proses ini), atau None."""
+    with _pending_lock:
+        if _pending:
+            return next(reversed(_pending))
+    with get_results_engine().connect() as conn:
+        return conn.execute(text(f"SELECT run_id FROM {RESULT_RUN_TABLE} ORDER BY created_at DESC LIMIT 1")).scalar()
+
+def query_results(run_id, after=None, limit=RESULT_PAGE_SIZE, actual=None, predicted=None, misclassified=False):
+    """
+    Satu halaman hasil klasifikasi run_id dengan keyset pagination pada row_no: halaman berikutnya diminta dengan
+    after = next_after dari halaman sebelumnya, sehingga biaya per halaman tetap meski posisinya jauh di belakang.
+    Filter opsional: label aktual, label prediksi, dan hanya yang salah klasifikasi.
+    """
+    limit = max(1, min(int(limit), MAX_RESULT_PAGE_SIZE))
+    conditions = ['run_id = :run_id', 'row_no > :after']
+    params = {'run_id': run_id, 'after': -1 if after is None else int(after), 'limit': limit + 1}
+    if actual:
+        conditions.append('sentimen_aktual = :actual')
+        params['actual'] = actual
+    if predicted:
+        conditions.append('sentimen_prediksi = :predicted')
+        params['predicted'] = predicted
+    if misclassified:
+        conditions.append('benar = 0')
+    with get_results_engine().connect() as conn:
+        rows = conn.execute(text(f"""
+            SELECT row_no, teks, sentimen_aktual, sentimen_prediksi, benar
+            FROM {RESULTS_TABLE}
+            WHERE {' AND '.join(conditions)}
+            ORDER BY row_no
+            LIMIT :limit
+        """), params).fetchall()
+    # Satu baris ekstra diambil hanya untuk mengetahui apakah masih ada halaman berikutnya.
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        'items': [{
+            'row_no': row.row_no,
+            'text': row.teks,
+            'actual': row.sentimen_aktual,
+            'predicted': row.sentimen_prediksi,
+            'correct': bool(row.benar)
+        } for row in rows],
+        'next_after': rows[-1].row_no if has_more else None
+    }
+
+def clear_results():
+    """Menghapus seluruh riwayat hasil klasifikasi dan run-nya."""
+    # Menunggu penulisan yang masih antre agar tidak ada baris yang masuk setelah tabel dikosongkan.
+    _writer.submit(lambda: None).result()
+    engine = get_results_engine()
+    with engine.begin() as conn:
+        conn.execute(text(f"TRUNCATE TABLE {RESULTS_TABLE}"))
+        conn.execute(text(f"TRUNCATE TABLE {RESULT_RUN_TABLE}"))
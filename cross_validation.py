@@ -0,0 +1,226 @@
+# --- Validasi Silang (Stratified K-Fold) Paralel ---
+# Evaluasi Naive Bayes dengan stratified k-fold (opsional diulang beberapa kali) pada seluruh data berlabel
+# 'pembagian_data', sebagai pelengkap evaluasi satu kali pembagian latih/uji. Matriks TF-IDF dihitung sekali,
+# array CSR-nya (data/indices/indptr) dan label ditaruh di shared memory, lalu setiap proses worker memakai
+# matriks yang sama tanpa salinan untuk melatih dan menguji fold secara bersamaan.
+import time
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.model_selection import StratifiedKFold, RepeatedStratifiedKFold
+from sklearn.metrics import accuracy_score, precision_recall_fscore_support
+
+from ekstraksi import (load_split_data_from_db, create_engine_from_config, balance_training_data, resolve_balancing,
+                       DEFAULT_MAX_FEATURES, DEFAULT_NGRAM_RANGE)
+from model_naive_bayes import MultinomialNBFromScratch
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_N_SPLITS = 5
+MAX_FOLDS = 100
+METRIC_NAMES = ('accuracy', 'macro_precision', 'macro_recall', 'macro_f1')
+
+class SharedArrays:
+    """Menyalin array numpy ke blok shared memory; dipakai sebagai context manager agar blok selalu di-unlink."""
+    def __init__(self, arrays):
+        self._blocks = []
+        self.specs = {}
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+            self._blocks.append(block)
+            self.specs[name] = (block.name, array.shape, array.dtype.str)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+
+def attach_arrays(specs):
+    """Memetakan blok shared memory milik proses induk menjadi array numpy (tanpa salinan)."""
+    blocks, arrays = [], {}
+    for name, (block_name, shape, dtype) in specs.items():
+        try:
+            # Python >= 3.13: worker tidak ikut mendaftarkan blok ke resource tracker (unlink dilakukan induk).
+            block = shared_memory.SharedMemory(name=block_name, track=False)
+        except TypeError:
+            block = shared_memory.SharedMemory(name=block_name)
+        blocks.append(block)
+        arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+    return blocks, arrays
+
+# Data bersama milik proses worker, diisi sekali oleh _init_worker.
+_worker_data = None
+
+def _init_worker(specs, shape, classes, balancing, alpha):
+    global _worker_data
+    blocks, arrays = attach_arrays(specs)
+    X = sp.csr_matrix((arrays['data'], arrays['indices'], arrays['indptr']), shape=shape, copy=False)
+    # Referensi blok disimpan agar memori bersama tidak dilepas selama worker hidup.
+    _worker_data = (X, classes[arrays['labels']], balancing, alpha, blocks)
+
+def _init_local(X, y, balancing, alpha):
+    global _worker_data
+    _worker_data = (X, y, balancing, alpha, [])
+
+def _evaluate_fold(task):
+    """Worker: melatih Naive Bayes pada indeks latih satu fold lalu menghitung metrik pada indeks ujinya."""
+    X, y, balancing, alpha, _ = _worker_data
+    X_train, y_train = X[task['train_index']], y[task['train_index']]
+    X_test, y_test = X[task['test_index']], y[task['test_index']]
+
+    fit_start = time.perf_counter()
+    balanced = balance_training_data(X_train, y_train, balancing)
+    model = MultinomialNBFromScratch(alpha=alpha, class_prior=balanced['class_prior'])
+    model.fit(balanced['X_train'], balanced['y_train'], sample_weight=balanced['sample_weight'])
+    fit_time = time.perf_counter() - fit_start
+
+    predict_start = time.perf_counter()
+    y_pred = model.predict(X_test)
+    predict_time = time.perf_counter() - predict_start
+
+    precision, recall, f1, _ = precision_recall_fscore_support(y_test, y_pred, average='macro', zero_division=0)
+    return {
+        'repeat': task['repeat'],
+        'fold': task['fold'],
+        'train_count': int(len(task['train_index'])),
+        'test_count': int(len(task['test_index'])),
+        'accuracy': round(float(accuracy_score(y_test, y_pred)), 4),
+        'macro_precision': round(float(precision), 4),
+        'macro_recall': round(float(recall), 4),
+        'macro_f1': round(float(f1), 4),
+        'fit_time': round(fit_time, 4),
+        'predict_time': round(predict_time, 4)
+    }
+
+def make_fold_tasks(y, n_splits=DEFAULT_N_SPLITS, n_repeats=1, random_state=42):
+    if n_repeats > 1:
+        splitter = RepeatedStratifiedKFold(n_splits=n_splits, n_repeats=n_repeats, random_state=random_state)
+    else:
+        splitter = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=random_state)
+    return [
+        {'repeat': i // n_splits, 'fold': i % n_splits, 'train_index': train_index, 'test_index': test_index}
+        for i, (train_index, test_index) in enumerate(splitter.split(np.zeros(len(y)), y))
+    ]
+
+def aggregate_fold_metrics(folds):
+    """Rata-rata, simpangan baku, minimum, dan maksimum setiap metrik atas semua fold."""
+    summary = {}
+    for name in METRIC_NAMES:
+        values = np.array([fold[name] for fold in folds])
+        summary[name] = {
+            'mean': round(float(values.mean()), 4),
+            'std': round(float(values.std(ddof=1)) if len(values) > 1 else 0.0, 4),
+            'min': round(float(values.min()), 4),
+            'max': round(float(values.max()), 4)
+        }
+    return summary
+
+def run_folds_serial(X, y, tasks, balancing, alpha):
+    _init_local(X, y, balancing, alpha)
+    return [_evaluate_fold(task) for task in tasks]
+
+def run_folds_parallel(X, y, tasks, balancing, alpha, n_workers=None):
+    classes, label_ids = np.unique(y, return_inverse=True)
+    arrays = {'data': X.data, 'indices': X.indices, 'indptr': X.indptr, 'labels': label_ids}
+    with SharedArrays(arrays) as shared:
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                                 initargs=(shared.specs, X.shape, classes, balancing, alpha)) as executor:
+            return list(executor.map(_evaluate_fold, tasks))
+
+def run_cross_validation(n_splits=DEFAULT_N_SPLITS, n_repeats=1, balancing='none', alpha=1.0,
+                         max_features=DEFAULT_MAX_FEATURES, ngram_range=DEFAULT_NGRAM_RANGE,
+                         n_workers=None, compare_serial=False, random_state=42):
+    """
+    Menjalankan (repeated) stratified k-fold pada seluruh data berlabel 'pembagian_data'.
+    Vocabulary dan IDF TF-IDF di-fit sekali pada seluruh data; label tidak dipakai saat ekstraksi.
+    compare_serial=True menjalankan ulang semua fold secara serial untuk membandingkan waktu.
+    """
+    try:
+        balancing = resolve_balancing(balancing)
+        n_splits, n_repeats = int(n_splits), int(n_repeats)
+        if n_splits < 2:
+            return {'success': False, 'error': 'Jumlah fold minimal 2.'}
+        if n_splits * n_repeats > MAX_FOLDS:
+            return {'success': False, 'error': f'Jumlah fold x pengulangan melebihi batas {MAX_FOLDS}.'}
+
+        train_df, test_df = load_split_data_from_db(create_engine_from_config())
+        if train_df is None or test_df is None:
+            return {'success': False, 'error': 'Gagal memuat data. Jalankan pembagian data terlebih dahulu.'}
+        df = pd.concat([train_df, test_df], ignore_index=True)
+        y = df['sentiment_pakar'].to_numpy()
+        min_class_count = int(pd.Series(y).value_counts().min())
+        if min_class_count < n_splits:
+            return {'success': False, 'error': f'Kelas terkecil hanya memiliki {min_class_count} data, kurang dari jumlah fold.'}
+
+        extraction_start = time.perf_counter()
+        X = TfidfVectorizer(max_features=max_features, ngram_range=tuple(ngram_range)).fit_transform(df['stemming']).tocsr()
+        extraction_time = time.perf_counter() - extraction_start
+        tasks = make_fold_tasks(y, n_splits, n_repeats, random_state)
+        logger.info(f"Validasi silang: {len(tasks)} fold, {X.shape[0]} dokumen, {X.shape[1]} fitur.")
+
+        parallel_start = time.perf_counter()
+        if n_workers == 1:
+            folds = run_folds_serial(X, y, tasks, balancing, alpha)
+        else:
+            folds = run_folds_parallel(X, y, tasks, balancing, alpha, n_workers)
+        parallel_time = time.perf_counter() - parallel_start
+
+        timing = {'extraction_time': round(extraction_time, 4), 'folds_time': round(parallel_time, 4)}
+        if compare_serial and n_workers != 1:
+            serial_start = time.perf_counter()
+            run_folds_serial(X, y, tasks, balancing, alpha)
+            serial_time = time.perf_counter() - serial_start
+            timing.update({'serial_time': round(serial_time, 4), 'speedup': round(serial_time / parallel_time, 2)})
+        logger.info(f"Validasi silang selesai: {timing}")
+
+        return {
+            'success': True,
+            'n_splits': n_splits,
+            'n_repeats': n_repeats,
+            'balancing': balancing,
+            'alpha': alpha,
+            'document_count': int(X.shape[0]),
+            'feature_count': int(X.shape[1]),
+            'folds': folds,
+            'summary': aggregate_fold_metrics(folds),
+            'timing': timing
+        }
+
+    except Exception as e:
+        logger.error(f"Error saat validasi silang: {e}", exc_info=True)
+        return {'success': False, 'error': str(e)}
+
+
+# Blok ini menjalankan validasi silang dari command line dan membandingkan waktu paralel vs serial, contoh:
+#   python cross_validation.py --folds 10 --repeats 3 --workers 4 --balancing class_prior
+if __name__ == '__main__':
+    import argparse
+    import json
+    from ekstraksi import BALANCING_MODES
+
+    parser = argparse.ArgumentParser(description='Stratified k-fold cross-validation Naive Bayes.')
+    parser.add_argument('--folds', type=int, default=DEFAULT_N_SPLITS)
+    parser.add_argument('--repeats', type=int, default=1)
+    parser.add_argument('--balancing', choices=BALANCING_MODES, default='none')
+    parser.add_argument('--alpha', type=float, default=1.0)
+    parser.add_argument('--max-features', type=int, default=DEFAULT_MAX_FEATURES)
+    parser.add_argument('--ngram-range', default='1,2', help="Pasangan 'min,max'")
+    parser.add_argument('--workers', type=int, default=None, help='Jumlah proses (bawaan: semua core)')
+    args = parser.parse_args()
+
+    result = run_cross_validation(args.folds, args.repeats, args.balancing, args.alpha, args.max_features,
+                                  [int(n) for n in args.ngram_range.split(',')], args.workers, compare_serial=True)
+    if not result['success']:
+        raise SystemExit(result['error'])
+    for fold in result['folds']:
+        print(json.dumps(fold))
+    print(json.dumps({'summary': result['summary'], 'timing': result['timing']}, indent=2))
@@ -1,15 +1,41 @@
+import numpy as np
 import pandas as pd
-from sqlalchemy import create_engine
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sqlalchemy import create_engine, text
+from sklearn.feature_extraction.text import TfidfVectorizer, HashingVectorizer
+from sklearn.preprocessing import normalize
 from config import DB_CONFIG
 import logging
-import pickle
+import time
 from collections import Counter
 from imblearn.over_sampling import SMOTE
+from feature_cache import compute_cache_key, load_features, store_features
+from vectorizer_artifact import save_vectorizer_artifact, VECTORIZER_ARTIFACT_PATH
+from term_index import build_term_index, save_term_index, get_term_index_key
+from incremental_tfidf import update_incremental_features
+from feature_store import save_feature_run, find_feature_run
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Parameter TF-IDF bawaan
+DEFAULT_MAX_FEATURES = 5000
+DEFAULT_NGRAM_RANGE = (1, 2)
+
+# Mode penyeimbangan kelas data latih. Selain 'smote', tidak ada baris baru yang dibuat:
+# 'class_prior' menyamakan prior kelas, 'sample_weight' memberi bobot dokumen berbanding terbalik dengan ukuran kelas,
+# dan 'random_oversample' memilih ulang indeks kelas minoritas yang diteruskan sebagai jumlah salinan (bobot) per baris.
+BALANCING_MODES = ('none', 'smote', 'class_prior', 'sample_weight', 'random_oversample')
+
+# Parameter mode out-of-core (feature hashing)
+# Mode penyeimbangan yang bisa diterapkan per chunk (SMOTE dan random oversampling butuh seluruh data latih sekaligus).
+HASHING_BALANCING_MODES = ('none', 'class_prior', 'sample_weight')
+HASHING_N_FEATURES = 2 ** 18
+HASHING_CHUNK_SIZE = 5000
+
+def create_engine_from_config():
+    db_url = f"mysql+pymysql://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['host']}/{DB_CONFIG['database']}"
+    return create_engine(db_url)
+
 def load_split_data_from_db(engine):
     """
     Memuat data yang sudah dibagi (termasuk label) langsung dari tabel 'pembagian_data'.
@@ -46,6 +72,7 @@ def log_extraction_details(vectorizer, tfidf_matrix, raw_texts):
     """Mencetak detail proses ekstraksi fitur."""
     feature_names = vectorizer.get_feature_names_out()
     sample_indices = [0, 1] # Ambil dua sampel pertama
+    tfidf_matrix = tfidf_matrix.tocsr()
 
     logger.info("\n" + "="*20 + " DETAIL EKSTRAKSI FITUR " + "="*20)
     for sample_index in sample_indices:
@@ -53,21 +80,94 @@ def log_extraction_details(vectorizer, tfidf_matrix, raw_texts):
             continue
 
         sample_text = raw_texts.iloc[sample_index]
-        sample_matrix_row = tfidf_matrix[sample_index]
+        # Entri non-nol satu baris dibaca langsung dari array indices/data CSR (tanpa akses per elemen).
+        start, end = tfidf_matrix.indptr[sample_index], tfidf_matrix.indptr[sample_index + 1]
+        feature_index = tfidf_matrix.indices[start:end]
+        tfidf_scores = tfidf_matrix.data[start:end]
 
         logger.info(f"\n[Sampel Teks]: '{sample_text}'")
-        feature_index = sample_matrix_row.nonzero()[1]
-        tfidf_scores = zip(feature_index, [sample_matrix_row[0, x] for x in feature_index])
-        
-        feature_scores = {feature_names[j]: score for j, score in tfidf_scores}
-        sorted_scores = sorted(feature_scores.items(), key=lambda x: x[1], reverse=True)[:5] # Tampilkan 5 teratas
+        top = np.argsort(-tfidf_scores, kind='stable')[:5] # Tampilkan 5 teratas
         
         logger.info("  Top 5 Fitur TF-IDF:")
-        for feature, score in sorted_scores:
-            logger.info(f"    - '{feature}': {score:.4f}")
+        for j in top:
+            logger.info(f"    - '{feature_names[feature_index[j]]}': {tfidf_scores[j]:.4f}")
+
+def apply_smote(X_train, y_train):
+    """Menjalankan SMOTE dengan k_neighbors yang aman untuk kelas terkecil."""
+    distribution = Counter(y_train)
+    min_class_count = min(distribution.values()) if distribution else 1
+    k_neighbors_safe = max(1, min_class_count - 1)
+
+    smote = SMOTE(random_state=42, k_neighbors=k_neighbors_safe)
+    logger.info(f"SMOTE diinisialisasi dengan k_neighbors={k_neighbors_safe}")
+
+    return smote.fit_resample(X_train, y_train)
+
+def resolve_balancing(balancing=None, use_smote=False):
+    """Menentukan mode penyeimbangan; parameter lama use_smote dipakai jika balancing tidak diberikan."""
+    if balancing is None:
+        balancing = 'smote' if use_smote else 'none'
+    if balancing not in BALANCING_MODES:
+        raise ValueError(f"Mode penyeimbangan '{balancing}' tidak dikenal. Pilihan: {', '.join(BALANCING_MODES)}.")
+    return balancing
+
+def oversample_indices(y, random_state=42):
+    """
+    Random oversampling berbasis indeks: semua indeks asli ditambah indeks acak (dengan pengembalian)
+    dari setiap kelas minoritas sampai jumlahnya sama dengan kelas terbesar. Baris matriks tidak disalin.
+    """
+    rng = np.random.RandomState(random_state)
+    _, inverse, counts = np.unique(y, return_inverse=True, return_counts=True)
+    target = counts.max()
+    extra = [rng.choice(np.flatnonzero(inverse == i), target - count, replace=True)
+             for i, count in enumerate(counts) if count < target]
+    return np.concatenate([np.arange(len(y))] + extra)
+
+def balance_training_data(X_train, y_train, balancing):
+    """
+    Menjalankan mode penyeimbangan pada data latih. Mengembalikan matriks dan label untuk fit,
+    sample_weight dan class_prior untuk MultinomialNBFromScratch, serta distribusi kelas (efektif) setelahnya.
+    """
+    y_values = np.asarray(y_train)
+    result = {'X_train': X_train, 'y_train': y_train, 'sample_weight': None, 'class_prior': None}
+
+    if balancing == 'smote':
+        result['X_train'], result['y_train'] = apply_smote(X_train, y_train)
+        distribution = Counter(result['y_train'])
+    elif balancing == 'class_prior':
+        result['class_prior'] = 'uniform'
+        distribution = Counter(y_values)
+    elif balancing == 'sample_weight':
+        # Bobot 'balanced': n_sampel / (n_kelas * jumlah_kelas), sehingga total bobot setiap kelas sama.
+        classes, inverse, counts = np.unique(y_values, return_inverse=True, return_counts=True)
+        class_weights = len(y_values) / (len(classes) * counts)
+        result['sample_weight'] = class_weights[inverse]
+        distribution = {c: round(float(counts[i] * class_weights[i]), 2) for i, c in enumerate(classes)}
+    elif balancing == 'random_oversample':
+        indices = oversample_indices(y_values)
+        result['sample_weight'] = np.bincount(indices, minlength=len(y_values)).astype(np.float64)
+        distribution = Counter(y_values[indices])
+    else:
+        distribution = Counter(y_values)
 
-def extract_and_transform_features(train_df, test_df, use_smote=True):
-    """Melakukan ekstraksi fitur TF-IDF dan secara opsional menjalankan SMOTE."""
+    result['distribution_after'] = {str(label): (count if isinstance(count, float) else int(count))
+                                    for label, count in distribution.items()}
+    # Jumlah baris efektif: baris nyata (SMOTE) atau total salinan (random oversampling).
+    if balancing == 'random_oversample':
+        result['train_count_after'] = int(result['sample_weight'].sum())
+    else:
+        result['train_count_after'] = result['X_train'].shape[0]
+    return result
+
+def extract_and_transform_features(train_df, test_df, use_smote=True,
+                                   max_features=DEFAULT_MAX_FEATURES, ngram_range=DEFAULT_NGRAM_RANGE, balancing=None,
+                                   incremental=False, max_vocabulary=None):
+    """
+    Melakukan ekstraksi fitur TF-IDF dan secara opsional menyeimbangkan kelas data latih (SMOTE atau mode lain).
+    Jika incremental=True, vocabulary dan DF dari ekstraksi sebelumnya dipakai ulang dan hanya dokumen latih
+    yang baru ditokenisasi (lihat incremental_tfidf.py); vocabulary boleh tumbuh sampai max_vocabulary.
+    """
+    balancing = resolve_balancing(balancing, use_smote)
     if train_df.empty or test_df.empty:
         logger.warning("Data training atau testing kosong.")
         return None
@@ -80,75 +180,143 @@ def extract_and_transform_features(train_df, test_df, use_smote=True):
     train_count_before_smote = len(y_train)
     distribution_before = Counter(y_train)
 
-    logger.info("Menginisialisasi TF-IDF Vectorizer dengan n-gram (1, 2)...")
-    tfidf_vectorizer = TfidfVectorizer(max_features=5000, ngram_range=(1, 2))
-    
-    X_train_tfidf = tfidf_vectorizer.fit_transform(X_train)
+    incremental_stats = None
+    if incremental:
+        logger.info(f"Memperbarui TF-IDF inkremental dengan n-gram {ngram_range}, max_features={max_features}, max_vocabulary={max_vocabulary}...")
+        X_train_tfidf, tfidf_vectorizer, incremental_stats = update_incremental_features(
+            X_train, ngram_range, max_features, max_vocabulary
+        )
+    else:
+        logger.info(f"Menginisialisasi TF-IDF Vectorizer dengan n-gram {ngram_range}, max_features={max_features}...")
+        tfidf_vectorizer = TfidfVectorizer(max_features=max_features, ngram_range=ngram_range)
+        X_train_tfidf = tfidf_vectorizer.fit_transform(X_train)
     X_test_tfidf = tfidf_vectorizer.transform(X_test)
     
     logger.info(f"Ekstraksi fitur TF-IDF selesai. Jumlah fitur total: {len(tfidf_vectorizer.get_feature_names_out())}")
     log_extraction_details(tfidf_vectorizer, X_train_tfidf, X_train)
     
-    # --- PERUBAHAN: Logika SMOTE dibuat kondisional ---
-    if use_smote:
-        logger.info("\n" + "="*20 + " PROSES PENYEIMBANGAN DATA (SMOTE) " + "="*20)
-        logger.info(f"Distribusi kelas sebelum SMOTE: {distribution_before}")
-
-        min_class_count = min(distribution_before.values()) if distribution_before else 1
-        k_neighbors_safe = max(1, min_class_count - 1)
-        
-        smote = SMOTE(random_state=42, k_neighbors=k_neighbors_safe)
-        logger.info(f"SMOTE diinisialisasi dengan k_neighbors={k_neighbors_safe}")
-        
-        X_resampled_tfidf, y_resampled = smote.fit_resample(X_train_tfidf, y_train)
-        
-        distribution_after = Counter(y_resampled)
-        logger.info(f"Distribusi kelas setelah SMOTE: {distribution_after}")
+    # --- PERUBAHAN: Logika penyeimbangan dibuat kondisional (SMOTE atau mode tanpa baris sintetis) ---
+    if balancing != 'none':
+        logger.info("\n" + "="*20 + f" PROSES PENYEIMBANGAN DATA ({balancing.upper()}) " + "="*20)
+        logger.info(f"Distribusi kelas sebelum penyeimbangan: {distribution_before}")
     else:
         logger.info("\n" + "="*20 + " PROSES PENYEIMBANGAN DATA (DILEWATI) " + "="*20)
-        logger.info("SMOTE tidak diaktifkan.")
-        X_resampled_tfidf = X_train_tfidf
-        y_resampled = y_train
-        distribution_after = distribution_before # Distribusi tidak berubah
+        logger.info("Penyeimbangan kelas tidak diaktifkan.")
+    balancing_start = time.perf_counter()
+    balanced = balance_training_data(X_train_tfidf, y_train, balancing)
+    balancing_time = time.perf_counter() - balancing_start
+    distribution_after = balanced['distribution_after']
+    if balancing != 'none':
+        logger.info(f"Distribusi kelas setelah penyeimbangan: {distribution_after} ({balancing_time:.3f} detik)")
     # --- AKHIR PERUBAHAN ---
 
-    with open('tfidf_vectorizer.pkl', 'wb') as f:
-        pickle.dump(tfidf_vectorizer, f)
-    logger.info("Vectorizer TF-IDF berhasil disimpan.")
+    save_vectorizer(tfidf_vectorizer)
 
     return {
-        "X_train_tfidf": X_resampled_tfidf,
-        "y_train": y_resampled,
+        "X_train_tfidf": balanced['X_train'],
+        "y_train": balanced['y_train'],
+        "sample_weight": balanced['sample_weight'],
+        "class_prior": balanced['class_prior'],
         "X_test_tfidf": X_test_tfidf,
         "y_test": y_test,
         "vectorizer": tfidf_vectorizer,
         "X_test_text": X_test.tolist(),
+        "balancing": balancing,
+        "balancing_time": round(balancing_time, 4),
         "train_count_before_smote": train_count_before_smote,
+        "train_count_after": balanced['train_count_after'],
         "distribution_before": dict(distribution_before),
-        "distribution_after": dict(distribution_after)
+        "distribution_after": distribution_after,
+        "incremental_stats": incremental_stats
     }
 
-def main_feature_extraction_pipeline(use_smote=True):
-    """Pipeline utama untuk ekstraksi fitur, menerima parameter use_smote."""
+def save_vectorizer(tfidf_vectorizer):
+    """
+    Menyimpan vectorizer aktif sebagai artefak ringkas (vocabulary terurut + IDF) yang bisa di-mmap
+    dan dipakai untuk transformasi tanpa scikit-learn (lihat vectorizer_artifact.py).
+    """
+    save_vectorizer_artifact(tfidf_vectorizer, VECTORIZER_ARTIFACT_PATH)
+    logger.info("Vectorizer TF-IDF berhasil disimpan.")
+
+def update_term_index(cache_key, X_train_original, train_df, vectorizer):
+    """Membangun ulang indeks statistik term jika belum sesuai dengan hasil ekstraksi ini."""
+    if get_term_index_key() == cache_key:
+        return
+    try:
+        index = build_term_index(X_train_original, train_df['sentiment_pakar'], train_df['stemming'],
+                                 vectorizer.get_feature_names_out(), key=cache_key)
+        save_term_index(index)
+    except Exception as e:
+        # Indeks hanya untuk eksplorasi; kegagalan tidak menggagalkan ekstraksi.
+        logger.warning(f"Gagal membangun indeks term: {e}")
+
+def main_feature_extraction_pipeline(use_smote=True, max_features=DEFAULT_MAX_FEATURES,
+                                     ngram_range=DEFAULT_NGRAM_RANGE, use_cache=True, balancing=None,
+                                     incremental=False, max_vocabulary=None, save_to_store=True):
+    """
+    Pipeline utama untuk ekstraksi fitur, menerima parameter use_smote (atau balancing), max_features, dan ngram_range.
+    Jika use_cache=True dan isi 'pembagian_data' serta parameternya sama dengan run sebelumnya,
+    hasil diambil dari cache fitur tanpa menjalankan TF-IDF dan SMOTE ulang.
+    incremental=True memperbarui vocabulary/IDF dari ekstraksi sebelumnya alih-alih fit ulang penuh.
+    save_to_store=True menyimpan fitur ke feature store (lihat feature_store.py) dan mengembalikan 'feature_run_id'.
+    """
+    ngram_range = tuple(ngram_range)
+    balancing = resolve_balancing(balancing, use_smote)
     logger.info("="*50)
-    logger.info(f"MEMULAI PIPELINE EKSTRAKSI FITUR (use_smote={use_smote})")
+    logger.info(f"MEMULAI PIPELINE EKSTRAKSI FITUR (balancing={balancing}, max_features={max_features}, ngram_range={ngram_range})")
     logger.info("="*50)
     
     try:
-        db_url = f"mysql+pymysql://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['host']}/{DB_CONFIG['database']}"
-        engine = create_engine(db_url)
+        engine = create_engine_from_config()
 
         train_df, test_df = load_split_data_from_db(engine)
         if train_df is None or test_df is None:
             return {'success': False, 'error': 'Gagal memuat data. Jalankan pembagian data terlebih dahulu.'}
 
-        feature_results = extract_and_transform_features(train_df, test_df, use_smote=use_smote)
-        if not feature_results:
-            return {'success': False, 'error': 'Gagal melakukan ekstraksi fitur.'}
+        cache_params = {
+            'balancing': balancing,
+            'max_features': max_features,
+            'ngram_range': list(ngram_range)
+        }
+        if incremental:
+            # Hasil inkremental bergantung pada riwayat pembaruan, jadi dibedakan dari hasil fit penuh.
+            cache_params.update({'incremental': True, 'max_vocabulary': max_vocabulary})
+        cache_key = compute_cache_key(train_df, test_df, cache_params)
+        feature_results = load_features(cache_key) if use_cache else None
+        cache_hit = feature_results is not None
+        if cache_hit:
+            logger.info(f"Cache fitur ditemukan ({cache_key[:12]}), ekstraksi TF-IDF dan SMOTE dilewati.")
+            # Vectorizer aktif tetap diperbarui agar sesuai dengan fitur yang dipakai.
+            save_vectorizer(feature_results['vectorizer'])
+        else:
+            feature_results = extract_and_transform_features(
+                train_df, test_df, max_features=max_features, ngram_range=ngram_range, balancing=balancing,
+                incremental=incremental, max_vocabulary=max_vocabulary
+            )
+            if not feature_results:
+                return {'success': False, 'error': 'Gagal melakukan ekstraksi fitur.'}
+            if use_cache:
+                store_features(cache_key, feature_results)
 
-        train_count_after = feature_results['X_train_tfidf'].shape[0]
+        train_count_after = feature_results['train_count_after']
         train_count_before = feature_results['train_count_before_smote']
         smote_added_count = train_count_after - train_count_before
+
+        # Baris pertama matriks latih adalah data asli (baris sintetis SMOTE selalu ditambahkan di akhir).
+        update_term_index(cache_key, feature_results['X_train_tfidf'][:train_count_before], train_df,
+                          feature_results['vectorizer'])
+
+        feature_run_id = None
+        if save_to_store:
+            try:
+                # Data dan parameter yang sama (cache_key sama) tidak disimpan dua kali, termasuk setelah cache fitur
+                # lokal tidak lagi menyimpan hasilnya.
+                feature_run_id = find_feature_run(cache_key, engine)
+                if feature_run_id is None:
+                    feature_run_id = save_feature_run(feature_results, params=cache_params, cache_key=cache_key, engine=engine)
+            except Exception as e:
+                # Feature store bersifat tambahan; kegagalan tidak menggagalkan ekstraksi.
+                logger.warning(f"Gagal menyimpan fitur ke feature store: {e}")
         
         stats = {
             'total_data': len(train_df) + len(test_df),
@@ -158,7 +326,12 @@ def main_feature_extraction_pipeline(use_smote=True):
             'smote_added_count': smote_added_count,
             'feature_count': len(feature_results['vectorizer'].get_feature_names_out()),
             'distribution_before': feature_results['distribution_before'],
-            'distribution_after': feature_results['distribution_after']
+            'distribution_after': feature_results['distribution_after'],
+            'balancing': balancing,
+            'balancing_time': feature_results['balancing_time'],
+            'cache_hit': cache_hit,
+            'incremental': feature_results.get('incremental_stats'),
+            'feature_run_id': feature_run_id
         }
         
         logger.info("Pipeline ekstraksi fitur selesai.")
@@ -166,6 +339,8 @@ def main_feature_extraction_pipeline(use_smote=True):
         return {
             'success': True,
             'stats': stats,
+            'cache_key': cache_key,
+            'feature_run_id': feature_run_id,
             **feature_results
         }
 
@@ -173,5 +348,121 @@ def main_feature_extraction_pipeline(use_smote=True):
         logger.error(f"Error fatal dalam pipeline ekstraksi fitur: {e}", exc_info=True)
         return {'success': False, 'error': str(e)}
 
+# --- Mode Out-of-Core (Feature Hashing) ---
+# Vocabulary tidak perlu di-fit sehingga data latih dapat dibaca dan diubah menjadi fitur per chunk.
+# Bobot IDF dihitung dari document frequency per kolom hash pada pass pertama (aditif antar-chunk),
+# lalu setiap chunk diberi bobot TF-IDF dan dinormalisasi L2 seperti TfidfVectorizer.
+
+def create_hashing_vectorizer(n_features=HASHING_N_FEATURES, ngram_range=DEFAULT_NGRAM_RANGE):
+    """HashingVectorizer yang menghasilkan jumlah kata mentah; alternate_sign=False agar bobot tidak negatif untuk Naive Bayes."""
+    return HashingVectorizer(n_features=n_features, ngram_range=tuple(ngram_range), alternate_sign=False, norm=None)
+
+def iter_split_chunks(engine, data_type, chunk_size=HASHING_CHUNK_SIZE):
+    """Membaca 'pembagian_data' per chunk dengan server-side cursor sehingga tabel tidak dimuat sekaligus."""
+    query = text("""
+        SELECT teks AS stemming, sentiment_pakar
+        FROM pembagian_data
+        WHERE data_type = :data_type AND sentiment_pakar IS NOT NULL AND sentiment_pakar != ''
+    """)
+    with engine.connect().execution_options(stream_results=True) as conn:
+        for chunk in pd.read_sql(query, conn, params={'data_type': data_type}, chunksize=chunk_size):
+            yield chunk
+
+def compute_hashing_idf(engine, vectorizer, chunk_size=HASHING_CHUNK_SIZE):
+    """Pass pertama atas data latih: menghitung IDF per kolom hash, jumlah dokumen, dan distribusi kelas."""
+    document_frequency = np.zeros(vectorizer.n_features)
+    n_docs = 0
+    distribution = Counter()
+    for chunk in iter_split_chunks(engine, 'training', chunk_size):
+        counts = vectorizer.transform(chunk['stemming'])
+        # Setiap baris CSR sudah bebas duplikat, jadi jumlah kemunculan indeks = jumlah dokumen yang memuat fitur.
+        document_frequency += np.bincount(counts.indices, minlength=vectorizer.n_features)
+        n_docs += counts.shape[0]
+        distribution.update(chunk['sentiment_pakar'])
+    # Rumus IDF sama dengan TfidfVectorizer(smooth_idf=True).
+    idf = np.log((1 + n_docs) / (1 + document_frequency)) + 1
+    return idf, n_docs, distribution
+
+def transform_hashing_chunk(vectorizer, idf, texts):
+    """Mengubah satu chunk teks menjadi matriks TF-IDF (CSR) berdasarkan kolom hash."""
+    X = vectorizer.transform(texts)
+    X.data *= idf[X.indices]
+    return normalize(X, norm='l2', copy=False)
+
+class HashingTfidfTransformer:
+    """HashingVectorizer + IDF sebagai satu objek transform(texts) yang bisa disimpan bersama model."""
+    def __init__(self, vectorizer, idf):
+        self.vectorizer = vectorizer
+        self.idf = idf
+
+    def transform(self, texts):
+        return transform_hashing_chunk(self.vectorizer, self.idf, texts)
+
+def iter_hashed_features(engine, data_type, vectorizer, idf, chunk_size=HASHING_CHUNK_SIZE):
+    """Menghasilkan (X_chunk, y_chunk, teks_chunk) untuk setiap chunk 'training' atau 'testing'."""
+    for chunk in iter_split_chunks(engine, data_type, chunk_size):
+        X_chunk = transform_hashing_chunk(vectorizer, idf, chunk['stemming'])
+        yield X_chunk, chunk['sentiment_pakar'].to_numpy(), chunk['stemming'].tolist()
+
+def main_hashing_extraction_pipeline(n_features=HASHING_N_FEATURES, ngram_range=DEFAULT_NGRAM_RANGE,
+                                     chunk_size=HASHING_CHUNK_SIZE, balancing='none'):
+    """
+    Pipeline ekstraksi fitur out-of-core. Hanya IDF (satu array sepanjang n_features) yang dihitung di awal;
+    fitur data latih/uji dikembalikan sebagai generator per chunk sehingga memori dibatasi ukuran chunk.
+    balancing: hanya HASHING_BALANCING_MODES; 'class_prior' menghasilkan prior seragam dan 'sample_weight'
+    bobot per kelas (dari distribusi kelas pass IDF) yang diterapkan per chunk saat pelatihan.
+    'smote' dan 'random_oversample' ditolak karena membutuhkan seluruh data latih sekaligus.
+    """
+    logger.info("="*50)
+    logger.info(f"MEMULAI PIPELINE EKSTRAKSI FITUR OUT-OF-CORE (n_features={n_features}, chunk_size={chunk_size}, balancing={balancing})")
+    logger.info("="*50)
+
+    if balancing not in HASHING_BALANCING_MODES:
+        return {'success': False, 'error': f"Mode penyeimbangan '{balancing}' tidak didukung pada mode hashing. "
+                                           f"Pilihan: {', '.join(HASHING_BALANCING_MODES)}."}
+    try:
+        engine = create_engine_from_config()
+        vectorizer = create_hashing_vectorizer(n_features, ngram_range)
+        idf, n_train, distribution = compute_hashing_idf(engine, vectorizer, chunk_size)
+        if n_train == 0:
+            return {'success': False, 'error': 'Gagal memuat data. Jalankan pembagian data terlebih dahulu.'}
+        logger.info(f"IDF dihitung dari {n_train} dokumen latih. Distribusi kelas: {dict(distribution)}")
+
+        class_prior, class_weights, distribution_after = None, None, dict(distribution)
+        if balancing == 'class_prior':
+            class_prior = 'uniform'
+        elif balancing == 'sample_weight':
+            # Bobot 'balanced' sama seperti balance_training_data: n_sampel / (n_kelas * jumlah_kelas).
+            class_weights = {c: n_train / (len(distribution) * count) for c, count in distribution.items()}
+            distribution_after = {c: round(count * class_weights[c], 2) for c, count in distribution.items()}
+
+        stats = {
+            'train_data_count_before': n_train,
+            'train_data_count_after': n_train,
+            'smote_added_count': 0,
+            'feature_count': n_features,
+            'distribution_before': dict(distribution),
+            'distribution_after': distribution_after,
+            'balancing': balancing
+        }
+        return {
+            'success': True,
+            'mode': 'hashing',
+            'stats': stats,
+            'balancing': balancing,
+            'class_prior': class_prior,
+            'class_weights': class_weights,
+            'classes': sorted(distribution),
+            'vectorizer': vectorizer,
+            'idf': idf,
+            'transformer': HashingTfidfTransformer(vectorizer, idf),
+            'train_chunks': iter_hashed_features(engine, 'training', vectorizer, idf, chunk_size),
+            'test_chunks': iter_hashed_features(engine, 'testing', vectorizer, idf, chunk_size)
+        }
+
+    except Exception as e:
+        logger.error(f"Error fatal dalam pipeline ekstraksi fitur out-of-core: {e}", exc_info=True)
+        return {'success': False, 'error': str(e)}
+
 if __name__ == '__main__':
     main_feature_extraction_pipeline(use_smote=True)
@@ -0,0 +1,107 @@
+# --- Cache Hasil Ekstraksi Fitur (TF-IDF) ---
+# Hasil ekstraksi (matriks sparse latih/uji, label, dan vectorizer yang sudah di-fit) disimpan di disk
+# dengan kunci hash isi 'pembagian_data' + parameter ekstraksi. /proses-ekstraksi dan /latih-dan-evaluasi
+# yang dijalankan dengan data dan parameter yang sama langsung memakai hasil ini tanpa TF-IDF/SMOTE ulang.
+import os
+import json
+import pickle
+import shutil
+import hashlib
+import logging
+import pandas as pd
+import scipy.sparse as sp
+
+logger = logging.getLogger(__name__)
+
+FEATURE_CACHE_DIR = os.path.join('cache', 'features')
+# Versi format entri; naikkan jika isi entri berubah agar entri lama tidak terbaca.
+FEATURE_CACHE_FORMAT_VERSION = 2
+# Batas cache: entri yang paling lama tidak dipakai dihapus lebih dulu (LRU).
+FEATURE_CACHE_MAX_ENTRIES = 8
+FEATURE_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+# Nama file matriks sparse di dalam satu entri cache.
+_MATRIX_FILES = {'X_train_tfidf': 'X_train.npz', 'X_test_tfidf': 'X_test.npz'}
+_META_FILE = 'meta.pkl'
+
+def compute_cache_key(train_df, test_df, params):
+    """
+    Menghitung kunci cache dari isi data latih/uji (teks + label, sesuai urutan) dan parameter ekstraksi.
+    hash_pandas_object bersifat deterministik antar-proses sehingga kunci tetap sama setelah restart.
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps({'format_version': FEATURE_CACHE_FORMAT_VERSION, **params}, sort_keys=True).encode('utf-8'))
+    for part in (train_df, test_df):
+        digest.update(str(len(part)).encode('utf-8'))
+        hashes = pd.util.hash_pandas_object(part[['stemming', 'sentiment_pakar']], index=False)
+        digest.update(hashes.to_numpy().tobytes())
+    return digest.hexdigest()
+
+def _entry_path(key):
+    return os.path.join(FEATURE_CACHE_DIR, key)
+
+def load_features(key):
+    """Memuat entri cache; mengembalikan None jika tidak ada atau rusak."""
+    path = _entry_path(key)
+    if not os.path.isdir(path):
+        return None
+    try:
+        with open(os.path.join(path, _META_FILE), 'rb') as f:
+            result = pickle.load(f)
+        for name, filename in _MATRIX_FILES.items():
+            result[name] = sp.load_npz(os.path.join(path, filename))
+    except Exception as e:
+        logger.warning(f"Entri cache fitur {key[:12]} rusak, akan dibuat ulang: {e}")
+        shutil.rmtree(path, ignore_errors=True)
+        return None
+    # Memperbarui mtime sebagai penanda terakhir dipakai (dasar urutan LRU).
+    os.utime(path)
+    return result
+
+def store_features(key, result):
+    """Menyimpan hasil ekstraksi sebagai entri cache baru lalu menjalankan eviction."""
+    path = _entry_path(key)
+    # Ditulis ke folder sementara lalu di-rename agar pembaca tidak melihat entri setengah jadi.
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(tmp_path, exist_ok=True)
+        for name, filename in _MATRIX_FILES.items():
+            sp.save_npz(os.path.join(tmp_path, filename), sp.csr_matrix(result[name]))
+        meta = {k: v for k, v in result.items() if k not in _MATRIX_FILES}
+        with open(os.path.join(tmp_path, _META_FILE), 'wb') as f:
+            pickle.dump(meta, f, protocol=pickle.HIGHEST_PROTOCOL)
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp_path, path)
+        logger.info(f"Hasil ekstraksi disimpan ke cache fitur ({key[:12]}).")
+    except Exception as e:
+        logger.warning(f"Gagal menyimpan cache fitur: {e}")
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        return
+    evict_features()
+
+def _entry_size(path):
+    return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+
+def evict_features(max_entries=FEATURE_CACHE_MAX_ENTRIES, max_bytes=FEATURE_CACHE_MAX_BYTES):
+    """Menghapus entri yang paling lama tidak dipakai sampai jumlah dan ukuran cache di bawah batas."""
+    if not os.path.isdir(FEATURE_CACHE_DIR):
+        return
+    entries = [entry for entry in os.scandir(FEATURE_CACHE_DIR) if entry.is_dir() and not entry.name.endswith('.tmp')]
+    # Terbaru dipakai lebih dulu.
+    entries.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+    kept = 0
+    total_bytes = 0
+    for entry in entries:
+        size = _entry_size(entry.path)
+        # Entri terbaru selalu dipertahankan walaupun ukurannya melebihi batas.
+        if kept > 0 and (kept >= max_entries or total_bytes + size > max_bytes):
+            shutil.rmtree(entry.path, ignore_errors=True)
+            logger.info(f"Entri cache fitur {entry.name[:12]} dihapus (LRU).")
+            continue
+        kept += 1
+        total_bytes += size
+
+def clear_feature_cache():
+    """Menghapus seluruh cache fitur (dipanggil saat hasil ekstraksi dihapus)."""
+    shutil.rmtree(FEATURE_CACHE_DIR, ignore_errors=True)
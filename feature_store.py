@@ -0,0 +1,316 @@
+# --- Feature Store (Hasil Ekstraksi TF-IDF di Database) ---
+# Setiap run ekstraksi disimpan dengan run_id: matriks sparse latih/uji dipecah per chunk baris, dan setiap chunk
+# disimpan sebagai array CSR biner (indptr/indices/data, dikompresi zlib) di tabel MySQL. Proses lain (halaman
+# klasifikasi, worker lain, skrip offline) dapat memuat fitur langsung ke scipy.sparse tanpa ekstraksi ulang
+# dan tanpa konversi teks. Vectorizer hasil fit ikut disimpan agar model yang dilatih dari run ini bisa
+# memprediksi teks baru. Hanya FEATURE_STORE_MAX_RUNS run terbaru yang dipertahankan.
+import json
+import zlib
+import pickle
+import uuid
+import logging
+from datetime import datetime
+import numpy as np
+import scipy.sparse as sp
+from sqlalchemy import create_engine, text
+from config import DB_CONFIG
+
+logger = logging.getLogger(__name__)
+
+FEATURE_RUN_TABLE = 'fitur_run'
+FEATURE_CHUNK_TABLE = 'fitur_chunk'
+# Jumlah baris per chunk; satu chunk = satu baris tabel (jaga di bawah max_allowed_packet MySQL).
+FEATURE_STORE_CHUNK_ROWS = 5000
+SPLITS = ('training', 'testing')
+# Jumlah run terbaru yang disimpan; run yang lebih lama dihapus setiap kali run baru disimpan.
+FEATURE_STORE_MAX_RUNS = 10
+
+_CREATE_TABLES = (
+    f"""
+    CREATE TABLE IF NOT EXISTS {FEATURE_RUN_TABLE} (
+        run_id VARCHAR(32) NOT NULL PRIMARY KEY,
+        created_at DATETIME NOT NULL,
+        cache_key VARCHAR(64) NULL,
+        params TEXT NOT NULL,
+        n_features INT NOT NULL,
+        train_rows INT NOT NULL,
+        test_rows INT NOT NULL,
+        feature_names LONGBLOB NULL,
+        vectorizer LONGBLOB NULL,
+        KEY idx_fitur_run_cache_key (cache_key),
+        KEY idx_fitur_run_created (created_at)
+    )
+    """,
+    f"""
+    CREATE TABLE IF NOT EXISTS {FEATURE_CHUNK_TABLE} (
+        run_id VARCHAR(32) NOT NULL,
+        split VARCHAR(16) NOT NULL,
+        chunk_no INT NOT NULL,
+        n_rows INT NOT NULL,
+        nnz INT NOT NULL,
+        data_dtype VARCHAR(8) NOT NULL,
+        indptr LONGBLOB NOT NULL,
+        indices LONGBLOB NOT NULL,
+        data LONGBLOB NOT NULL,
+        labels LONGBLOB NOT NULL,
+        sample_weight LONGBLOB NULL,
+        texts LONGBLOB NULL,
+        PRIMARY KEY (run_id, split, chunk_no)
+    )
+    """
+)
+
+def create_store_engine():
+    db_url = f"mysql+pymysql://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['host']}/{DB_CONFIG['database']}"
+    return create_engine(db_url)
+
+def ensure_tables(engine):
+    with engine.begin() as conn:
+        for statement in _CREATE_TABLES:
+            conn.execute(text(statement))
+        # Tabel yang dibuat versi sebelumnya belum punya kolom vectorizer.
+        columns = {row[0] for row in conn.execute(text(f"SHOW COLUMNS FROM {FEATURE_RUN_TABLE}"))}
+        if 'vectorizer' not in columns:
+            conn.execute(text(f"ALTER TABLE {FEATURE_RUN_TABLE} ADD COLUMN vectorizer LONGBLOB NULL"))
+
+def _pack_array(values, dtype):
+    return zlib.compress(np.ascontiguousarray(values, dtype=dtype).tobytes(), 1)
+
+def _unpack_array(blob, dtype):
+    return np.frombuffer(zlib.decompress(blob), dtype=dtype)
+
+def _pack_json(values):
+    return zlib.compress(json.dumps(values).encode('utf-8'), 1)
+
+def _unpack_json(blob):
+    return json.loads(zlib.decompress(blob).decode('utf-8'))
+
+def _to_list(values):
+    return values.tolist() if hasattr(values, 'tolist') else list(values)
+
+def encode_chunks(X, labels, sample_weight=None, texts=None, chunk_rows=FEATURE_STORE_CHUNK_ROWS, data_dtype='<f8'):
+    """Memecah matriks CSR menjadi chunk baris; setiap chunk berisi array CSR lokal (indptr dimulai dari 0)."""
+    X = sp.csr_matrix(X)
+    labels = _to_list(labels)
+    texts = _to_list(texts) if texts is not None else None
+    for chunk_no, start in enumerate(range(0, X.shape[0], chunk_rows)):
+        end = min(start + chunk_rows, X.shape[0])
+        begin, finish = X.indptr[start], X.indptr[end]
+        yield {
+            'chunk_no': chunk_no,
+            'n_rows': end - start,
+            'nnz': int(finish - begin),
+            'data_dtype': data_dtype,
+            'indptr': _pack_array(X.indptr[start:end + 1] - begin, '<i8'),
+            'indices': _pack_array(X.indices[begin:finish], '<i4'),
+            'data': _pack_array(X.data[begin:finish], data_dtype),
+            'labels': _pack_json([str(label) for label in labels[start:end]]),
+            'sample_weight': _pack_array(sample_weight[start:end], '<f8') if sample_weight is not None else None,
+            'texts': _pack_json(texts[start:end]) if texts is not None else None
+        }
+
+def decode_chunks(rows, n_features):
+    """Menggabungkan chunk (urut chunk_no) menjadi satu matriks CSR beserta label, bobot, dan teks."""
+    indptr_parts, indices_parts, data_parts = [], [], []
+    labels, weights, texts = [], [], []
+    offset = 0
+    has_weights = has_texts = True
+    for row in rows:
+        indptr = _unpack_array(row.indptr, '<i8')
+        indptr_parts.append(indptr[:-1] + offset)
+        offset += int(indptr[-1])
+        indices_parts.append(_unpack_array(row.indices, '<i4'))
+        data_parts.append(_unpack_array(row.data, row.data_dtype))
+        labels.extend(_unpack_json(row.labels))
+        has_weights = has_weights and row.sample_weight is not None
+        if has_weights:
+            weights.append(_unpack_array(row.sample_weight, '<f8'))
+        has_texts = has_texts and row.texts is not None
+        if has_texts:
+            texts.extend(_unpack_json(row.texts))
+    indptr_parts.append(np.array([offset], dtype=np.int64))
+    data = np.concatenate(data_parts) if data_parts else np.zeros(0)
+    X = sp.csr_matrix((data, np.concatenate(indices_parts) if indices_parts else np.zeros(0, dtype=np.int32),
+                       np.concatenate(indptr_parts)), shape=(len(labels), n_features))
+    return {
+        'X': X,
+        'labels': np.array(labels, dtype=object),
+        'sample_weight': np.concatenate(weights) if has_weights and weights else None,
+        'texts': texts if has_texts else None
+    }
+
+def save_feature_run(result, params=None, cache_key=None, run_id=None, engine=None,
+                     chunk_rows=FEATURE_STORE_CHUNK_ROWS, data_dtype='<f8'):
+    """
+    Menyimpan hasil ekstraksi (format main_feature_extraction_pipeline) sebagai satu run feature store.
+    Data latih yang disimpan adalah data setelah penyeimbangan (yang dipakai fit), beserta sample_weight-nya.
+    Semua chunk ditulis dalam satu transaksi sehingga run tidak pernah terbaca setengah jadi.
+    Setelah run tersimpan, run lama di luar FEATURE_STORE_MAX_RUNS terbaru dihapus.
+    """
+    engine = engine or create_store_engine()
+    ensure_tables(engine)
+    run_id = run_id or uuid.uuid4().hex
+    X_train, X_test = result['X_train_tfidf'], result['X_test_tfidf']
+    vectorizer = result.get('vectorizer')
+    feature_names = result.get('feature_names')
+    if feature_names is None and vectorizer is not None:
+        feature_names = vectorizer.get_feature_names_out()
+    stored_params = {
+        **(params or {}),
+        'class_prior': result.get('class_prior'),
+        'balancing': result.get('balancing'),
+        'distribution_before': result.get('distribution_before'),
+        'distribution_after': result.get('distribution_after'),
+        'train_count_before_smote': result.get('train_count_before_smote')
+    }
+
+    insert_chunk = text(f"""
+        INSERT INTO {FEATURE_CHUNK_TABLE}
+            (run_id, split, chunk_no, n_rows, nnz, data_dtype, indptr, indices, data, labels, sample_weight, texts)
+        VALUES
+            (:run_id, :split, :chunk_no, :n_rows, :nnz, :data_dtype, :indptr, :indices, :data, :labels, :sample_weight, :texts)
+    """)
+    with engine.begin() as conn:
+        conn.execute(text(f"DELETE FROM {FEATURE_CHUNK_TABLE} WHERE run_id = :run_id"), {'run_id': run_id})
+        conn.execute(text(f"DELETE FROM {FEATURE_RUN_TABLE} WHERE run_id = :run_id"), {'run_id': run_id})
+        conn.execute(text(f"""
+            INSERT INTO {FEATURE_RUN_TABLE}
+                (run_id, created_at, cache_key, params, n_features, train_rows, test_rows, feature_names, vectorizer)
+            VALUES
+                (:run_id, :created_at, :cache_key, :params, :n_features, :train_rows, :test_rows, :feature_names, :vectorizer)
+        """), {
+            'run_id': run_id,
+            'created_at': datetime.now(),
+            'cache_key': cache_key,
+            'params': json.dumps(stored_params, default=str),
+            'n_features': int(X_train.shape[1]),
+            'train_rows': int(X_train.shape[0]),
+            'test_rows': int(X_test.shape[0]),
+            'feature_names': _pack_json(_to_list(feature_names)) if feature_names is not None else None,
+            'vectorizer': zlib.compress(pickle.dumps(vectorizer, protocol=pickle.HIGHEST_PROTOCOL), 1)
+                          if vectorizer is not None else None
+        })
+        splits = {
+            'training': encode_chunks(X_train, result['y_train'], result.get('sample_weight'),
+                                      chunk_rows=chunk_rows, data_dtype=data_dtype),
+            'testing': encode_chunks(X_test, result['y_test'], texts=result.get('X_test_text'),
+                                     chunk_rows=chunk_rows, data_dtype=data_dtype)
+        }
+        for split, chunks in splits.items():
+            for chunk in chunks:
+                conn.execute(insert_chunk, {'run_id': run_id, 'split': split, **chunk})
+    logger.info(f"Fitur run {run_id} disimpan ke feature store ({X_train.shape[0]} baris latih, {X_test.shape[0]} baris uji).")
+    prune_feature_runs(engine=engine)
+    return run_id
+
+def find_feature_run(cache_key, engine=None):
+    """run_id terbaru untuk cache_key tertentu, atau None."""
+    engine = engine or create_store_engine()
+    ensure_tables(engine)
+    with engine.connect() as conn:
+        return conn.execute(text(f"""
+            SELECT run_id FROM {FEATURE_RUN_TABLE} WHERE cache_key = :cache_key ORDER BY created_at DESC LIMIT 1
+        """), {'cache_key': cache_key}).scalar()
+
+def list_feature_runs(limit=20, engine=None):
+    engine = engine or create_store_engine()
+    ensure_tables(engine)
+    with engine.connect() as conn:
+        rows = conn.execute(text(f"""
+            SELECT run_id, created_at, cache_key, params, n_features, train_rows, test_rows
+            FROM {FEATURE_RUN_TABLE} ORDER BY created_at DESC LIMIT :limit
+        """), {'limit': int(limit)}).mappings().all()
+    return [{**row, 'created_at': row['created_at'].isoformat(), 'params': json.loads(row['params'])} for row in rows]
+
+def load_feature_run(run_id=None, engine=None, splits=SPLITS):
+    """
+    Memuat satu run (run_id None = run terbaru) ke format hasil ekstraksi: matriks CSR latih/uji,
+    label, sample_weight, class_prior, teks uji, nama fitur, dan vectorizer (None untuk run lama yang
+    disimpan tanpa vectorizer). Mengembalikan None jika run tidak ada.
+    """
+    engine = engine or create_store_engine()
+    ensure_tables(engine)
+    with engine.connect() as conn:
+        if run_id is None:
+            run = conn.execute(text(f"SELECT * FROM {FEATURE_RUN_TABLE} ORDER BY created_at DESC LIMIT 1")).mappings().first()
+        else:
+            run = conn.execute(text(f"SELECT * FROM {FEATURE_RUN_TABLE} WHERE run_id = :run_id"),
+                               {'run_id': run_id}).mappings().first()
+        if run is None:
+            return None
+        params = json.loads(run['params'])
+        loaded = {}
+        for split in splits:
+            # Server-side cursor: chunk dibaca berurutan tanpa menampung seluruh hasil query di klien.
+            rows = conn.execution_options(stream_results=True).execute(text(f"""
+                SELECT n_rows, data_dtype, indptr, indices, data, labels, sample_weight, texts
+                FROM {FEATURE_CHUNK_TABLE} WHERE run_id = :run_id AND split = :split ORDER BY chunk_no
+            """), {'run_id': run['run_id'], 'split': split})
+            loaded[split] = decode_chunks(rows, run['n_features'])
+
+    result = {
+        'run_id': run['run_id'],
+        'cache_key': run['cache_key'],
+        'params': params,
+        'class_prior': params.get('class_prior'),
+        'balancing': params.get('balancing'),
+        'distribution_before': params.get('distribution_before'),
+        'distribution_after': params.get('distribution_after'),
+        'train_count_before_smote': params.get('train_count_before_smote'),
+        'feature_names': np.array(_unpack_json(run['feature_names']), dtype=object) if run['feature_names'] else None,
+        'vectorizer': pickle.loads(zlib.decompress(run['vectorizer'])) if run['vectorizer'] else None
+    }
+    if 'training' in loaded:
+        result.update({
+            'X_train_tfidf': loaded['training']['X'],
+            'y_train': loaded['training']['labels'],
+            'sample_weight': loaded['training']['sample_weight'],
+            'train_count_after': loaded['training']['X'].shape[0]
+        })
+    if 'testing' in loaded:
+        result.update({
+            'X_test_tfidf': loaded['testing']['X'],
+            'y_test': loaded['testing']['labels'],
+            'X_test_text': loaded['testing']['texts'] or []
+        })
+    logger.info(f"Fitur run {run['run_id']} dimuat dari feature store.")
+    return result
+
+def delete_feature_run(run_id, engine=None):
+    engine = engine or create_store_engine()
+    ensure_tables(engine)
+    with engine.begin() as conn:
+        conn.execute(text(f"DELETE FROM {FEATURE_CHUNK_TABLE} WHERE run_id = :run_id"), {'run_id': run_id})
+        conn.execute(text(f"DELETE FROM {FEATURE_RUN_TABLE} WHERE run_id = :run_id"), {'run_id': run_id})
+
+def prune_feature_runs(keep=FEATURE_STORE_MAX_RUNS, engine=None):
+    """Menghapus semua run kecuali `keep` run terbaru (keep=0 mengosongkan feature store). Mengembalikan jumlah run yang dihapus."""
+    engine = engine or create_store_engine()
+    ensure_tables(engine)
+    with engine.connect() as conn:
+        run_ids = conn.execute(text(f"SELECT run_id FROM {FEATURE_RUN_TABLE} ORDER BY created_at DESC")).scalars().all()
+    for run_id in run_ids[keep:]:
+        delete_feature_run(run_id, engine)
+    if run_ids[keep:]:
+        logger.info(f"{len(run_ids[keep:])} fitur run lama dihapus dari feature store.")
+    return len(run_ids[keep:])
+
+
+# Blok ini menampilkan daftar run atau memuat satu run untuk skrip offline, contoh:
+#   python feature_store.py              -> daftar run terbaru
+#   python feature_store.py <run_id>     -> muat run dan tampilkan ukuran matriks serta waktu muat
+if __name__ == '__main__':
+    import sys
+    import time
+
+    if len(sys.argv) < 2:
+        for run in list_feature_runs():
+            print(f"{run['run_id']}  {run['created_at']}  latih={run['train_rows']} uji={run['test_rows']} fitur={run['n_features']}")
+    else:
+        start = time.perf_counter()
+        features = load_feature_run(sys.argv[1])
+        if features is None:
+            raise SystemExit(f"Run '{sys.argv[1]}' tidak ditemukan.")
+        print(f"X_train {features['X_train_tfidf'].shape} nnz={features['X_train_tfidf'].nnz} | "
+              f"X_test {features['X_test_tfidf'].shape} nnz={features['X_test_tfidf'].nnz} | "
+              f"dimuat dalam {time.perf_counter() - start:.3f} detik")
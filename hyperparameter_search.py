@@ -0,0 +1,226 @@
+# --- Pencarian Hyperparameter (Ekstraksi TF-IDF + Naive Bayes) ---
+# Mengevaluasi kombinasi max_features, ngram_range, min_df, mode penyeimbangan (balancing), dan alpha secara paralel.
+# Tokenisasi dan penghitungan n-gram dilakukan sekali per ngram_range (CountVectorizer dengan vocabulary penuh);
+# setiap konfigurasi cukup memilih kolom (min_df/max_features) lalu memberi bobot TF-IDF, dengan hasil yang sama
+# seperti TfidfVectorizer(max_features, ngram_range, min_df) yang di-fit ulang dari teks.
+import time
+import logging
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from sklearn.feature_extraction.text import CountVectorizer, TfidfTransformer
+from sklearn.metrics import accuracy_score, f1_score
+
+from ekstraksi import (load_split_data_from_db, create_engine_from_config, balance_training_data, resolve_balancing,
+                       DEFAULT_MAX_FEATURES, DEFAULT_NGRAM_RANGE)
+from model_naive_bayes import MultinomialNBFromScratch
+
+logger = logging.getLogger(__name__)
+
+# Grid bawaan untuk parameter yang tidak dikirim.
+DEFAULT_GRID = {
+    'max_features': [DEFAULT_MAX_FEATURES],
+    'ngram_range': [DEFAULT_NGRAM_RANGE],
+    'min_df': [1],
+    'balancing': ['none'],
+    'alpha': [1.0]
+}
+# Batas jumlah kombinasi agar satu request tidak berjalan terlalu lama.
+MAX_COMBINATIONS = 200
+
+def _parse_min_df(value):
+    # Nilai < 1 adalah proporsi dokumen, selain itu jumlah dokumen minimum.
+    value = float(value)
+    return value if value < 1 else int(value)
+
+def normalize_grid(grid):
+    """Melengkapi grid dengan nilai bawaan dan menyeragamkan tipe setiap parameter."""
+    grid = dict(grid or {})
+    # Grid lama dengan 'use_smote' dipetakan ke mode penyeimbangan 'smote'/'none'.
+    if 'balancing' not in grid and 'use_smote' in grid:
+        grid['balancing'] = [resolve_balancing(None, value) for value in grid['use_smote']]
+    grid = {**DEFAULT_GRID, **{key: value for key, value in grid.items() if key in DEFAULT_GRID}}
+    return {
+        # 0/None berarti semua fitur dipakai, sama seperti TfidfVectorizer(max_features=None).
+        'max_features': [int(value) if value else None for value in grid['max_features']],
+        'ngram_range': [tuple(int(n) for n in value) for value in grid['ngram_range']],
+        'min_df': [_parse_min_df(value) for value in grid['min_df']],
+        'balancing': [resolve_balancing(value) for value in grid['balancing']],
+        'alpha': [float(value) for value in grid['alpha']]
+    }
+
+def count_ngrams(train_texts, test_texts, ngram_ranges):
+    """Tokenisasi sekali per ngram_range: matriks hitungan latih/uji dengan vocabulary penuh dari data latih."""
+    counts = {}
+    for ngram_range in ngram_ranges:
+        counter = CountVectorizer(ngram_range=ngram_range)
+        X_train_counts = counter.fit_transform(train_texts)
+        X_test_counts = counter.transform(test_texts)
+        counts[ngram_range] = (X_train_counts.tocsc(), X_test_counts.tocsc())
+        logger.info(f"n-gram {ngram_range}: {X_train_counts.shape[1]} term dalam vocabulary penuh.")
+    return counts
+
+def select_features(X_train_counts, min_df, max_features):
+    """
+    Memilih kolom dengan aturan TfidfVectorizer: buang term dengan document frequency < min_df,
+    lalu ambil max_features term dengan frekuensi total tertinggi. Urutan kolom asli (urutan term) dipertahankan.
+    """
+    n_docs = X_train_counts.shape[0]
+    document_frequency = np.diff(X_train_counts.indptr)
+    min_doc_count = min_df if isinstance(min_df, int) else min_df * n_docs
+    candidates = np.flatnonzero(document_frequency >= min_doc_count)
+    if max_features is not None and len(candidates) > max_features:
+        term_frequency = np.asarray(X_train_counts[:, candidates].sum(axis=0)).ravel()
+        top = np.argsort(-term_frequency, kind='stable')[:max_features]
+        candidates = np.sort(candidates[top])
+    return candidates
+
+# Data bersama milik proses worker, diisi sekali oleh _init_worker.
+_worker_data = None
+
+def _init_worker(counts, y_train, y_test):
+    global _worker_data
+    _worker_data = (counts, y_train, y_test)
+
+def _evaluate_feature_config(config):
+    """
+    Worker: membangun fitur untuk satu (ngram_range, min_df, max_features, balancing) lalu melatih
+    Naive Bayes untuk setiap alpha; fitur dan hasil penyeimbangan dipakai bersama oleh semua alpha.
+    """
+    counts, y_train, y_test = _worker_data
+    X_train_counts, X_test_counts = counts[config['ngram_range']]
+    params = {
+        'max_features': config['max_features'],
+        'ngram_range': list(config['ngram_range']),
+        'min_df': config['min_df'],
+        'balancing': config['balancing']
+    }
+
+    extraction_start = time.perf_counter()
+    columns = select_features(X_train_counts, config['min_df'], config['max_features'])
+    if len(columns) == 0:
+        return [{**params, 'alpha': alpha, 'error': 'Tidak ada fitur yang memenuhi min_df.'} for alpha in config['alphas']]
+    transformer = TfidfTransformer()
+    X_train = transformer.fit_transform(X_train_counts[:, columns].tocsr())
+    X_test = transformer.transform(X_test_counts[:, columns].tocsr())
+    balancing_start = time.perf_counter()
+    balanced = balance_training_data(X_train, y_train, config['balancing'])
+    balancing_time = time.perf_counter() - balancing_start
+    extraction_time = time.perf_counter() - extraction_start
+
+    results = []
+    for alpha in config['alphas']:
+        fit_start = time.perf_counter()
+        model = MultinomialNBFromScratch(alpha=alpha, class_prior=balanced['class_prior'])
+        model.fit(balanced['X_train'], balanced['y_train'], sample_weight=balanced['sample_weight'])
+        fit_time = time.perf_counter() - fit_start
+
+        predict_start = time.perf_counter()
+        y_pred = model.predict(X_test)
+        predict_time = time.perf_counter() - predict_start
+
+        results.append({
+            **params,
+            'alpha': alpha,
+            'feature_count': int(len(columns)),
+            'accuracy': round(float(accuracy_score(y_test, y_pred)), 4),
+            'macro_f1': round(float(f1_score(y_test, y_pred, average='macro', zero_division=0)), 4),
+            'train_count': balanced['train_count_after'],
+            'extraction_time': round(extraction_time, 4),
+            'balancing_time': round(balancing_time, 4),
+            'fit_time': round(fit_time, 4),
+            'predict_time': round(predict_time, 4)
+        })
+    return results
+
+def run_hyperparameter_search(grid=None, n_workers=None):
+    """
+    Menjalankan pencarian grid pada data 'pembagian_data' dan mengembalikan leaderboard
+    yang diurutkan berdasarkan macro-F1 lalu akurasi.
+    """
+    try:
+        grid = normalize_grid(grid)
+        n_combinations = int(np.prod([len(values) for values in grid.values()]))
+        if n_combinations == 0:
+            return {'success': False, 'error': 'Grid hyperparameter kosong.'}
+        if n_combinations > MAX_COMBINATIONS:
+            return {'success': False, 'error': f'Jumlah kombinasi ({n_combinations}) melebihi batas {MAX_COMBINATIONS}.'}
+
+        start_time = time.perf_counter()
+        train_df, test_df = load_split_data_from_db(create_engine_from_config())
+        if train_df is None or test_df is None or train_df.empty or test_df.empty:
+            return {'success': False, 'error': 'Gagal memuat data. Jalankan pembagian data terlebih dahulu.'}
+
+        logger.info(f"Pencarian hyperparameter: {n_combinations} kombinasi.")
+        counts = count_ngrams(train_df['stemming'], test_df['stemming'], grid['ngram_range'])
+        y_train = train_df['sentiment_pakar'].to_numpy()
+        y_test = test_df['sentiment_pakar'].to_numpy()
+
+        # Satu tugas per konfigurasi fitur; semua alpha dievaluasi di dalam tugas yang sama.
+        configs = [
+            {'ngram_range': ngram_range, 'max_features': max_features, 'min_df': min_df,
+             'balancing': balancing, 'alphas': grid['alpha']}
+            for ngram_range, max_features, min_df, balancing in itertools.product(
+                grid['ngram_range'], grid['max_features'], grid['min_df'], grid['balancing'])
+        ]
+
+        leaderboard = []
+        if n_workers == 1 or len(configs) == 1:
+            _init_worker(counts, y_train, y_test)
+            for config in configs:
+                leaderboard.extend(_evaluate_feature_config(config))
+        else:
+            with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                                     initargs=(counts, y_train, y_test)) as executor:
+                for results in executor.map(_evaluate_feature_config, configs):
+                    leaderboard.extend(results)
+
+        leaderboard.sort(key=lambda row: (row.get('macro_f1', -1), row.get('accuracy', -1)), reverse=True)
+        for rank, row in enumerate(leaderboard, start=1):
+            row['rank'] = rank
+        time_taken = round(time.perf_counter() - start_time, 2)
+        logger.info(f"Pencarian hyperparameter selesai dalam {time_taken} detik.")
+        return {
+            'success': True,
+            'combination_count': n_combinations,
+            'time_taken': time_taken,
+            'best': leaderboard[0],
+            'leaderboard': leaderboard
+        }
+
+    except Exception as e:
+        logger.error(f"Error saat pencarian hyperparameter: {e}", exc_info=True)
+        return {'success': False, 'error': str(e)}
+
+
+# Blok ini menjalankan pencarian dari command line, contoh:
+#   python hyperparameter_search.py --max-features 2000 5000 --ngram-range 1,1 1,2 --alpha 0.5 1.0 --workers 4
+# Perbandingan waktu dan akurasi mode penyeimbangan terhadap SMOTE:
+#   python hyperparameter_search.py --balancing none smote class_prior sample_weight random_oversample
+if __name__ == '__main__':
+    import argparse
+    import json
+    from ekstraksi import BALANCING_MODES
+
+    parser = argparse.ArgumentParser(description='Pencarian hyperparameter TF-IDF + Naive Bayes.')
+    parser.add_argument('--max-features', nargs='+', type=int, default=DEFAULT_GRID['max_features'])
+    parser.add_argument('--ngram-range', nargs='+', default=['1,2'], help="Pasangan 'min,max', mis. 1,1 1,2")
+    parser.add_argument('--min-df', nargs='+', type=float, default=DEFAULT_GRID['min_df'])
+    parser.add_argument('--balancing', nargs='+', choices=BALANCING_MODES, default=DEFAULT_GRID['balancing'])
+    parser.add_argument('--alpha', nargs='+', type=float, default=DEFAULT_GRID['alpha'])
+    parser.add_argument('--workers', type=int, default=None, help='Jumlah proses (bawaan: semua core)')
+    parser.add_argument('--top', type=int, default=10, help='Jumlah baris leaderboard yang ditampilkan')
+    args = parser.parse_args()
+
+    result = run_hyperparameter_search({
+        'max_features': args.max_features,
+        'ngram_range': [value.split(',') for value in args.ngram_range],
+        'min_df': args.min_df,
+        'balancing': args.balancing,
+        'alpha': args.alpha
+    }, n_workers=args.workers)
+    if not result['success']:
+        raise SystemExit(result['error'])
+    print(f"{result['combination_count']} kombinasi dalam {result['time_taken']} detik")
+    for row in result['leaderboard'][:args.top]:
+        print(json.dumps(row))
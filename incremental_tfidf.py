@@ -0,0 +1,309 @@
+# --- Ekstraksi TF-IDF Inkremental ---
+# Menyimpan hitungan n-gram per dokumen latih unik, document frequency (DF) semua term yang pernah terlihat,
+# dan matriks TF-IDF terakhir di disk. Saat 'pembagian_data' berubah, hanya dokumen baru yang ditokenisasi;
+# DF diperbarui secara aditif (dokumen yang hilang dikurangkan), vocabulary diperluas sampai batas max_vocabulary,
+# dan hanya baris yang memuat term dengan IDF berubah yang diberi bobot ulang.
+#
+# IDF yang dipakai matriks (idf_applied) hanya diganti untuk term yang IDF-nya bergeser lebih dari
+# reweight_tolerance (relatif) terhadap nilai eksaknya, sehingga semua baris selalu memakai IDF yang sama
+# dan selisihnya terhadap fit ulang penuh tidak pernah melebihi toleransi tersebut.
+import os
+import time
+import pickle
+import shutil
+import logging
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
+from sklearn.preprocessing import normalize
+
+logger = logging.getLogger(__name__)
+
+INCREMENTAL_STATE_DIR = os.path.join('cache', 'incremental_tfidf')
+# Versi format state; naikkan jika isi state berubah agar state lama dibangun ulang.
+INCREMENTAL_FORMAT_VERSION = 1
+# Selisih relatif IDF yang masih ditoleransi sebelum baris diberi bobot ulang (0 = selalu eksak).
+REWEIGHT_TOLERANCE = 1e-3
+# Ruang tambahan vocabulary di atas max_features jika max_vocabulary tidak diberikan.
+VOCABULARY_HEADROOM = 0.2
+# Term baru baru masuk vocabulary jika muncul minimal di sekian dokumen (menghindari typo sekali muncul).
+MIN_DF_ADMIT = 2
+
+_STATE_FILE = 'state.pkl'
+_COUNTS_FILE = 'counts.npz'
+_WEIGHTS_FILE = 'weights.npz'
+
+def hash_texts(texts):
+    """Hash 64-bit per teks (deterministik antar-proses) sebagai identitas dokumen."""
+    series = pd.Series(list(texts), dtype=object).fillna('')
+    return pd.util.hash_pandas_object(series, index=False).to_numpy()
+
+def resolve_vocabulary_cap(max_features, max_vocabulary=None):
+    if max_vocabulary is not None:
+        return int(max_vocabulary)
+    if max_features is None:
+        return None
+    return int(max_features * (1 + VOCABULARY_HEADROOM))
+
+def _row_ids(X):
+    return np.repeat(np.arange(X.shape[0]), np.diff(X.indptr))
+
+def _with_columns(X, n_columns):
+    # Memperlebar matriks CSR (term baru ditambahkan di akhir) tanpa menyalin data.
+    return sp.csr_matrix((X.data, X.indices, X.indptr), shape=(X.shape[0], n_columns))
+
+class IncrementalTfidf:
+    """
+    Ekstraktor TF-IDF yang bisa diperbarui secara inkremental. Hasilnya setara TfidfVectorizer
+    (norm='l2', smooth_idf=True) dengan vocabulary yang hanya bertambah dan kolom terurut menurut term.
+    """
+    def __init__(self, ngram_range=(1, 2), max_features=None, max_vocabulary=None,
+                 reweight_tolerance=REWEIGHT_TOLERANCE):
+        self.ngram_range = tuple(ngram_range)
+        self.max_features = max_features
+        self.max_vocabulary = resolve_vocabulary_cap(max_features, max_vocabulary)
+        self.reweight_tolerance = reweight_tolerance
+
+        # Semua term yang pernah terlihat (nomor term hanya bertambah) beserta statistiknya.
+        self.terms = []
+        self.term_ids = {}
+        self.document_frequency = np.zeros(0, dtype=np.int64)
+        self.term_frequency = np.zeros(0, dtype=np.int64)
+        # Dokumen latih unik: hash teks, jumlah kemunculan, dan hitungan n-gram (kolom = nomor term).
+        self.row_hashes = np.zeros(0, dtype=np.uint64)
+        self.multiplicity = np.zeros(0, dtype=np.int64)
+        self.counts = sp.csr_matrix((0, 0), dtype=np.int64)
+        self.n_docs = 0
+        # Vocabulary aktif (nomor term, terurut menurut string term), IDF yang dipakai, dan matriks TF-IDF.
+        self.vocab_ids = np.zeros(0, dtype=np.int64)
+        self.idf_applied = np.zeros(0)
+        self.weights = None
+
+    def params(self):
+        return {
+            'format_version': INCREMENTAL_FORMAT_VERSION,
+            'ngram_range': list(self.ngram_range),
+            'max_features': self.max_features,
+            'max_vocabulary': self.max_vocabulary
+        }
+
+    def _count_documents(self, texts):
+        """Hitungan n-gram untuk dokumen baru saja; term yang belum dikenal diberi nomor baru."""
+        counter = CountVectorizer(ngram_range=self.ngram_range)
+        try:
+            X = counter.fit_transform(texts).tocsr()
+        except ValueError:
+            # Semua dokumen kosong (vocabulary kosong).
+            return sp.csr_matrix((len(texts), len(self.terms)), dtype=np.int64)
+        local_ids = np.empty(X.shape[1], dtype=np.int64)
+        for local_id, term in enumerate(counter.get_feature_names_out()):
+            term_id = self.term_ids.get(term)
+            if term_id is None:
+                term_id = self.term_ids[term] = len(self.terms)
+                self.terms.append(term)
+            local_ids[local_id] = term_id
+        X = sp.csr_matrix((X.data.astype(np.int64), local_ids[X.indices], X.indptr),
+                          shape=(X.shape[0], len(self.terms)))
+        X.sort_indices()
+        return X
+
+    def _select_vocabulary(self):
+        """
+        Vocabulary awal dipilih persis seperti max_features TfidfVectorizer (CountVectorizer._limit_features):
+        kandidat diurutkan menurut term lalu diambil dengan argsort bawaan (tidak stabil) atas -frekuensi term,
+        sehingga term dengan frekuensi sama di batas potong terpilih sama seperti pada fit penuh.
+        Selanjutnya vocabulary hanya diperluas sampai batas (term baru diurutkan stabil menurut frekuensi).
+        """
+        n_terms = len(self.terms)
+        in_vocabulary = np.zeros(n_terms, dtype=bool)
+        in_vocabulary[self.vocab_ids] = True
+        all_terms = np.asarray(self.terms, dtype=object).astype(str)
+        if self.weights is None:
+            candidates = np.flatnonzero(self.document_frequency > 0)
+            candidates = candidates[np.argsort(all_terms[candidates], kind='stable')]
+            if self.max_features is not None and len(candidates) > self.max_features:
+                # Sama dengan (-tfs[mask]).argsort()[:limit] di scikit-learn: array, dtype, dan urutan kolom identik.
+                candidates = candidates[(-self.term_frequency[candidates]).argsort()[:self.max_features]]
+        else:
+            candidates = np.flatnonzero(~in_vocabulary & (self.document_frequency >= MIN_DF_ADMIT))
+            limit = None if self.max_vocabulary is None else max(0, self.max_vocabulary - len(self.vocab_ids))
+            if limit is not None and len(candidates) > limit:
+                top = np.argsort(-self.term_frequency[candidates], kind='stable')[:limit]
+                candidates = candidates[top]
+        admitted = candidates
+        vocab_ids = np.concatenate([self.vocab_ids, admitted]).astype(np.int64)
+        return vocab_ids[np.argsort(all_terms[vocab_ids], kind='stable')], len(admitted)
+
+    def update(self, texts):
+        """
+        Menyesuaikan state dengan kumpulan dokumen latih terbaru (urutan bebas, boleh ada duplikat).
+        Mengembalikan statistik pembaruan.
+        """
+        start_time = time.perf_counter()
+        texts = pd.Series(list(texts), dtype=object).fillna('').tolist()
+        hashes = hash_texts(texts)
+        unique_hashes, first_position, unique_counts = np.unique(hashes, return_index=True, return_counts=True)
+
+        # Jumlah kemunculan baru untuk setiap dokumen yang sudah tersimpan (0 = dokumen dihapus).
+        position = np.minimum(np.searchsorted(unique_hashes, self.row_hashes), max(len(unique_hashes) - 1, 0))
+        present = (unique_hashes[position] == self.row_hashes) if len(unique_hashes) else np.zeros(len(self.row_hashes), dtype=bool)
+        stored_multiplicity = np.where(present, unique_counts[position] if len(unique_hashes) else 0, 0)
+        is_new = ~np.isin(unique_hashes, self.row_hashes)
+
+        # Hanya dokumen baru yang ditokenisasi.
+        added_counts = self._count_documents([texts[i] for i in first_position[is_new]])
+        n_terms = len(self.terms)
+        all_counts = sp.vstack([_with_columns(self.counts, n_terms), _with_columns(added_counts, n_terms)], format='csr')
+        all_hashes = np.concatenate([self.row_hashes, unique_hashes[is_new]])
+        new_multiplicity = np.concatenate([stored_multiplicity, unique_counts[is_new]]).astype(np.int64)
+        delta = new_multiplicity - np.concatenate([self.multiplicity, np.zeros(int(is_new.sum()), dtype=np.int64)])
+
+        # DF dan frekuensi term diperbarui secara aditif dari baris yang jumlah kemunculannya berubah.
+        self.document_frequency = np.pad(self.document_frequency, (0, n_terms - len(self.document_frequency)))
+        self.term_frequency = np.pad(self.term_frequency, (0, n_terms - len(self.term_frequency)))
+        changed_rows = np.flatnonzero(delta)
+        if len(changed_rows):
+            changed_counts = all_counts[changed_rows]
+            presence = changed_counts.copy()
+            presence.data = np.ones_like(presence.data)
+            self.document_frequency += presence.T @ delta[changed_rows]
+            self.term_frequency += changed_counts.T @ delta[changed_rows]
+
+        keep = new_multiplicity > 0
+        kept_stored = keep[:len(self.row_hashes)]
+        self.counts = all_counts[keep]
+        self.row_hashes = all_hashes[keep]
+        self.multiplicity = new_multiplicity[keep]
+        self.n_docs = int(self.multiplicity.sum())
+        is_new_row = np.concatenate([np.zeros(int(kept_stored.sum()), dtype=bool), np.ones(int(is_new.sum()), dtype=bool)])
+
+        # Vocabulary baru dan pemetaan posisi kolom lama -> baru (kolom tetap terurut menurut term).
+        old_vocab_ids = self.vocab_ids
+        self.vocab_ids, admitted_count = self._select_vocabulary()
+        new_position = np.full(n_terms, -1, dtype=np.int64)
+        new_position[self.vocab_ids] = np.arange(len(self.vocab_ids))
+        old_to_new = new_position[old_vocab_ids]
+
+        # IDF eksak; idf_applied hanya diganti untuk term baru atau yang bergeser melebihi toleransi.
+        idf_exact = np.log((1 + self.n_docs) / (1 + self.document_frequency[self.vocab_ids])) + 1
+        idf_applied = np.full(len(self.vocab_ids), np.nan)
+        idf_applied[old_to_new] = self.idf_applied
+        changed_terms = np.isnan(idf_applied) | (np.abs(idf_exact - idf_applied) > self.reweight_tolerance * idf_applied)
+        idf_applied[changed_terms] = idf_exact[changed_terms]
+        self.idf_applied = idf_applied
+
+        # Baris terdampak: dokumen baru dan dokumen yang memuat term dengan IDF berubah.
+        changed_columns = np.zeros(n_terms, dtype=bool)
+        changed_columns[self.vocab_ids[changed_terms]] = True
+        hits = changed_columns[self.counts.indices]
+        affected = is_new_row | (np.bincount(_row_ids(self.counts)[hits], minlength=self.counts.shape[0]) > 0)
+        affected_rows = np.flatnonzero(affected)
+        reweighted = self._weigh(self.counts[affected_rows])
+
+        n_vocab = len(self.vocab_ids)
+        if self.weights is None:
+            base = sp.csr_matrix((self.counts.shape[0], n_vocab))
+        else:
+            # Baris yang tidak terdampak cukup dipetakan ulang nomor kolomnya (pemetaan monoton, urutan tetap terurut).
+            kept_weights = self.weights[np.flatnonzero(kept_stored)]
+            kept_weights = sp.csr_matrix((kept_weights.data, old_to_new[kept_weights.indices], kept_weights.indptr),
+                                         shape=(kept_weights.shape[0], n_vocab))
+            base = sp.vstack([kept_weights, sp.csr_matrix((int(is_new.sum()), n_vocab))], format='csr')
+        take = np.arange(self.counts.shape[0])
+        take[affected_rows] = base.shape[0] + np.arange(len(affected_rows))
+        self.weights = sp.vstack([base, reweighted], format='csr')[take]
+
+        stats = {
+            'documents': self.n_docs,
+            'unique_documents': int(self.counts.shape[0]),
+            'new_documents': int(unique_counts[is_new].sum()),
+            'removed_documents': int((~kept_stored).sum()),
+            'reweighted_rows': int(len(affected_rows)),
+            'idf_changed_terms': int(changed_terms.sum()),
+            'admitted_terms': int(admitted_count),
+            'vocabulary_size': int(n_vocab),
+            'seen_terms': int(n_terms),
+            'update_time': round(time.perf_counter() - start_time, 4)
+        }
+        logger.info(f"TF-IDF inkremental: {stats['new_documents']} dokumen baru, {stats['removed_documents']} dihapus, "
+                    f"{stats['reweighted_rows']}/{stats['unique_documents']} baris diberi bobot ulang, "
+                    f"{stats['admitted_terms']} term baru (vocabulary {n_vocab}) dalam {stats['update_time']} detik.")
+        return stats
+
+    def _weigh(self, counts):
+        """Bobot TF-IDF ter-normalisasi L2 untuk baris hitungan (kolom = nomor term) memakai idf_applied."""
+        X = counts[:, self.vocab_ids].astype(np.float64)
+        if X.shape[0] == 0:
+            # Tidak ada baris terdampak (data sama dengan run sebelumnya); normalize menolak matriks kosong.
+            return X
+        X.data *= self.idf_applied[X.indices]
+        return normalize(X, norm='l2', copy=False)
+
+    def transform_documents(self, texts):
+        """Matriks TF-IDF dokumen latih sesuai urutan texts (setiap teks harus sudah masuk lewat update)."""
+        hashes = hash_texts(texts)
+        order = np.argsort(self.row_hashes)
+        rows = order[np.searchsorted(self.row_hashes[order], hashes)]
+        return self.weights[rows]
+
+    def get_vectorizer(self):
+        """TfidfVectorizer dengan vocabulary dan IDF aktif untuk transformasi data uji dan prediksi."""
+        vocabulary = {self.terms[term_id]: column for column, term_id in enumerate(self.vocab_ids)}
+        vectorizer = TfidfVectorizer(ngram_range=self.ngram_range, vocabulary=vocabulary)
+        vectorizer.idf_ = self.idf_applied
+        return vectorizer
+
+    def save(self, directory=INCREMENTAL_STATE_DIR):
+        # Ditulis ke folder sementara lalu di-rename agar state lama tetap utuh jika penulisan gagal.
+        tmp_directory = f"{directory}.{os.getpid()}.tmp"
+        os.makedirs(tmp_directory, exist_ok=True)
+        sp.save_npz(os.path.join(tmp_directory, _COUNTS_FILE), self.counts)
+        sp.save_npz(os.path.join(tmp_directory, _WEIGHTS_FILE), self.weights)
+        state = {key: value for key, value in self.__dict__.items() if key not in ('counts', 'weights', 'term_ids')}
+        state['params'] = self.params()
+        with open(os.path.join(tmp_directory, _STATE_FILE), 'wb') as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        if os.path.isdir(directory):
+            shutil.rmtree(directory, ignore_errors=True)
+        os.replace(tmp_directory, directory)
+
+    @classmethod
+    def load(cls, directory=INCREMENTAL_STATE_DIR):
+        with open(os.path.join(directory, _STATE_FILE), 'rb') as f:
+            state = pickle.load(f)
+        state.pop('params', None)
+        extractor = cls.__new__(cls)
+        extractor.__dict__.update(state)
+        extractor.term_ids = {term: term_id for term_id, term in enumerate(extractor.terms)}
+        extractor.counts = sp.load_npz(os.path.join(directory, _COUNTS_FILE)).tocsr()
+        extractor.weights = sp.load_npz(os.path.join(directory, _WEIGHTS_FILE)).tocsr()
+        return extractor
+
+def load_incremental_extractor(ngram_range, max_features, max_vocabulary=None, directory=INCREMENTAL_STATE_DIR):
+    """Memuat state tersimpan jika parameternya sama; selain itu mulai dari state kosong (fit penuh)."""
+    extractor = IncrementalTfidf(ngram_range, max_features, max_vocabulary)
+    if not os.path.isdir(directory):
+        return extractor
+    try:
+        stored = IncrementalTfidf.load(directory)
+    except Exception as e:
+        logger.warning(f"State TF-IDF inkremental rusak, dibangun ulang: {e}")
+        return extractor
+    if stored.params() != extractor.params():
+        logger.info("Parameter TF-IDF inkremental berubah, vocabulary dibangun ulang dari awal.")
+        return extractor
+    return stored
+
+def update_incremental_features(texts, ngram_range, max_features, max_vocabulary=None, directory=INCREMENTAL_STATE_DIR):
+    """Memperbarui state dengan dokumen latih terbaru lalu mengembalikan (X_train, vectorizer, statistik)."""
+    extractor = load_incremental_extractor(ngram_range, max_features, max_vocabulary, directory)
+    stats = extractor.update(texts)
+    try:
+        extractor.save(directory)
+    except Exception as e:
+        logger.warning(f"Gagal menyimpan state TF-IDF inkremental: {e}")
+    return extractor.transform_documents(texts), extractor.get_vectorizer(), stats
+
+def clear_incremental_state(directory=INCREMENTAL_STATE_DIR):
+    shutil.rmtree(directory, ignore_errors=True)
@@ -0,0 +1,62 @@
+# --- Leksikon Terkompilasi (Kamus Normalisasi + Stopword) ---
+# Semua entry point (preprocessing.py, app.py, app1.py) memakai get_lexicon() agar kamus
+# hanya diparsing sekali, lalu dibangun ulang otomatis ketika file kamus sumber berubah.
+import os
+import pickle
+import logging
+import threading
+from collections import namedtuple
+
+from replace_comma_with_tab import LEXICON_SOURCE, LEXICON_ARTIFACT, LEXICON_FORMAT_VERSION, build_lexicon_artifact
+
+logger = logging.getLogger(__name__)
+
+# normalization: dict slang -> kata baku, stopwords: frozenset, source_mtime: mtime kamus saat dikompilasi.
+Lexicon = namedtuple('Lexicon', ['normalization', 'stopwords', 'source_mtime'])
+
+_current = None
+_lock = threading.Lock()
+
+def _load_artifact(source_mtime):
+    """Memuat artefak dari disk jika masih sesuai dengan file sumber; None jika harus dibangun ulang."""
+    try:
+        with open(LEXICON_ARTIFACT, 'rb') as f:
+            payload = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Artefak leksikon rusak, akan dibangun ulang: {e}")
+        return None
+    if payload.get('format_version') != LEXICON_FORMAT_VERSION or payload.get('source_mtime') != source_mtime:
+        return None
+    return payload
+
+def get_lexicon():
+    """
+    Mengembalikan leksikon aktif. Setiap panggilan hanya melakukan os.stat pada file kamus;
+    jika mtime berubah, artefak dibangun ulang dan leksikon baru langsung dipakai tanpa restart aplikasi.
+    """
+    global _current
+    try:
+        source_mtime = os.stat(LEXICON_SOURCE).st_mtime_ns
+    except FileNotFoundError:
+        if _current is None:
+            logger.error(f"File kamus normalisasi tidak ditemukan di '{LEXICON_SOURCE}'. Normalisasi akan dilewati.")
+            from replace_comma_with_tab import load_sastrawi_stopwords
+            _current = Lexicon({}, load_sastrawi_stopwords(), None)
+        return _current
+
+    if _current is not None and _current.source_mtime == source_mtime:
+        return _current
+
+    with _lock:
+        # Thread lain mungkin sudah memuat ulang selama menunggu lock.
+        if _current is not None and _current.source_mtime == source_mtime:
+            return _current
+        payload = _load_artifact(source_mtime)
+        if payload is None:
+            logger.info(f"Mengompilasi ulang leksikon dari '{LEXICON_SOURCE}'...")
+            payload = build_lexicon_artifact()
+        _current = Lexicon(payload['normalization'], payload['stopwords'], payload['source_mtime'])
+        logger.info(f"Leksikon dimuat: {len(_current.normalization)} kata normalisasi, {len(_current.stopwords)} stopword.")
+        return _current
@@ -0,0 +1,114 @@
+# --- Load Test Endpoint /predict ---
+# Mengirim request /predict secara paralel (beberapa thread klien) ke aplikasi yang sedang berjalan,
+# lalu melaporkan latensi p50/p95/p99, throughput (teks/detik), dan apakah target terpenuhi.
+# Contoh:
+#   python load_test_predict.py --identifier admin --password rahasia --concurrency 32 --requests 2000 \
+#       --p50-target-ms 50 --p99-target-ms 250 --min-throughput 500
+# Exit code 1 jika salah satu target tidak terpenuhi atau ada request yang gagal.
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+import urllib.parse
+import urllib.request
+import http.cookiejar
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+SAMPLE_TEXTS = [
+    'aplikasinya bagus banget, sangat membantu',
+    'pelayanan lambat dan sering error, kecewa',
+    'harga terjangkau tapi pengiriman agak lama',
+    'gak bisa login dari kemarin, tolong diperbaiki',
+    'mantap, fiturnya lengkap dan mudah dipakai',
+    'biasa saja, tidak ada yang istimewa',
+    'update terbaru malah bikin aplikasi lemot',
+    'terima kasih atas bantuannya, cepat tanggap'
+]
+
+def create_opener(base_url, identifier, password):
+    """Opener dengan cookie session; login lewat form /login jika kredensial diberikan."""
+    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+    if identifier:
+        form = urllib.parse.urlencode({'identifier': identifier, 'password': password or ''}).encode('utf-8')
+        opener.open(f"{base_url}/login", data=form, timeout=30).read()
+    return opener
+
+def send_request(opener, base_url, texts, timeout):
+    body = json.dumps({'texts': texts}).encode('utf-8')
+    request = urllib.request.Request(f"{base_url}/predict", data=body, headers={'Content-Type': 'application/json'})
+    start = time.perf_counter()
+    try:
+        with opener.open(request, timeout=timeout) as response:
+            payload = json.loads(response.read())
+            ok = response.status == 200 and payload.get('success')
+    except Exception:
+        ok = False
+    return time.perf_counter() - start, ok
+
+def run_load_test(base_url, opener, n_requests, concurrency, texts_per_request, timeout=30):
+    rng = random.Random(42)
+    batches = [[rng.choice(SAMPLE_TEXTS) for _ in range(texts_per_request)] for _ in range(n_requests)]
+    # Pemanasan: memuat model dan mengisi cache stemmer sebelum pengukuran.
+    send_request(opener, base_url, SAMPLE_TEXTS, timeout)
+
+    latencies = []
+    failures = 0
+    lock = threading.Lock()
+
+    def worker(texts):
+        nonlocal failures
+        latency, ok = send_request(opener, base_url, texts, timeout)
+        with lock:
+            latencies.append(latency)
+            failures += 0 if ok else 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(worker, batches))
+    wall_time = time.perf_counter() - start
+
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        'requests': n_requests,
+        'failures': failures,
+        'concurrency': concurrency,
+        'texts_per_request': texts_per_request,
+        'wall_time_s': round(wall_time, 3),
+        'p50_ms': round(float(np.percentile(latencies_ms, 50)), 2),
+        'p95_ms': round(float(np.percentile(latencies_ms, 95)), 2),
+        'p99_ms': round(float(np.percentile(latencies_ms, 99)), 2),
+        'max_ms': round(float(latencies_ms.max()), 2),
+        'requests_per_sec': round(n_requests / wall_time, 1),
+        'texts_per_sec': round(n_requests * texts_per_request / wall_time, 1)
+    }
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Load test endpoint /predict.')
+    parser.add_argument('--url', default='http://127.0.0.1:5001')
+    parser.add_argument('--identifier', help='Username/email untuk login')
+    parser.add_argument('--password')
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--texts-per-request', type=int, default=1)
+    parser.add_argument('--p50-target-ms', type=float, default=50.0)
+    parser.add_argument('--p99-target-ms', type=float, default=250.0)
+    parser.add_argument('--min-throughput', type=float, default=200.0, help='Target minimum teks per detik')
+    args = parser.parse_args()
+
+    base_url = args.url.rstrip('/')
+    opener = create_opener(base_url, args.identifier, args.password)
+    report = run_load_test(base_url, opener, args.requests, args.concurrency, args.texts_per_request)
+    print(json.dumps(report, indent=2))
+
+    checks = {
+        f"p50 <= {args.p50_target_ms} ms": report['p50_ms'] <= args.p50_target_ms,
+        f"p99 <= {args.p99_target_ms} ms": report['p99_ms'] <= args.p99_target_ms,
+        f"throughput >= {args.min_throughput} teks/detik": report['texts_per_sec'] >= args.min_throughput,
+        'tanpa request gagal': report['failures'] == 0
+    }
+    for name, passed in checks.items():
+        print(f"[{'OK' if passed else 'GAGAL'}] {name}")
+    sys.exit(0 if all(checks.values()) else 1)
@@ -1,9 +1,13 @@
 import numpy as np
 import pandas as pd
-from sqlalchemy import create_engine
+import scipy.sparse as sp
+from scipy.special import logsumexp
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
+import hashlib
 import logging
-from config import DB_CONFIG
+from model_registry import register_model, summarize_metrics, compute_data_hash, hash_training_data
+from term_index import top_k_positions_per_row, top_k_per_dense_row
+from classification_results import new_result_run_id, start_result_run, append_results, finish_result_run
 
 # Setup logging
 logger = logging.getLogger("naive_bayes_logger")
@@ -13,36 +17,128 @@ class MultinomialNBFromScratch:
     """
     Implementasi Multinomial Naive Bayes dari awal tanpa scikit-learn.
     """
-    def __init__(self, alpha=1.0):
+    def __init__(self, alpha=1.0, class_prior=None):
         # alpha adalah parameter untuk Laplace Smoothing.
         self.alpha = alpha
+        # class_prior: None = prior dari jumlah dokumen (berbobot) per kelas, 'uniform' = prior sama untuk
+        # setiap kelas, atau array probabilitas per kelas (urutan classes_).
+        self.class_prior = class_prior
 
-    def fit(self, X, y):
+    def fit(self, X, y, sample_weight=None):
         if isinstance(y, pd.Series):
             y = y.to_numpy()
 
-        n_samples, n_features = X.shape
-        self.classes_ = np.unique(y)
-        n_classes = len(self.classes_)
+        # Melatih ulang dari nol: hitungan lama dibuang lalu seluruh data diproses sebagai satu chunk.
+        self._reset(np.unique(y), X.shape[1])
+        return self.partial_fit(X, y, sample_weight=sample_weight)
 
-        # Inisialisasi parameter yang akan dipelajari model.
-        self.class_priors_ = np.zeros(n_classes)
-        self.feature_counts_ = np.zeros((n_classes, n_features))
-        self.class_counts_ = np.zeros(n_classes)
+    def partial_fit(self, X, y, classes=None, sample_weight=None):
+        """
+        Menambahkan satu chunk data ke model. Jumlah dokumen dan jumlah bobot fitur per kelas bersifat
+        aditif, sehingga hasil beberapa chunk sama dengan fit() pada gabungan seluruh chunk.
+        classes wajib diberikan pada pemanggilan pertama karena satu chunk belum tentu memuat semua kelas.
+        sample_weight (opsional) mengalikan kontribusi setiap dokumen, mis. bobot penyeimbang kelas
+        atau jumlah salinan dari random oversampling berbasis indeks.
+        X float32 diproses tanpa dikonversi ke float64, dan parameter model juga disimpan dalam float32.
+        """
+        if isinstance(y, pd.Series):
+            y = y.to_numpy()
+        y = np.asarray(y)
+
+        if not hasattr(self, 'classes_'):
+            if classes is None:
+                raise ValueError("Parameter classes wajib diberikan pada pemanggilan partial_fit pertama.")
+            self._reset(np.unique(classes), X.shape[1])
+
+        # Nomor kelas setiap dokumen (classes_ terurut hasil np.unique) untuk matriks indikator.
+        label_ids = np.searchsorted(self.classes_, y)
+        unknown = (label_ids >= len(self.classes_)) | (self.classes_[np.minimum(label_ids, len(self.classes_) - 1)] != y)
+        if unknown.any():
+            raise ValueError(f"Label {np.unique(y[unknown]).tolist()} tidak ada di classes model.")
+
+        dtype = np.float32 if X.dtype == np.float32 else np.float64
+        self.dtype_ = dtype
+        weights = np.ones(len(y), dtype=dtype) if sample_weight is None else np.asarray(sample_weight, dtype=dtype)
+
+        # Matriks indikator kelas x dokumen (berisi bobot dokumen): satu perkalian sparse dengan X menghasilkan
+        # jumlah bobot fitur untuk semua kelas sekaligus, tanpa menyalin baris X per kelas.
+        indicator = sp.csr_matrix((weights, (label_ids, np.arange(len(y)))), shape=(len(self.classes_), len(y)))
+        self.class_counts_ += np.bincount(label_ids, weights=weights, minlength=len(self.classes_))
+        # Hitungan fitur disimpan sparse: kelas x fitur yang tidak pernah muncul tidak memakan memori.
+        self.raw_feature_counts_ = self.raw_feature_counts_ + (indicator @ sp.csr_matrix(X)).astype(np.float64)
 
-        # Iterasi untuk menghitung parameter dari data training.
-        for i, c in enumerate(self.classes_):
-            X_c = X[y == c]
-            self.class_counts_[i] = X_c.shape[0]
-            self.class_priors_[i] = np.log(self.class_counts_[i] / n_samples) #prior
-            self.feature_counts_[i, :] = X_c.sum(axis=0) + self.alpha
-
-        # Menghitung probabilitas logaritmik untuk setiap fitur per kelas.
-        total_words_per_class = self.feature_counts_.sum(axis=1)
-        self.feature_log_prob_ = np.log(self.feature_counts_ / total_words_per_class[:, np.newaxis]) #likelihood
-        
+        # Log-probabilitas (array dense n_kelas x n_fitur) tidak dihitung per chunk; dibangun sekali saat
+        # pertama kali dibutuhkan (prediksi, explain, atau akses feature_log_prob_/class_priors_).
+        self._log_probs_stale = True
         return self
 
+    def _reset(self, classes, n_features):
+        # Inisialisasi hitungan yang akan diakumulasi dari data training.
+        # Akumulator bernilai float64 agar penjumlahan banyak chunk tetap presisi; hitungan fitur berupa CSR
+        # n_kelas x n_fitur yang hanya menyimpan pasangan kelas-fitur yang pernah muncul.
+        self.classes_ = classes
+        n_classes = len(self.classes_)
+        self.class_counts_ = np.zeros(n_classes)
+        self.raw_feature_counts_ = sp.csr_matrix((n_classes, n_features), dtype=np.float64)
+        self._log_probs_stale = True
+
+    def __setstate__(self, state):
+        # Model tersimpan versi lama menyimpan feature_log_prob_/class_priors_ sebagai atribut biasa dan
+        # hitungan fitur sebagai array dense; keduanya dipindahkan ke bentuk sekarang.
+        if 'feature_log_prob_' in state:
+            state['_feature_log_prob'] = state.pop('feature_log_prob_')
+            state['_class_priors'] = state.pop('class_priors_')
+            state.setdefault('_log_probs_stale', False)
+        if 'feature_counts_' in state:
+            state.setdefault('raw_feature_counts_', state['feature_counts_'] - state.get('alpha', 1.0))
+            del state['feature_counts_']
+        if isinstance(state.get('raw_feature_counts_'), np.ndarray):
+            state['raw_feature_counts_'] = sp.csr_matrix(state['raw_feature_counts_'])
+        self.__dict__.update(state)
+
+    @property
+    def feature_log_prob_(self):
+        # Log P(fitur|kelas), n_kelas x n_fitur; dihitung ulang hanya jika ada data baru sejak perhitungan terakhir.
+        if getattr(self, '_log_probs_stale', True):
+            self._update_log_probs()
+        return self._feature_log_prob
+
+    @property
+    def class_priors_(self):
+        # Log prior per kelas (urutan classes_).
+        if getattr(self, '_log_probs_stale', True):
+            self._update_log_probs()
+        return self._class_priors
+
+    @property
+    def feature_counts_(self):
+        # Alias kompatibilitas: hitungan fitur per kelas yang sudah ditambah alpha, sebagai array dense.
+        return self.raw_feature_counts_.toarray() + self.alpha
+
+    def _update_log_probs(self):
+        # Prior dihitung dari jumlah dokumen per kelas; kelas yang belum muncul bernilai -inf.
+        if self.class_prior is None:
+            with np.errstate(divide='ignore'):
+                self._class_priors = np.log(self.class_counts_ / self.class_counts_.sum()) #prior
+        elif isinstance(self.class_prior, str) and self.class_prior == 'uniform':
+            self._class_priors = np.full(len(self.classes_), -np.log(len(self.classes_)))
+        else:
+            self._class_priors = np.log(np.asarray(self.class_prior, dtype=np.float64))
+
+        # Menghitung probabilitas logaritmik untuk setiap fitur per kelas (dengan Laplace Smoothing).
+        # Satu-satunya array dense adalah feature_log_prob_ (dtype data latih) yang diisi alpha, ditambah hitungan
+        # sparse, lalu di-log dan dikurangi log total per kelas di tempat tanpa salinan float64 sementara.
+        counts = self.raw_feature_counts_.tocoo()
+        n_classes, n_features = counts.shape
+        total_words_per_class = np.asarray(counts.sum(axis=1)).ravel() + self.alpha * n_features
+        log_prob = np.full((n_classes, n_features), self.alpha, dtype=getattr(self, 'dtype_', np.float64))
+        log_prob[counts.row, counts.col] += counts.data.astype(log_prob.dtype)
+        with np.errstate(divide='ignore'):
+            np.log(log_prob, out=log_prob)
+            log_prob -= np.log(total_words_per_class).astype(log_prob.dtype)[:, np.newaxis]
+        self._feature_log_prob = log_prob #likelihood
+        self._log_probs_stale = False
+
     def _predict_log_proba(self, X):
         # Menghitung probabilitas logaritmik posterior untuk prediksi.
         return X @ self.feature_log_prob_.T + self.class_priors_  #posterior
@@ -52,33 +148,102 @@ class MultinomialNBFromScratch:
         log_probas = self._predict_log_proba(X)
         return self.classes_[np.argmax(log_probas, axis=1)]
 
+    def predict_log_proba(self, X):
+        # Log posterior ter-normalisasi: log-likelihood gabungan dikurangi logsumexp per baris (stabil secara numerik).
+        joint = self._predict_log_proba(X)
+        return joint - logsumexp(joint, axis=1, keepdims=True)
+
+    def predict_proba(self, X):
+        # Probabilitas posterior per kelas (urutan classes_), setiap baris berjumlah 1.
+        return np.exp(self.predict_log_proba(X))
+
+    def explain(self, X, feature_names=None, top_k=5):
+        """
+        Term dengan kontribusi terbesar untuk setiap kelas pada setiap dokumen.
+        Kontribusi term j ke kelas c = x_j * (log P(j|c) - rata-rata log P(j|kelas lain)), yaitu seberapa jauh
+        term tersebut mendorong skor kelas c di atas kelas lain. Hanya entri non-nol X yang dihitung
+        (tanpa matriks dense dokumen x fitur), lalu top-k per dokumen dipilih tanpa loop per dokumen.
+        """
+        X = sp.csr_matrix(X)
+        X.sort_indices()
+        centered = self.feature_log_prob_ - self.feature_log_prob_.mean(axis=0)
+        # Kontribusi setiap entri non-nol untuk semua kelas sekaligus: (nnz x n_kelas).
+        contributions = X.data[:, np.newaxis] * centered[:, X.indices].T
+        probabilities = self.predict_proba(X)
+
+        # Posisi entri top-k per dokumen untuk setiap kelas (indeks ke X.indices/X.data/contributions).
+        per_class = [top_k_positions_per_row(X.indptr, contributions[:, i], top_k) for i in range(len(self.classes_))]
+
+        explanations = []
+        for row in range(X.shape[0]):
+            terms_per_class = {}
+            for i, c in enumerate(self.classes_):
+                indptr, positions = per_class[i]
+                terms_per_class[str(c)] = [{
+                    'term': str(feature_names[X.indices[p]]) if feature_names is not None else int(X.indices[p]),
+                    'weight': round(float(X.data[p]), 6),
+                    'contribution': round(float(contributions[p, i]), 6)
+                } for p in positions[indptr[row]:indptr[row + 1]]]
+            explanations.append({
+                'predicted': str(self.classes_[np.argmax(probabilities[row])]),
+                'probabilities': {str(c): round(float(p), 6) for c, p in zip(self.classes_, probabilities[row])},
+                'top_terms': terms_per_class
+            })
+        return explanations
+
 
-def save_results_to_db(original_texts, actual_labels, predicted_labels):
+def save_results_to_db(run_id, original_texts, actual_labels, predicted_labels, start_row=0):
     """
-    Menyimpan hasil klasifikasi ke database.
+    Menjadwalkan penyimpanan hasil klasifikasi run_id ke tabel append-only 'hasil_klasifikasi'.
+    Penulisan berjalan di thread writer (lihat classification_results.py) sehingga pemanggil tidak menunggu database;
+    start_row dipakai mode out-of-core untuk menambahkan hasil per chunk ke run yang sama.
     """
     if len(original_texts) == 0:
         logger.warning("Tidak ada hasil prediksi untuk disimpan.")
         return
     try:
-        logger.info("Menyimpan hasil klasifikasi ke database...")
-        results_df = pd.DataFrame({
-            'teks': original_texts,
-            'sentimen_aktual': actual_labels,
-            'sentimen_prediksi': predicted_labels
-        })
-        db_url = f"mysql+pymysql://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['host']}/{DB_CONFIG['database']}"
-        engine = create_engine(db_url)
-        results_df.to_sql(name='hasil_klasifikasi', con=engine, if_exists='replace', index=False)
-        logger.info(f"Berhasil menyimpan {len(results_df)} baris hasil prediksi.")
+        append_results(run_id, original_texts, actual_labels, predicted_labels, start_row=start_row)
+    except Exception as e:
+        logger.error(f"Gagal menjadwalkan penyimpanan hasil klasifikasi: {e}", exc_info=True)
+
+
+def finish_results_run(run_id, evaluation):
+    """Menandai run hasil klasifikasi selesai (akurasi, versi model) dan mencatat run_id di hasil evaluasi."""
+    if evaluation.get('success'):
+        evaluation['result_run_id'] = run_id
+        finish_result_run(run_id, {'accuracy': float(evaluation['accuracy']),
+                                   'model_version': evaluation.get('model_version')})
+    else:
+        finish_result_run(run_id, status='failed')
+    return evaluation
+
+
+def register_trained_model(evaluation, model, vectorizer, params, data_hash):
+    """
+    Menyimpan model yang baru dievaluasi ke registry; versi dicatat di hasil evaluasi.
+    Hanya model yang punya vectorizer/transformer (bisa melayani /predict) yang langsung dijadikan versi aktif.
+    """
+    if not evaluation.get('success'):
+        return evaluation
+    try:
+        activate = vectorizer is not None
+        if not activate:
+            logger.warning("Model dilatih tanpa vectorizer (mis. dari feature store); disimpan tanpa dijadikan versi aktif.")
+        evaluation['model_version'] = register_model(model, vectorizer, summarize_metrics(evaluation),
+                                                     params=params, data_hash=data_hash, activate=activate)
+        evaluation['model_activated'] = activate
     except Exception as e:
-        logger.error(f"Gagal menyimpan hasil klasifikasi: {e}", exc_info=True)
+        # Kegagalan menyimpan model tidak membatalkan hasil evaluasi.
+        logger.error(f"Gagal menyimpan model ke registry: {e}", exc_info=True)
+    return evaluation
 
 
-def train_and_evaluate_nb(feature_extraction_result):
+def train_and_evaluate_nb(feature_extraction_result, model_params=None, register=True):
     """
     Fungsi utama untuk melatih dan mengevaluasi model Naive Bayes,
     serta menghasilkan log visualisasi dan hasil prediksi rinci.
+    Jika register=True, model beserta vectorizer, metrik, parameter (model_params), dan hash data latih
+    disimpan sebagai versi baru di registry model (lihat model_registry.py).
     """
     try:
         logger.info("Memulai pelatihan dan evaluasi Naive Bayes...")
@@ -89,68 +254,206 @@ def train_and_evaluate_nb(feature_extraction_result):
         y_test = feature_extraction_result.get('y_test')
         X_test_text = feature_extraction_result.get('X_test_text', [])
         vectorizer = feature_extraction_result.get('vectorizer')
+        # Hasil mode penyeimbangan tanpa SMOTE (lihat ekstraksi.balance_training_data).
+        sample_weight = feature_extraction_result.get('sample_weight')
+        class_prior = feature_extraction_result.get('class_prior')
 
         if X_train is None or y_train is None or X_train.shape[0] == 0:
             return {'success': False, 'error': 'Data training tidak lengkap atau kosong.'}
 
         logger.info("Melatih model MultinomialNB (versi dari awal)...")
-        model = MultinomialNBFromScratch(alpha=1.0)
-        model.fit(X_train, y_train)
+        model = MultinomialNBFromScratch(alpha=1.0, class_prior=class_prior)
+        model.fit(X_train, y_train, sample_weight=sample_weight)
         logger.info("Pelatihan model selesai.")
 
         y_pred = model.predict(X_test_tfidf)
-        save_results_to_db(X_test_text, y_test, y_pred)
-
-        logger.info("Menghitung metrik evaluasi...")
-        accuracy = accuracy_score(y_test, y_pred)
-        labels = sorted(list(set(y_test) | set(y_pred)))
-        report = classification_report(y_test, y_pred, labels=labels, output_dict=True, zero_division=0)
-        cm = confusion_matrix(y_test, y_pred, labels=labels)
-
-        logger.info(f"Akurasi: {accuracy:.4f}")
-        
-        training_history = []
-        training_history.append({'type': 'header', 'text': 'Detail Proses Pelatihan Naive Bayes'})
-        training_history.append({'type': 'step', 'text': 'Langkah 1: Menghitung Jumlah Dokumen per Kelas'})
-        for i, c in enumerate(model.classes_):
-            training_history.append({'type': 'log', 'text': f"- Kelas '{c}': {int(model.class_counts_[i])} dokumen"})
-        training_history.append({'type': 'step', 'text': 'Langkah 2: Menghitung Probabilitas Prior Kelas'})
-        for i, c in enumerate(model.classes_):
-            prior = np.exp(model.class_priors_[i])
-            training_history.append({'type': 'log', 'text': f"- P({c}) = {prior:.4f}"})
-        if vectorizer:
+        run_id = new_result_run_id()
+        start_result_run(run_id, {'alpha': model.alpha, 'balancing': feature_extraction_result.get('balancing'),
+                                  'cache_key': feature_extraction_result.get('cache_key'), **(model_params or {})})
+        save_results_to_db(run_id, X_test_text, y_test, y_pred)
+
+        # Hasil yang dimuat dari feature store membawa nama fitur tanpa objek vectorizer.
+        feature_names = feature_extraction_result.get('feature_names')
+        if feature_names is None and vectorizer is not None:
             feature_names = vectorizer.get_feature_names_out()
-            training_history.append({'type': 'step', 'text': 'Langkah 3: Menghitung Probabilitas Fitur (Likelihood)'})
-            for i, c in enumerate(model.classes_):
-                training_history.append({'type': 'log', 'text': f"  5 Fitur Teratas untuk Kelas '{c}':"})
-                top_5_indices = np.argsort(model.feature_log_prob_[i])[-5:]
-                for feature_index in reversed(top_5_indices):
-                    word = feature_names[feature_index]
-                    prob = np.exp(model.feature_log_prob_[i][feature_index])
-                    training_history.append({'type': 'log', 'text': f"    - P('{word}'|{c}) ≈ {prob:.6f}"})
-        
-        # --- PERUBAHAN BARU: Membuat daftar hasil prediksi rinci ---
-        prediction_results = []
-        # Memastikan y_test adalah list atau bisa diakses dengan .iloc
-        y_test_list = y_test.tolist() if isinstance(y_test, pd.Series) else y_test
-        for i in range(len(X_test_text)):
-            prediction_results.append({
-                'text': X_test_text[i],
-                'actual': y_test_list[i],
-                'predicted': y_pred[i]
-            })
-        # --- AKHIR PERUBAHAN ---
-
-        return {
-            'success': True,
-            'accuracy': accuracy,
-            'classification_report': report,
-            'confusion_matrix': cm.tolist(),
-            'labels': labels,
-            'training_history': training_history,
-            'prediction_results': prediction_results # Menambahkan hasil prediksi ke dictionary
-        }
+        evaluation = build_evaluation_result(model, y_test, y_pred, feature_names)
+        if register:
+            params = {
+                'alpha': model.alpha,
+                'class_prior': class_prior,
+                'balancing': feature_extraction_result.get('balancing'),
+                'cache_key': feature_extraction_result.get('cache_key'),
+                'feature_run_id': feature_extraction_result.get('feature_run_id') or feature_extraction_result.get('run_id'),
+                'result_run_id': run_id,
+                **(model_params or {})
+            }
+            register_trained_model(evaluation, model, vectorizer, params, hash_training_data(X_train, y_train))
+        return finish_results_run(run_id, evaluation)
 
     except Exception as e:
         logger.error(f"Error saat melatih atau mengevaluasi model: {e}", exc_info=True)
         return {'success': False, 'error': str(e)}
+
+
+def build_evaluation_result(model, y_test, y_pred, feature_names=None):
+    """
+    Menghitung metrik evaluasi serta menyusun log proses pelatihan.
+    Hasil prediksi per dokumen tidak ikut dikembalikan; baris-barisnya dibaca per halaman dari tabel
+    hasil_klasifikasi lewat result_run_id (lihat classification_results.query_results).
+    feature_names None (mis. mode feature hashing) berarti langkah fitur teratas dilewati.
+    """
+    logger.info("Menghitung metrik evaluasi...")
+    accuracy = accuracy_score(y_test, y_pred)
+    labels = sorted(list(set(y_test) | set(y_pred)))
+    report = classification_report(y_test, y_pred, labels=labels, output_dict=True, zero_division=0)
+    cm = confusion_matrix(y_test, y_pred, labels=labels)
+
+    logger.info(f"Akurasi: {accuracy:.4f}")
+    
+    training_history = []
+    training_history.append({'type': 'header', 'text': 'Detail Proses Pelatihan Naive Bayes'})
+    training_history.append({'type': 'step', 'text': 'Langkah 1: Menghitung Jumlah Dokumen per Kelas'})
+    for i, c in enumerate(model.classes_):
+        training_history.append({'type': 'log', 'text': f"- Kelas '{c}': {int(model.class_counts_[i])} dokumen"})
+    training_history.append({'type': 'step', 'text': 'Langkah 2: Menghitung Probabilitas Prior Kelas'})
+    for i, c in enumerate(model.classes_):
+        prior = np.exp(model.class_priors_[i])
+        training_history.append({'type': 'log', 'text': f"- P({c}) = {prior:.4f}"})
+    if feature_names is not None:
+        training_history.append({'type': 'step', 'text': 'Langkah 3: Menghitung Probabilitas Fitur (Likelihood)'})
+        # argpartition memilih 5 fitur teratas tanpa mengurutkan seluruh vocabulary setiap kelas.
+        top_5_per_class = top_k_per_dense_row(model.feature_log_prob_, 5)
+        for i, c in enumerate(model.classes_):
+            training_history.append({'type': 'log', 'text': f"  5 Fitur Teratas untuk Kelas '{c}':"})
+            for feature_index in top_5_per_class[i]:
+                word = feature_names[feature_index]
+                prob = np.exp(model.feature_log_prob_[i][feature_index])
+                training_history.append({'type': 'log', 'text': f"    - P('{word}'|{c}) ≈ {prob:.6f}"})
+    
+    return {
+        'success': True,
+        'accuracy': accuracy,
+        'classification_report': report,
+        'confusion_matrix': cm.tolist(),
+        'labels': labels,
+        'training_history': training_history,
+        'result_count': len(y_test)
+    }
+
+
+def train_and_evaluate_nb_streaming(hashing_extraction_result, alpha=1.0, model_params=None, register=True):
+    """
+    Melatih dan mengevaluasi Naive Bayes dari hasil ekstraksi out-of-core (feature hashing).
+    Data latih dikonsumsi per chunk lewat partial_fit sehingga memori pelatihan dibatasi ukuran chunk;
+    prediksi data uji juga dihitung dan disimpan ke database per chunk.
+    Penyeimbangan dari hasil ekstraksi diterapkan per chunk: class_prior ke model, class_weights sebagai sample_weight.
+    """
+    try:
+        logger.info("Memulai pelatihan dan evaluasi Naive Bayes (out-of-core)...")
+        model = MultinomialNBFromScratch(alpha=alpha, class_prior=hashing_extraction_result.get('class_prior'))
+        classes = np.array(hashing_extraction_result['classes'])
+        class_weights = hashing_extraction_result.get('class_weights')
+        balancing = hashing_extraction_result.get('balancing', 'none')
+
+        train_chunk_count = 0
+        data_hasher = hashlib.sha256()
+        for X_chunk, y_chunk, _ in hashing_extraction_result['train_chunks']:
+            sample_weight = None
+            if class_weights is not None:
+                sample_weight = pd.Series(np.asarray(y_chunk)).map(class_weights).to_numpy(dtype=np.float64)
+            model.partial_fit(X_chunk, y_chunk, classes=classes, sample_weight=sample_weight)
+            compute_data_hash(data_hasher, X_chunk, y_chunk)
+            train_chunk_count += 1
+        if train_chunk_count == 0:
+            return {'success': False, 'error': 'Data training tidak lengkap atau kosong.'}
+        logger.info(f"Pelatihan model selesai dari {train_chunk_count} chunk ({int(model.class_counts_.sum())} dokumen).")
+
+        y_test, y_pred = [], []
+        run_id = new_result_run_id()
+        start_result_run(run_id, {'alpha': alpha, 'extraction_mode': 'hashing', **(model_params or {})})
+        for X_chunk, y_chunk, text_chunk in hashing_extraction_result['test_chunks']:
+            chunk_pred = model.predict(X_chunk)
+            save_results_to_db(run_id, text_chunk, y_chunk, chunk_pred, start_row=len(y_test))
+            y_test.extend(y_chunk.tolist())
+            y_pred.extend(chunk_pred.tolist())
+        if not y_test:
+            return finish_results_run(run_id, {'success': False, 'error': 'Data testing kosong.'})
+
+        evaluation = build_evaluation_result(model, y_test, np.array(y_pred))
+        # Mode penyeimbangan yang benar-benar diterapkan dilaporkan bersama hasil evaluasi.
+        evaluation['balancing'] = balancing
+        evaluation['extraction_stats'] = hashing_extraction_result.get('stats')
+        if register:
+            params = {'alpha': alpha, 'extraction_mode': 'hashing', 'balancing': balancing,
+                      'class_prior': hashing_extraction_result.get('class_prior'), 'result_run_id': run_id,
+                      **(model_params or {})}
+            register_trained_model(evaluation, model, hashing_extraction_result.get('transformer'), params,
+                                   data_hasher.hexdigest())
+        return finish_results_run(run_id, evaluation)
+
+    except Exception as e:
+        logger.error(f"Error saat melatih atau mengevaluasi model (out-of-core): {e}", exc_info=True)
+        return {'success': False, 'error': str(e)}
+
+
+# Blok ini membandingkan waktu fit implementasi per-kelas lama (X[y == c] untuk setiap kelas) dengan
+# fit berbasis matriks indikator, pada matriks sparse acak (bawaan 1 juta x 50 ribu), contoh:
+#   python model_naive_bayes.py --rows 1000000 --features 50000 --nnz-per-row 20 --dtype float32
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description='Benchmark fit MultinomialNBFromScratch.')
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--features', type=int, default=50_000)
+    parser.add_argument('--nnz-per-row', type=int, default=20)
+    parser.add_argument('--classes', type=int, default=3)
+    parser.add_argument('--dtype', choices=['float32', 'float64'], default='float64')
+    parser.add_argument('--weighted', action='store_true', help='Gunakan sample_weight acak')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    def legacy_fit(X, y, sample_weight=None):
+        # Implementasi lama: salinan baris ter-mask untuk setiap kelas, hitungan dense float64.
+        classes = np.unique(y)
+        class_counts = np.zeros(len(classes))
+        feature_counts = np.zeros((len(classes), X.shape[1]))
+        for i, c in enumerate(classes):
+            mask = y == c
+            if sample_weight is None:
+                class_counts[i] += mask.sum()
+                feature_counts[i, :] += np.asarray(X[mask].sum(axis=0)).ravel()
+            else:
+                weights = sample_weight[mask]
+                class_counts[i] += weights.sum()
+                feature_counts[i, :] += np.asarray(X[mask].T @ weights).ravel()
+        return class_counts, feature_counts
+
+    rng = np.random.default_rng(42)
+    dtype = np.dtype(args.dtype)
+    nnz = args.rows * args.nnz_per_row
+    X = sp.csr_matrix((rng.random(nnz, dtype=np.float64).astype(dtype),
+                       rng.integers(0, args.features, nnz, dtype=np.int32),
+                       np.arange(0, nnz + 1, args.nnz_per_row, dtype=np.int64)),
+                      shape=(args.rows, args.features))
+    X.sum_duplicates()
+    y = np.array([f'kelas_{i}' for i in range(args.classes)], dtype=object)[rng.integers(0, args.classes, args.rows)]
+    sample_weight = rng.random(args.rows) + 0.5 if args.weighted else None
+    print(f"X: {X.shape[0]} x {X.shape[1]}, nnz={X.nnz}, dtype={X.dtype}, kelas={args.classes}, "
+          f"sample_weight={'ya' if args.weighted else 'tidak'}")
+
+    def best_time(function):
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            output = function()
+            timings.append(time.perf_counter() - start)
+        return min(timings), output
+
+    legacy_time, (legacy_class_counts, legacy_feature_counts) = best_time(lambda: legacy_fit(X, y, sample_weight))
+    new_time, model = best_time(lambda: MultinomialNBFromScratch().fit(X, y, sample_weight=sample_weight))
+    difference = np.abs(model.raw_feature_counts_.toarray() - legacy_feature_counts).max()
+    print(f"Fit lama (loop per kelas)   : {legacy_time:.3f} detik")
+    print(f"Fit baru (matriks indikator): {new_time:.3f} detik ({legacy_time / new_time:.1f}x)")
+    print(f"Selisih maksimum hitungan fitur: {difference:.2e} | selisih jumlah dokumen: "
+          f"{np.abs(model.class_counts_ - legacy_class_counts).max():.2e}")
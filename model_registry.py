@@ -0,0 +1,229 @@
+# --- Registry Model (Versi Model Tersimpan) ---
+# Setiap model hasil pelatihan disimpan sebagai satu versi di folder models/vNNNN/ berisi model (pickle),
+# vectorizer (artefak ringkas vectorizer_artifact, atau pickle untuk vectorizer lain), serta metadata.json
+# (metrik evaluasi, parameter, dan hash data latih). models/registry.json mencatat versi aktif beserta
+# riwayat aktivasi untuk rollback. Versi aktif dimuat sekali lalu dipakai ulang selama registry tidak berubah.
+import os
+import json
+import pickle
+import shutil
+import hashlib
+import logging
+import threading
+from datetime import datetime
+import numpy as np
+import scipy.sparse as sp
+
+from vectorizer_artifact import save_vectorizer_artifact, VectorizerArtifact
+
+logger = logging.getLogger(__name__)
+
+MODEL_REGISTRY_DIR = 'models'
+_REGISTRY_FILE = 'registry.json'
+_MODEL_FILE = 'model.pkl'
+_VECTORIZER_ARTIFACT_FILE = 'vectorizer.bin'
+_VECTORIZER_PICKLE_FILE = 'vectorizer.pkl'
+_METADATA_FILE = 'metadata.json'
+
+def _registry_path(root):
+    return os.path.join(root, _REGISTRY_FILE)
+
+def _version_path(version, root):
+    return os.path.join(root, version)
+
+def _read_registry(root):
+    try:
+        with open(_registry_path(root), encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {'active': None, 'history': []}
+
+def _write_registry(registry, root):
+    os.makedirs(root, exist_ok=True)
+    path = _registry_path(root)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(registry, f, indent=2)
+    os.replace(tmp_path, path)
+
+def _existing_versions(root):
+    if not os.path.isdir(root):
+        return []
+    return sorted(entry.name for entry in os.scandir(root) if entry.is_dir() and entry.name.startswith('v')
+                  and entry.name[1:].isdigit())
+
+def compute_data_hash(hasher, X, y):
+    """Menambahkan isi matriks fitur (CSR) dan label ke hasher; dipanggil per chunk pada mode out-of-core."""
+    X = sp.csr_matrix(X)
+    for array in (X.indptr - X.indptr[0], X.indices, X.data):
+        hasher.update(np.ascontiguousarray(array).tobytes())
+    hasher.update(json.dumps([str(label) for label in np.asarray(y).tolist()]).encode('utf-8'))
+    return hasher
+
+def hash_training_data(X, y):
+    return compute_data_hash(hashlib.sha256(), X, y).hexdigest()
+
+def summarize_metrics(evaluation):
+    """Metrik ringkas dari hasil build_evaluation_result (tanpa daftar prediksi per dokumen)."""
+    report = evaluation['classification_report']
+    macro = report.get('macro avg', {})
+    return {
+        'accuracy': float(evaluation['accuracy']),
+        'macro_precision': float(macro.get('precision', 0.0)),
+        'macro_recall': float(macro.get('recall', 0.0)),
+        'macro_f1': float(macro.get('f1-score', 0.0)),
+        'classification_report': report,
+        'confusion_matrix': evaluation['confusion_matrix'],
+        'labels': [str(label) for label in evaluation['labels']]
+    }
+
+def register_model(model, vectorizer, metrics, params=None, data_hash=None, activate=True, root=MODEL_REGISTRY_DIR):
+    """
+    Menyimpan model sebagai versi baru dan (secara bawaan) langsung menjadikannya versi aktif.
+    Mengembalikan nama versi, mis. 'v0003'.
+    """
+    os.makedirs(root, exist_ok=True)
+    tmp_path = os.path.join(root, f".tmp-{os.getpid()}-{threading.get_ident()}")
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    try:
+        with open(os.path.join(tmp_path, _MODEL_FILE), 'wb') as f:
+            pickle.dump(model, f, protocol=pickle.HIGHEST_PROTOCOL)
+        vectorizer_format = None
+        if vectorizer is not None:
+            try:
+                save_vectorizer_artifact(vectorizer, os.path.join(tmp_path, _VECTORIZER_ARTIFACT_FILE))
+                vectorizer_format = 'artifact'
+            except (AttributeError, ValueError):
+                # Vectorizer tanpa vocabulary (mis. HashingVectorizer) disimpan apa adanya.
+                with open(os.path.join(tmp_path, _VECTORIZER_PICKLE_FILE), 'wb') as f:
+                    pickle.dump(vectorizer, f, protocol=pickle.HIGHEST_PROTOCOL)
+                vectorizer_format = 'pickle'
+        metadata = {
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'metrics': metrics,
+            'params': params or {},
+            'data_hash': data_hash,
+            'vectorizer_format': vectorizer_format
+        }
+
+        # Nomor versi diambil dari versi terakhir; rename gagal jika proses lain sudah memakai nomor yang sama.
+        while True:
+            versions = _existing_versions(root)
+            version = f"v{int(versions[-1][1:]) + 1 if versions else 1:04d}"
+            metadata['version'] = version
+            with open(os.path.join(tmp_path, _METADATA_FILE), 'w', encoding='utf-8') as f:
+                json.dump(metadata, f, indent=2, default=str)
+            try:
+                os.rename(tmp_path, _version_path(version, root))
+                break
+            except OSError:
+                if not os.path.isdir(_version_path(version, root)):
+                    raise
+    except Exception:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+
+    logger.info(f"Model disimpan ke registry sebagai versi {version}.")
+    if activate:
+        promote_model(version, root)
+    return version
+
+def get_model_metadata(version=None, root=MODEL_REGISTRY_DIR):
+    """Metadata satu versi (None = versi aktif); None jika versi tidak ada."""
+    version = version or _read_registry(root)['active']
+    if not version:
+        return None
+    try:
+        with open(os.path.join(_version_path(version, root), _METADATA_FILE), encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def list_model_versions(root=MODEL_REGISTRY_DIR):
+    """Semua versi (terbaru lebih dulu) dengan metrik ringkas dan penanda versi aktif."""
+    active = _read_registry(root)['active']
+    versions = []
+    for version in reversed(_existing_versions(root)):
+        metadata = get_model_metadata(version, root)
+        if metadata is None:
+            continue
+        metrics = metadata.get('metrics', {})
+        versions.append({
+            'version': version,
+            'active': version == active,
+            'created_at': metadata.get('created_at'),
+            'accuracy': metrics.get('accuracy'),
+            'macro_f1': metrics.get('macro_f1'),
+            'params': metadata.get('params', {}),
+            'data_hash': metadata.get('data_hash'),
+            'servable': metadata.get('vectorizer_format') is not None
+        })
+    return versions
+
+def promote_model(version, root=MODEL_REGISTRY_DIR):
+    """
+    Menjadikan versi tertentu sebagai versi aktif; riwayat aktivasi disimpan untuk rollback.
+    Versi tanpa vectorizer ditolak karena tidak bisa memprediksi teks baru.
+    """
+    metadata = get_model_metadata(version, root)
+    if metadata is None:
+        raise ValueError(f"Versi model '{version}' tidak ditemukan.")
+    if metadata.get('vectorizer_format') is None:
+        raise ValueError(f"Versi model '{version}' tidak memiliki vectorizer sehingga tidak dapat dijadikan model aktif.")
+    registry = _read_registry(root)
+    if registry['active'] != version:
+        registry['history'].append(version)
+        registry['active'] = version
+        _write_registry(registry, root)
+    logger.info(f"Versi model aktif: {version}.")
+    return version
+
+def rollback_model(root=MODEL_REGISTRY_DIR):
+    """Mengaktifkan kembali versi yang aktif sebelum versi sekarang."""
+    registry = _read_registry(root)
+    history = [version for version in registry['history']
+               if (get_model_metadata(version, root) or {}).get('vectorizer_format') is not None]
+    if len(history) < 2:
+        raise ValueError('Tidak ada versi sebelumnya untuk rollback.')
+    history.pop()
+    registry['history'] = history
+    registry['active'] = history[-1]
+    _write_registry(registry, root)
+    logger.info(f"Rollback model ke versi {registry['active']}.")
+    return registry['active']
+
+def load_model_version(version, root=MODEL_REGISTRY_DIR):
+    """Memuat model, vectorizer, dan metadata satu versi."""
+    path = _version_path(version, root)
+    metadata = get_model_metadata(version, root)
+    if metadata is None:
+        raise ValueError(f"Versi model '{version}' tidak ditemukan.")
+    with open(os.path.join(path, _MODEL_FILE), 'rb') as f:
+        model = pickle.load(f)
+    vectorizer = None
+    if metadata.get('vectorizer_format') == 'artifact':
+        vectorizer = VectorizerArtifact(os.path.join(path, _VECTORIZER_ARTIFACT_FILE))
+    elif metadata.get('vectorizer_format') == 'pickle':
+        with open(os.path.join(path, _VECTORIZER_PICKLE_FILE), 'rb') as f:
+            vectorizer = pickle.load(f)
+    return {'version': version, 'model': model, 'vectorizer': vectorizer, 'metadata': metadata}
+
+_loaded = None
+_lock = threading.Lock()
+
+def load_active_model(root=MODEL_REGISTRY_DIR):
+    """
+    Versi aktif yang sudah dimuat (model, vectorizer, metadata), atau None jika registry masih kosong.
+    Dimuat ulang hanya jika registry.json berubah (promosi/rollback dari proses lain).
+    """
+    global _loaded
+    try:
+        mtime = os.stat(_registry_path(root)).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    with _lock:
+        if _loaded is None or _loaded[0] != mtime:
+            active = _read_registry(root)['active']
+            _loaded = (mtime, load_model_version(active, root) if active else None)
+        return _loaded[1]
@@ -0,0 +1,122 @@
+# --- Deteksi Near-Duplicate (MinHash + LSH) ---
+# Menemukan tweet yang hampir sama (retweet yang sedikit diedit, copy-paste) tanpa membandingkan
+# setiap pasangan dokumen: signature MinHash dibagi menjadi band, dan hanya dokumen yang jatuh
+# ke bucket yang sama pada suatu band yang diverifikasi.
+import zlib
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Bilangan prima sedikit di atas 2^32 untuk hashing universal (a * x + b) mod p.
+# Dengan a, b, x < 2^32 hasil perkalian masih muat di uint64 sehingga tidak terjadi overflow.
+_HASH_PRIME = np.uint64(4294967311)
+_MAX_HASH = np.uint64(2 ** 32 - 1)
+
+def optimal_bands(threshold, num_perm):
+    """Memilih pasangan (band, baris per band) yang titik beloknya (1/b)^(1/r) paling dekat dengan threshold."""
+    best = None
+    for bands in range(1, num_perm + 1):
+        if num_perm % bands:
+            continue
+        rows = num_perm // bands
+        error = abs((1.0 / bands) ** (1.0 / rows) - threshold)
+        if best is None or error < best[0]:
+            best = (error, bands, rows)
+    return best[1], best[2]
+
+def shingle_hashes(text, shingle_size=2):
+    """Mengubah teks menjadi hash 32-bit dari shingle kata; teks pendek memakai kata tunggal."""
+    tokens = text.split() if isinstance(text, str) else []
+    if not tokens:
+        return np.empty(0, dtype=np.uint64)
+    size = min(shingle_size, len(tokens))
+    shingles = {' '.join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+    # crc32 dipakai (bukan hash()) agar hasilnya sama di setiap proses dan setiap run.
+    return np.fromiter((zlib.crc32(s.encode('utf-8')) for s in shingles), dtype=np.uint64, count=len(shingles))
+
+def compute_signatures(texts, num_perm=128, shingle_size=2, seed=42, batch_size=2000):
+    """
+    Menghitung signature MinHash (n_docs x num_perm) secara tervektorisasi per batch dokumen.
+    Dokumen tanpa shingle ditandai dengan mask False dan tidak pernah dikelompokkan.
+    """
+    rng = np.random.RandomState(seed)
+    a = rng.randint(1, 2 ** 32 - 1, size=num_perm, dtype=np.uint64)[:, np.newaxis]
+    b = rng.randint(0, 2 ** 32 - 1, size=num_perm, dtype=np.uint64)[:, np.newaxis]
+
+    n_docs = len(texts)
+    signatures = np.full((n_docs, num_perm), _MAX_HASH, dtype=np.uint64)
+    has_shingles = np.zeros(n_docs, dtype=bool)
+
+    for start in range(0, n_docs, batch_size):
+        hashes = [shingle_hashes(text, shingle_size) for text in texts[start:start + batch_size]]
+        lengths = np.array([len(h) for h in hashes])
+        non_empty = lengths > 0
+        if not non_empty.any():
+            continue
+        flat = np.concatenate([h for h in hashes if len(h)])
+        offsets = np.concatenate(([0], np.cumsum(lengths[non_empty])[:-1]))
+        # Permutasi semua shingle sekaligus, lalu ambil minimum per dokumen dengan reduceat.
+        permuted = (a * flat[np.newaxis, :] + b) % _HASH_PRIME
+        batch_signatures = np.minimum.reduceat(permuted, offsets, axis=1).T
+        rows = start + np.flatnonzero(non_empty)
+        signatures[rows] = batch_signatures
+        has_shingles[rows] = True
+
+    return signatures, has_shingles
+
+def _find(parent, i):
+    # Union-find dengan path halving.
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+def find_near_duplicates(texts, threshold=0.8, num_perm=128, shingle_size=2, seed=42):
+    """
+    Mengelompokkan dokumen yang perkiraan kemiripan Jaccard-nya >= threshold.
+    Mengembalikan array id cluster sepanjang len(texts); id cluster adalah posisi anggota pertama,
+    sehingga dokumen tanpa duplikat memiliki id sama dengan posisinya sendiri.
+    """
+    texts = list(texts)
+    n_docs = len(texts)
+    bands, rows = optimal_bands(threshold, num_perm)
+    logger.info(f"MinHash LSH: {num_perm} permutasi, {bands} band x {rows} baris, threshold {threshold}.")
+
+    signatures, has_shingles = compute_signatures(texts, num_perm=num_perm, shingle_size=shingle_size, seed=seed)
+    candidates = np.flatnonzero(has_shingles)
+    parent = np.arange(n_docs)
+    compared = 0
+
+    for band in range(bands):
+        band_values = np.ascontiguousarray(signatures[candidates, band * rows:(band + 1) * rows])
+        # Setiap baris band diperlakukan sebagai satu kunci biner untuk pengelompokan bucket.
+        keys = band_values.view(np.dtype((np.void, band_values.dtype.itemsize * rows))).ravel()
+        _, bucket_ids, bucket_sizes = np.unique(keys, return_inverse=True, return_counts=True)
+        in_shared_bucket = bucket_sizes[bucket_ids] > 1
+        if not in_shared_bucket.any():
+            continue
+
+        # Anggota bucket diurutkan per bucket; setiap anggota dibandingkan dengan anggota pertama bucket
+        # (bukan semua pasangan) sehingga biaya tetap linear terhadap ukuran bucket.
+        members = candidates[in_shared_bucket]
+        member_buckets = bucket_ids[in_shared_bucket]
+        order = np.argsort(member_buckets, kind='stable')
+        members = members[order]
+        member_buckets = member_buckets[order]
+        is_first = np.concatenate(([True], member_buckets[1:] != member_buckets[:-1]))
+        anchors = members[np.maximum.accumulate(np.where(is_first, np.arange(len(members)), 0))]
+
+        pairs = ~is_first
+        left, right = anchors[pairs], members[pairs]
+        similarity = (signatures[left] == signatures[right]).mean(axis=1)
+        compared += len(left)
+        for i, j in zip(left[similarity >= threshold], right[similarity >= threshold]):
+            root_i, root_j = _find(parent, i), _find(parent, j)
+            if root_i != root_j:
+                parent[max(root_i, root_j)] = min(root_i, root_j)
+
+    roots = np.array([_find(parent, i) for i in range(n_docs)])
+    # Root selalu indeks terkecil karena penggabungan selalu mengarah ke indeks yang lebih kecil.
+    logger.info(f"MinHash LSH: {compared} pasangan kandidat diverifikasi.")
+    return roots
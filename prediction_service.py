@@ -0,0 +1,162 @@
+# --- Layanan Prediksi (Micro-batching) ---
+# Teks baru diproses dengan rantai preprocessing yang sama seperti run_preprocessing (TextPipeline + Sastrawi
+# dengan cache stemming yang sudah dimuat), diubah menjadi fitur dengan vectorizer versi model aktif, lalu diklasifikasi MultinomialNBFromScratch.
+# Request yang datang bersamaan digabung menjadi satu batch oleh satu thread worker: biaya per batch
+# (transform sparse, perkalian matriks) dibagi ke banyak teks sehingga throughput naik tanpa menambah latensi berarti.
+import time
+import queue
+import logging
+import threading
+from functools import lru_cache
+from concurrent.futures import Future
+
+from text_pipeline import TextPipeline
+from preprocessing import stemmer, stem_cache
+from model_registry import load_active_model
+
+logger = logging.getLogger(__name__)
+
+# Jumlah teks maksimum dalam satu batch dan waktu tunggu maksimum untuk mengumpulkan request berikutnya.
+PREDICT_MAX_BATCH_SIZE = 256
+PREDICT_MAX_WAIT_MS = 5
+# Batas jumlah teks dalam satu request /predict.
+MAX_TEXTS_PER_REQUEST = 1000
+PREDICT_TIMEOUT_SECONDS = 30
+
+class ModelNotReadyError(RuntimeError):
+    """Belum ada model aktif (atau model aktif tidak punya vectorizer) di registry."""
+
+class MicroBatcher:
+    """
+    Menggabungkan beberapa submit() yang datang hampir bersamaan menjadi satu panggilan handler(texts, explain),
+    dengan explain berupa list boolean per teks (penjelasan hanya dihitung untuk request yang memintanya).
+    Batch dikirim saat jumlah teks mencapai max_batch_size atau max_wait_ms sejak request pertama dalam batch.
+    """
+    def __init__(self, handler, max_batch_size=PREDICT_MAX_BATCH_SIZE, max_wait_ms=PREDICT_MAX_WAIT_MS):
+        self.handler = handler
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        # Thread dibuat saat request pertama, sehingga juga berjalan di proses anak reloader Flask.
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='predict-batcher', daemon=True)
+                self._thread.start()
+
+    def submit(self, texts, explain=False):
+        future = Future()
+        self._ensure_started()
+        self._queue.put((list(texts), bool(explain), future))
+        return future
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        size = len(batch[0][0])
+        deadline = time.perf_counter() + self.max_wait
+        while size < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(item)
+            size += len(item[0])
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            texts = [text for item_texts, _, _ in batch for text in item_texts]
+            explain = [item_explain for item_texts, item_explain, _ in batch for _ in item_texts]
+            try:
+                results = self.handler(texts, explain)
+            except Exception as e:
+                for _, _, future in batch:
+                    future.set_exception(e)
+                continue
+            offset = 0
+            for item_texts, _, future in batch:
+                future.set_result(results[offset:offset + len(item_texts)])
+                offset += len(item_texts)
+
+# Jumlah kata maksimum di cache stemming milik layanan prediksi.
+PREDICT_STEM_CACHE_SIZE = 50000
+
+@lru_cache(maxsize=PREDICT_STEM_CACHE_SIZE)
+def _stem_word(word):
+    return stemmer.stem(word)
+
+def stem_tokens(tokens):
+    """
+    Stemming untuk teks prediksi: cache stemming preprocessing hanya dibaca, kata yang belum pernah dilihat
+    di-stem lewat LRU berukuran tetap. Input /predict tidak pernah menambah cache, kata baru, atau statistik
+    milik preprocessing, sehingga run_preprocessing di proses yang sama tidak terpengaruh.
+    """
+    if not isinstance(tokens, list):
+        return []
+    stems = []
+    for word in tokens:
+        stem = stem_cache.get(word)
+        stems.append(_stem_word(word) if stem is None else stem)
+    return stems
+
+# Lexicon diambil dari get_lexicon() setiap batch sehingga perubahan kamus langsung berlaku.
+_pipeline = TextPipeline(stemmer=stem_tokens)
+# Nama fitur per versi model, dibuat sekali saat penjelasan pertama kali diminta.
+_feature_names = {}
+# Jumlah term teratas per kelas pada penjelasan prediksi.
+EXPLAIN_TOP_K = 5
+
+def get_feature_names(active):
+    names = _feature_names.get(active['version'])
+    if names is None:
+        names = _feature_names[active['version']] = active['vectorizer'].get_feature_names_out()
+    return names
+
+def predict_texts(texts, explain=None):
+    """
+    Memprediksi satu batch teks mentah dengan versi model aktif (tanpa batching).
+    explain: list boolean per teks; teks yang bernilai True mendapat daftar term dengan kontribusi terbesar per kelas.
+    """
+    active = load_active_model()
+    if active is None:
+        raise ModelNotReadyError('Belum ada model aktif. Latih model terlebih dahulu.')
+    if active['vectorizer'] is None:
+        raise ModelNotReadyError(f"Model aktif {active['version']} tidak memiliki vectorizer.")
+    processed = [' '.join(tokens) for tokens in _pipeline.process(texts)]
+    X = active['vectorizer'].transform(processed)
+    model = active['model']
+    probabilities = model.predict_proba(X)
+    labels = model.classes_[probabilities.argmax(axis=1)]
+    results = [{
+        'text': text,
+        'processed_text': processed_text,
+        'label': str(label),
+        'probabilities': {str(c): round(float(p), 6) for c, p in zip(model.classes_, row_probabilities)},
+        'model_version': active['version']
+    } for text, processed_text, label, row_probabilities in zip(texts, processed, labels, probabilities)]
+
+    explain_rows = [i for i, flag in enumerate(explain or []) if flag]
+    if explain_rows and hasattr(model, 'explain'):
+        # Vectorizer hashing tidak punya nama fitur, sehingga nomor kolom yang dikembalikan.
+        feature_names = get_feature_names(active) if hasattr(active['vectorizer'], 'get_feature_names_out') else None
+        explanations = model.explain(X[explain_rows], feature_names, top_k=EXPLAIN_TOP_K)
+        for i, explanation in zip(explain_rows, explanations):
+            results[i]['top_terms'] = explanation['top_terms']
+    return results
+
+_batcher = MicroBatcher(predict_texts)
+
+def predict(texts, explain=False, timeout=PREDICT_TIMEOUT_SECONDS):
+    """Memprediksi teks lewat micro-batcher bersama; aman dipanggil dari banyak thread request sekaligus."""
+    if not texts:
+        return []
+    return _batcher.submit(texts, explain).result(timeout=timeout)
@@ -3,10 +3,18 @@ import pandas as pd  # Digunakan untuk manipulasi data, terutama dalam bentuk Da
 from sqlalchemy import create_engine  # Digunakan untuk membuat koneksi ke database SQL.
 from config import DB_CONFIG  # Mengimpor konfigurasi database (host, user, password, dll) dari file terpisah.
 from Sastrawi.Stemmer.StemmerFactory import StemmerFactory  # Mengimpor class untuk membuat stemmer (mengubah kata ke bentuk dasar).
-from Sastrawi.StopWordRemover.StopWordRemoverFactory import StopWordRemoverFactory  # Mengimpor class untuk membuat penghapus stopword.
-import re  # Pustaka untuk Regular Expressions, digunakan untuk membersihkan teks dengan pola tertentu.
+from near_duplicate import find_near_duplicates  # Deteksi near-duplicate berbasis MinHash + LSH.
+from lexicon import get_lexicon  # Leksikon terkompilasi (kamus normalisasi + stopword) yang dimuat ulang otomatis jika kamus berubah.
+from text_pipeline import TextPipeline, STAGES  # Pipeline teks per dokumen yang dipakai bersama app1.py (batch maupun satu teks).
 import logging  # Pustaka untuk mencatat (logging) informasi, peringatan, dan error selama program berjalan.
 import time  # Pustaka untuk mengukur waktu eksekusi program.
+import os  # Digunakan untuk operasi path dan file (cache stemming).
+import pickle  # Digunakan untuk menyimpan dan memuat cache stemming ke/dari disk.
+import hashlib  # Digunakan untuk membuat sidik jari (versi) kamus kata dasar Sastrawi.
+from sqlalchemy import text, bindparam  # Digunakan untuk query upsert/delete pada mode inkremental.
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor  # Process pool untuk multi-core, thread untuk menulis ke DB di latar belakang.
+import uuid  # Digunakan untuk membuat id unik setiap run (riwayat preprocessing).
+import multiprocessing  # Digunakan untuk mengetahui start method process pool (fork/spawn).
 
 # --- Konfigurasi Logging ---
 # Mengatur konfigurasi dasar untuk logging agar menampilkan waktu, level log, dan pesan.
@@ -20,18 +28,14 @@ logger = logging.getLogger(__name__)
 # --- Inisialisasi Sastrawi & Engine Database ---
 try:
     # Memberi informasi bahwa proses inisialisasi Sastrawi dimulai.
-    logger.info("Menginisialisasi Sastrawi Stemmer dan StopWordRemover...")
+    logger.info("Menginisialisasi Sastrawi Stemmer dan leksikon...")
     # Membuat pabrik (factory) untuk stemmer.
     factory = StemmerFactory()
     # Membuat objek stemmer dari factory.
     stemmer = factory.create_stemmer()
+    # Versi kamus kata dasar Sastrawi, dipakai sebagai kunci validitas cache stemming di disk.
+    stemmer_dictionary_version = hashlib.sha1('\n'.join(factory.get_words()).encode('utf-8')).hexdigest()
 
-    # Membuat pabrik (factory) untuk stopword remover.
-    stop_factory = StopWordRemoverFactory()
-    # Mendapatkan daftar stopword (kata-kata umum seperti 'dan', 'di', 'yang').
-    stopwords = stop_factory.get_stop_words()
-    # Mengubah daftar stopword menjadi set untuk proses pencarian yang lebih cepat.
-    stopwords_set = set(stopwords)
     # Memberi informasi bahwa inisialisasi Sastrawi telah selesai.
     logger.info("Inisialisasi Sastrawi selesai.")
 
@@ -51,249 +55,861 @@ except Exception as e:
     # Menghentikan program jika inisialisasi gagal.
     raise
 
-# --- Kumpulan Fungsi Bantuan (Helper Functions) ---
+# --- Cache Stemming Persisten ---
+# Lokasi file cache stemming (kata -> kata dasar) yang dipakai ulang antar-run.
+STEM_CACHE_PATH = os.path.join('cache', 'stem_cache.pkl')
 
-# Fungsi untuk memuat kamus normalisasi dari file teks.
-def load_normalization_dict(filepath):
-    # Membuat dictionary kosong untuk menyimpan pasangan kata slang dan baku.
-    norm_dict = {}
-    # Mencatat informasi path file kamus yang sedang dibaca.
-    logger.info(f"Membaca kamus normalisasi dari: {filepath}")
+# Fungsi untuk memuat cache stemming dari disk.
+def load_stem_cache(filepath=STEM_CACHE_PATH):
+    # Cache hanya valid jika dibuat dengan kamus kata dasar Sastrawi yang sama.
     try:
-        # Membuka file kamus dengan encoding utf-8. 'with open' memastikan file ditutup secara otomatis.
-        with open(filepath, 'r', encoding='utf-8') as f:
-            # Membaca file baris per baris.
-            for line in f:
-                # Menghapus spasi atau karakter kosong di awal dan akhir baris.
-                line = line.strip()
-                # Memeriksa apakah baris tidak kosong dan mengandung pemisah tab.
-                if line and '\t' in line:
-                    # Memecah baris menjadi kata slang dan kata formal berdasarkan tab.
-                    slang, formal = line.split('\t', 1)
-                    # Menambahkan pasangan kata ke dalam dictionary.
-                    norm_dict[slang] = formal
-        # Memberi informasi jumlah kata yang berhasil dimuat.
-        logger.info(f"Berhasil memuat {len(norm_dict)} kata dari kamus normalisasi.")
-    # Menangani jika file kamus tidak ditemukan.
+        with open(filepath, 'rb') as f:
+            payload = pickle.load(f)
+        if payload.get('version') != stemmer_dictionary_version:
+            logger.info("Versi kamus Sastrawi berubah, cache stemming lama diabaikan.")
+            return {}
+        logger.info(f"Berhasil memuat {len(payload['stems'])} kata dari cache stemming.")
+        return payload['stems']
+    # Menangani jika file cache belum pernah dibuat.
     except FileNotFoundError:
-        logger.error(f"File kamus normalisasi tidak ditemukan di '{filepath}'. Normalisasi akan dilewati.")
-    # Menangani kesalahan umum lainnya saat membaca file.
+        logger.info("Cache stemming belum ada, stemming dimulai dari cache kosong.")
+    # Cache yang rusak tidak boleh menggagalkan preprocessing.
     except Exception as e:
-        logger.error(f"Error saat membaca kamus normalisasi: {e}")
-    # Mengembalikan dictionary yang sudah terisi.
-    return norm_dict
-
-# Fungsi untuk mengubah semua teks menjadi huruf kecil (case folding).
-def case_folding(text):
-    # Memeriksa apakah input adalah string, jika tidak, kembalikan string kosong.
-    if not isinstance(text, str): return ""
-    # Mengembalikan teks dalam format huruf kecil.
-    return text.lower()
-
-# Fungsi untuk membersihkan teks dari karakter yang tidak diinginkan (cleansing).
-def cleansing(text):
-    # Memeriksa apakah input adalah string.
-    if not isinstance(text, str): return ""
-    # Menghapus karakter non-ASCII untuk menghindari masalah encoding.
-    text = text.encode('ascii', 'ignore').decode('ascii')
-    # Menghapus URL (http, https, www).
-    text = re.sub(r'https?://\S+|www\.\S+', '', text)
-    # Menghapus mention (@username).
-    text = re.sub(r'@\w+', '', text)
-    # Menghapus hashtag (#topic).
-    text = re.sub(r'#\w+', '', text)
-    # Menghapus semua karakter selain huruf, angka, dan spasi (termasuk tanda baca).
-    text = re.sub(r'[^\w\s]', ' ', text)
-    # Menghapus semua angka.
-    text = re.sub(r'\d+', '', text)
-    # Mengganti spasi ganda atau lebih menjadi satu spasi dan menghapus spasi di awal/akhir.
-    text = re.sub(r'\s+', ' ', text).strip()
-    # Mengembalikan teks yang sudah bersih.
-    return text
-
-# Fungsi untuk memecah kalimat menjadi daftar kata (tokenizing).
-def tokenize(text):
-    # Memeriksa apakah input adalah string yang tidak kosong.
-    if not isinstance(text, str) or text.strip() == '': return []
-    # Memecah string menjadi list kata berdasarkan spasi.
-    return text.split()
-
-# Fungsi untuk menormalisasi token menggunakan kamus yang telah dimuat.
-def normalize_tokens(tokens, norm_dict):
-    # Memeriksa apakah input adalah sebuah list.
-    if not isinstance(tokens, list): return []
-    # Mengganti setiap token dengan versi formalnya jika ada di kamus, jika tidak, gunakan token asli.
-    return [norm_dict.get(token, token) for token in tokens]
+        logger.warning(f"Gagal membaca cache stemming, cache diabaikan: {e}")
+    return {}
 
-# Fungsi untuk menghapus stopwords dari daftar token.
-def remove_stopwords(tokens):
-    # Memeriksa apakah input adalah sebuah list.
-    if not isinstance(tokens, list): return []
-    return [word for word in tokens if word not in stopwords_set]
+# Fungsi untuk menyimpan kata-kata baru ke cache stemming di disk.
+def save_stem_cache(new_stems, filepath=STEM_CACHE_PATH):
+    if not new_stems:
+        return
+    try:
+        # Membaca ulang isi file agar entri yang ditulis proses lain tidak tertimpa.
+        stems = load_stem_cache(filepath)
+        stems.update(new_stems)
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        # Menulis ke file sementara lalu menggantinya secara atomik.
+        tmp_path = f"{filepath}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({'version': stemmer_dictionary_version, 'stems': stems}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, filepath)
+        logger.info(f"Cache stemming diperbarui: {len(new_stems)} kata baru, total {len(stems)} kata.")
+    except Exception as e:
+        logger.warning(f"Gagal menyimpan cache stemming: {e}")
+
+# Cache stemming dimuat sekali saat modul diimpor. Worker process pool tidak menerima salinan cache ini lewat
+# initargs (lihat create_worker_pool): worker hasil fork mewarisinya copy-on-write, worker spawn/forkserver
+# memuatnya sendiri dari STEM_CACHE_PATH saat mengimpor modul ini.
+stem_cache = load_stem_cache()
+# Kata yang baru di-stem pada run ini, disimpan ke disk di akhir run.
+new_stems = {}
+# Statistik hit/miss cache stemming untuk run yang sedang berjalan.
+stem_cache_stats = {'hits': 0, 'misses': 0}
+
+# --- Instrumentasi Per Tahap ---
+# Waktu (detik), jumlah baris, dan jumlah token keluaran per tahap untuk run yang sedang berjalan; direset setiap run.
+stage_metrics = {}
+# Kolom token yang dihitung sebagai keluaran setiap tahap pipeline.
+STAGE_TOKEN_COLUMNS = {
+    'tokenizing': 'tokens',
+    'normalization': 'normalized_tokens',
+    'stopword_removal': 'stopwords_tokens',
+    'stemming': 'stemming_tokens'
+}
+# Tabel tempat ringkasan setiap run ditambahkan (satu baris per tahap).
+RUN_HISTORY_TABLE = 'riwayat_preprocessing'
+
+# --- Puncak Memori Per Run dan Per Tahap ---
+# Puncak dibaca dari VmHWM (/proc/self/status). VmHWM direset lewat /proc/self/clear_refs ("5") di awal run
+# dan setiap kali satu tahap dicatat, sehingga nilai yang dibaca adalah puncak RSS selama tahap itu saja,
+# bukan puncak sepanjang umur proses seperti ru_maxrss (yang pada server Flask mencakup run sebelumnya).
+# Di luar Linux (atau jika clear_refs tidak bisa ditulis) puncak memori dilaporkan None.
+PROC_STATUS_PATH = '/proc/self/status'
+PROC_CLEAR_REFS_PATH = '/proc/self/clear_refs'
+# Puncak memori run yang sedang berjalan: proses utama dan worker terbesar (mode paralel).
+run_memory = {'tracking': False, 'peak_mb': None, 'worker_peak_mb': None}
+
+# Fungsi untuk mereset VmHWM proses ini ke RSS saat ini; False jika tidak didukung.
+def reset_peak_memory():
+    try:
+        with open(PROC_CLEAR_REFS_PATH, 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+# Fungsi untuk membaca VmHWM proses ini dalam MB (None jika tidak tersedia).
+def read_peak_memory_mb():
+    try:
+        with open(PROC_STATUS_PATH) as f:
+            peak_kb = next((int(line.split()[1]) for line in f if line.startswith('VmHWM:')), None)
+    except OSError:
+        return None
+    return None if peak_kb is None else round(peak_kb / 1024, 1)
+
+# Fungsi untuk mengambil nilai maksimum dengan mengabaikan None (puncak yang tidak terukur).
+def max_or_none(current, value):
+    if value is None:
+        return current
+    return value if current is None else max(current, value)
+
+# Fungsi untuk memulai pengukuran puncak memori run baru.
+def start_memory_tracking():
+    run_memory['tracking'] = reset_peak_memory()
+    run_memory['peak_mb'] = None
+    run_memory['worker_peak_mb'] = None
+    if not run_memory['tracking']:
+        logger.info("VmHWM tidak bisa direset pada sistem ini; puncak memori tidak diukur.")
+
+# Fungsi untuk mengambil puncak memori sejak pengambilan sebelumnya lalu mereset VmHWM untuk tahap berikutnya.
+def take_peak_memory_mb():
+    if not run_memory['tracking']:
+        return None
+    peak = read_peak_memory_mb()
+    reset_peak_memory()
+    run_memory['peak_mb'] = max_or_none(run_memory['peak_mb'], peak)
+    return peak
+
+# Fungsi untuk menambahkan durasi dan jumlah baris ke statistik suatu tahap.
+# Mode streaming memanggil fungsi ini per chunk sehingga nilainya diakumulasi (puncak memori diambil maksimumnya).
+# measure_memory=False dipakai untuk tahap yang tidak punya rentang waktu sendiri di proses utama
+# (tahap per dokumen di dalam pipeline, atau penulisan di thread latar belakang); puncaknya ikut tercatat
+# pada tahap yang sedang berjalan di proses utama. worker_peak_mb adalah puncak worker terbesar selama tahap.
+def record_stage(name, seconds, rows, tokens=None, measure_memory=True, worker_peak_mb=None):
+    entry = stage_metrics.setdefault(name, {'seconds': 0.0, 'rows': 0, 'tokens': None,
+                                            'peak_memory_mb': None, 'worker_peak_memory_mb': None})
+    entry['seconds'] += seconds
+    entry['rows'] += int(rows)
+    if tokens is not None:
+        entry['tokens'] = (entry['tokens'] or 0) + int(tokens)
+    if measure_memory:
+        entry['peak_memory_mb'] = max_or_none(entry['peak_memory_mb'], take_peak_memory_mb())
+    if worker_peak_mb is not None:
+        entry['worker_peak_memory_mb'] = max_or_none(entry['worker_peak_memory_mb'], worker_peak_mb)
+        run_memory['worker_peak_mb'] = max_or_none(run_memory['worker_peak_mb'], worker_peak_mb)
+
+# Fungsi untuk menyusun statistik tahap menjadi list (urutan eksekusi) beserta throughput baris/detik.
+def summarize_stage_metrics():
+    summary = []
+    for name, entry in stage_metrics.items():
+        summary.append({
+            'stage': name,
+            'seconds': round(entry['seconds'], 4),
+            'rows': entry['rows'],
+            'rows_per_sec': round(entry['rows'] / entry['seconds'], 1) if entry['seconds'] > 0 else None,
+            'tokens': entry['tokens'],
+            'peak_memory_mb': entry['peak_memory_mb'],
+            'worker_peak_memory_mb': entry['worker_peak_memory_mb']
+        })
+    return summary
+
+# Kolom puncak memori yang ditambahkan setelah tabel riwayat pertama kali dibuat.
+RUN_HISTORY_MEMORY_COLUMNS = ('peak_memory_mb', 'worker_peak_memory_mb')
+
+# Fungsi untuk menambahkan kolom yang belum ada pada tabel riwayat yang dibuat versi sebelumnya.
+def ensure_run_history_columns():
+    with engine.begin() as conn:
+        if not conn.execute(text("SHOW TABLES LIKE :name"), {'name': RUN_HISTORY_TABLE}).first():
+            return
+        columns = {row[0] for row in conn.execute(text(f"SHOW COLUMNS FROM {RUN_HISTORY_TABLE}"))}
+        for column in RUN_HISTORY_MEMORY_COLUMNS:
+            if column not in columns:
+                conn.execute(text(f"ALTER TABLE {RUN_HISTORY_TABLE} ADD COLUMN {column} DOUBLE NULL"))
+
+# Fungsi untuk menambahkan statistik run ke tabel riwayat agar regresi per tahap bisa dipantau antar-run.
+# Kegagalan menulis riwayat hanya dicatat sebagai peringatan dan tidak menggagalkan preprocessing.
+def save_run_history(run_id, summary, n_workers):
+    run_at = pd.Timestamp.now()
+    stages = summary['stages'] + [{
+        'stage': 'total',
+        'seconds': summary['time_taken'],
+        'rows': summary['final_count'],
+        'rows_per_sec': summary['rows_per_sec'],
+        'tokens': None,
+        'peak_memory_mb': summary['peak_memory_mb'],
+        'worker_peak_memory_mb': summary['worker_peak_memory_mb']
+    }]
+    # peak_memory_mb per baris adalah puncak tahap tersebut; baris 'total' berisi puncak seluruh run.
+    history_df = pd.DataFrame([{
+        'run_id': run_id,
+        'run_at': run_at,
+        'mode': summary['mode'],
+        'storage': summary['storage'],
+        'n_workers': n_workers,
+        'final_count': summary['final_count'],
+        **stage
+    } for stage in stages])
+    try:
+        ensure_run_history_columns()
+        history_df.to_sql(name=RUN_HISTORY_TABLE, con=engine, if_exists='append', index=False)
+        logger.info(f"Statistik run {run_id} ditambahkan ke tabel '{RUN_HISTORY_TABLE}'.")
+    except Exception as e:
+        logger.warning(f"Gagal menyimpan riwayat preprocessing: {e}")
+
+# --- Kumpulan Fungsi Bantuan (Helper Functions) ---
 
 # Fungsi untuk mengubah setiap token menjadi kata dasarnya (stemming).
 def apply_stemmer(tokens):
     # Memeriksa apakah input adalah sebuah list.
     if not isinstance(tokens, list): return []
-    return [stemmer.stem(word) for word in tokens]
+    stems = []
+    for word in tokens:
+        # Mengambil kata dasar dari cache; Sastrawi hanya dipanggil untuk kata yang belum pernah dilihat.
+        stem = stem_cache.get(word)
+        if stem is None:
+            stem = stemmer.stem(word)
+            stem_cache[word] = stem
+            new_stems[word] = stem
+            stem_cache_stats['misses'] += 1
+        else:
+            stem_cache_stats['hits'] += 1
+        stems.append(stem)
+    return stems
+
+# Fungsi untuk membuat pipeline teks dengan leksikon terbaru dan stemmer ber-cache.
+# Kamus normalisasi dan stopword (kata-kata umum seperti 'dan', 'di', 'yang') diambil dari artefak leksikon,
+# sehingga perubahan kamus langsung dipakai pada run berikutnya tanpa restart aplikasi.
+def create_pipeline():
+    lexicon = get_lexicon()
+    return TextPipeline(lexicon.normalization, lexicon.stopwords, stemmer=apply_stemmer)
+
+# --- Eksekusi Paralel (Multi-core) ---
+# Nama kolom DataFrame untuk setiap keluaran pipeline, sesuai urutannya.
+STAGE_COLUMNS = list(STAGES)
+
+# Pipeline milik proses worker, dibuat sekali oleh _init_worker.
+_worker_pipeline = None
+
+# Fungsi inisialisasi yang dijalankan sekali di setiap proses worker.
+# stem_cache sudah tersedia di worker (diwarisi atau dimuat saat impor), sehingga hanya pipeline yang dibuat.
+def _init_worker(norm_dict, worker_stopwords):
+    global _worker_pipeline
+    _worker_pipeline = TextPipeline(norm_dict, worker_stopwords, stemmer=apply_stemmer)
+
+# Fungsi yang dijalankan worker untuk satu potongan (chunk) teks.
+def _process_chunk(texts):
+    # Statistik dan kata baru dihitung per chunk lalu digabungkan di proses utama.
+    stem_cache_stats['hits'] = 0
+    stem_cache_stats['misses'] = 0
+    new_stems.clear()
+    timings = {}
+    # Worker melaporkan puncak memorinya sendiri (VmHWM) selama chunk ini.
+    tracking = reset_peak_memory()
+    rows = list(_worker_pipeline.process(texts, with_stages=True, timings=timings))
+    peak_mb = read_peak_memory_mb() if tracking else None
+    return rows, dict(new_stems), dict(stem_cache_stats), timings, peak_mb
+
+# Fungsi untuk membuat process pool yang worker-nya sudah diinisialisasi dengan kamus.
+# Cache stemming tidak dikirim lewat initargs agar biaya start pool tidak tumbuh sebesar cache x n_workers:
+# - start method 'fork': worker mewarisi stem_cache proses utama (termasuk kata baru run ini) copy-on-write.
+# - 'spawn'/'forkserver': worker mengimpor modul ini dan memuat cache dari STEM_CACHE_PATH sekali per worker;
+#   kata yang baru di-stem pada run ini (belum tersimpan ke disk) di-stem ulang oleh worker dengan hasil sama.
+def create_worker_pool(pipeline, n_workers):
+    start_method = multiprocessing.get_start_method()
+    cache_source = 'diwarisi dari proses utama' if start_method == 'fork' else f"dimuat dari '{STEM_CACHE_PATH}'"
+    logger.info(f"Process pool {n_workers} worker (start method '{start_method}'), cache stemming {cache_source}.")
+    return ProcessPoolExecutor(
+        max_workers=n_workers,
+        initializer=_init_worker,
+        initargs=(pipeline.normalization, pipeline.stopwords)
+    )
+
+# Fungsi untuk menjalankan tahap per baris secara paralel dan menyusun hasilnya sesuai urutan asli.
+# Durasi per tahap dari setiap worker dijumlahkan ke timings (total waktu CPU worker, bukan waktu dinding).
+# Mengembalikan DataFrame hasil dan puncak memori worker terbesar (MB) selama tahap ini.
+def run_stages_parallel(df, executor, n_workers, timings):
+    texts = df['full_text'].tolist()
+    # Setiap worker mendapat beberapa chunk agar beban kerja tetap seimbang.
+    chunk_size = max(1, -(-len(texts) // (n_workers * 4)))
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    logger.info(f"Membagi {len(texts)} baris menjadi {len(chunks)} chunk untuk {n_workers} worker.")
+
+    rows = []
+    worker_peak_mb = None
+    # executor.map mengembalikan hasil sesuai urutan chunk sehingga urutan baris tetap terjaga.
+    for chunk_rows, chunk_new_stems, chunk_stats, chunk_timings, chunk_peak_mb in executor.map(_process_chunk, chunks):
+        rows.extend(chunk_rows)
+        worker_peak_mb = max_or_none(worker_peak_mb, chunk_peak_mb)
+        for stage, seconds in chunk_timings.items():
+            timings[stage] = timings.get(stage, 0.0) + seconds
+        stem_cache.update(chunk_new_stems)
+        new_stems.update(chunk_new_stems)
+        stem_cache_stats['hits'] += chunk_stats['hits']
+        stem_cache_stats['misses'] += chunk_stats['misses']
+
+    return assign_stage_columns(df, rows), worker_peak_mb
+
+# Fungsi untuk menyusun kembali hasil pipeline per baris menjadi kolom-kolom DataFrame.
+def assign_stage_columns(df, rows):
+    for column, values in zip(STAGE_COLUMNS, zip(*rows)):
+        df[column] = pd.Series(list(values), index=df.index, dtype=object)
+    return df
+
+# Fungsi untuk menentukan jumlah worker; nilai None atau <= 0 berarti memakai semua core CPU.
+def resolve_workers(n_workers):
+    if n_workers is None or n_workers <= 0:
+        return os.cpu_count() or 1
+    return n_workers
+
+# Fungsi untuk menjalankan Tahap 1-7 (case folding s.d. penggabungan token) pada DataFrame.
+# executor dapat diberikan agar process pool dipakai ulang antar-chunk (mode streaming).
+# compact=True hanya menggabungkan token hasil stemming karena tahap antara tidak disimpan.
+def run_stages(df, pipeline, n_workers=1, executor=None, compact=False):
+    n_workers = resolve_workers(n_workers)
+    timings = {}
+    worker_peak_mb = None
+    pipeline_start = time.perf_counter()
+
+    if n_workers > 1:
+        # --- Tahap 1-6: Dijalankan paralel per chunk ---
+        logger.info(f"\n--- Langkah 1-6: Case Folding s.d. Stemming (paralel, {n_workers} worker) ---")
+        if executor is None:
+            with create_worker_pool(pipeline, n_workers) as pool:
+                df, worker_peak_mb = run_stages_parallel(df, pool, n_workers, timings)
+        else:
+            df, worker_peak_mb = run_stages_parallel(df, executor, n_workers, timings)
+    else:
+        # --- Tahap 1-6: Dijalankan per dokumen oleh pipeline yang sama dengan jalur paralel ---
+        logger.info("\n--- Langkah 1-6: Case Folding s.d. Stemming ---")
+        df = assign_stage_columns(df, list(pipeline.process(df['full_text'], with_stages=True, timings=timings)))
+
+    # Mencatat durasi setiap tahap beserta jumlah token keluarannya.
+    # Tahap-tahap ini berjalan bergantian per dokumen, sehingga puncak memorinya dicatat bersama pada 'pipeline_wall'.
+    for stage, seconds in timings.items():
+        column = STAGE_TOKEN_COLUMNS.get(stage)
+        tokens = df[column].map(len).sum() if column else None
+        record_stage(stage, seconds, len(df), tokens, measure_memory=False)
+    # Waktu dinding Tahap 1-6; pada mode paralel lebih kecil dari jumlah durasi per tahap.
+    record_stage('pipeline_wall', time.perf_counter() - pipeline_start, len(df), worker_peak_mb=worker_peak_mb)
+
+    # Menampilkan hasil setiap tahap untuk baris pertama sebagai sampel.
+    if not df.empty:
+        for column in STAGE_COLUMNS:
+            logger.info(f"Contoh {column}: " + str(df[column].iloc[0]))
+
+    # --- Tahap 7: Menggabungkan kembali token menjadi string ---
+    logger.info("\n--- Langkah 7: Menggabungkan token menjadi string ---")
+    join_start = time.perf_counter()
+    if not compact:
+        df['tokenizing'] = df['tokens'].apply(lambda x: ' '.join(x) if isinstance(x, list) else '')
+        df['normalized'] = df['normalized_tokens'].apply(lambda x: ' '.join(x) if isinstance(x, list) else '')
+        df['stopwords'] = df['stopwords_tokens'].apply(lambda x: ' '.join(x) if isinstance(x, list) else '')
+    df['stemming'] = df['stemming_tokens'].apply(lambda x: ' '.join(x) if isinstance(x, list) else '')
+    record_stage('token_join', time.perf_counter() - join_start, len(df))
+    logger.info("Penggabungan token selesai.")
+
+    return df
+
+# Fungsi untuk menghitung ulang tahap antara bagi sejumlah kecil teks (tampilan tabel mode ringkas).
+def recompute_stages(texts):
+    rows = []
+    for stages in create_pipeline().process(texts, with_stages=True):
+        rows.append({
+            'case_folding': stages.case_folding,
+            'cleansing': stages.cleansing,
+            'tokenizing': ' '.join(stages.tokens),
+            'normalized': ' '.join(stages.normalized_tokens),
+            'stopwords': ' '.join(stages.stopwords_tokens),
+            'stemming': ' '.join(stages.stemming_tokens)
+        })
+    return rows
+
+# Fungsi untuk menghitung duplikat persis berdasarkan hasil stemming (duplikat tidak dihapus).
+def summarize_stem_duplicates(df):
+    logger.info("\n--- Menganalisis duplikat berdasarkan hasil stemming ---")
+    group_sizes = df.groupby('stemming').size()
+    duplicate_groups = group_sizes[group_sizes > 1]
+    stats = {
+        'stem_duplicate_groups': int(len(duplicate_groups)),
+        'stem_duplicate_count': int((duplicate_groups - 1).sum())
+    }
+    logger.info(f"Ditemukan {stats['stem_duplicate_count']} baris duplikat dalam {stats['stem_duplicate_groups']} grup hasil stemming.")
+    return stats
+
+# Fungsi untuk mendeteksi near-duplicate (MinHash + LSH) dan menghapus atau menggabungkan cluster-nya.
+# action='drop' menyimpan anggota pertama, 'merge' juga menyimpan anggota pertama tetapi dengan label mayoritas
+# cluster, 'flag' hanya menghitung tanpa mengubah data.
+def resolve_near_duplicates(df, threshold, action='drop'):
+    logger.info(f"\n--- Mendeteksi near-duplicate (threshold={threshold}, aksi={action}) ---")
+    cluster_ids = find_near_duplicates(df['stemming'].tolist(), threshold=threshold)
+    df = df.assign(near_duplicate_cluster=cluster_ids)
+    cluster_sizes = df.groupby('near_duplicate_cluster').size()
+    clusters = cluster_sizes[cluster_sizes > 1]
+    stats = {
+        'near_duplicate_clusters': int(len(clusters)),
+        'near_duplicate_rows': int((clusters - 1).sum()),
+        'near_duplicate_largest_cluster': int(clusters.max()) if len(clusters) else 0
+    }
+    logger.info(
+        f"Ditemukan {stats['near_duplicate_clusters']} cluster near-duplicate berisi "
+        f"{stats['near_duplicate_rows']} baris tambahan (cluster terbesar: {stats['near_duplicate_largest_cluster']})."
+    )
+
+    cluster_ids = df['near_duplicate_cluster'].to_numpy()
+    representative = ~df['near_duplicate_cluster'].duplicated(keep='first')
+    original_labels = df['sentiment_pakar']
+    if action == 'merge':
+        # Label mayoritas per cluster; baris tanpa label tidak ikut voting.
+        labelled = df.dropna(subset=['sentiment_pakar'])
+        majority = labelled.groupby('near_duplicate_cluster')['sentiment_pakar'].agg(lambda labels: labels.value_counts().idxmax())
+        merged_labels = df['near_duplicate_cluster'].map(majority)
+        df['sentiment_pakar'] = merged_labels.where(merged_labels.notna(), df['sentiment_pakar'])
+
+    # Keputusan per baris disimpan agar mode inkremental tidak memasukkan kembali baris yang dihapus
+    # dan tidak mengembalikan label hasil penggabungan (lihat apply_near_duplicate_decisions).
+    decisions = pd.DataFrame(columns=NEAR_DUP_DECISION_COLUMNS)
+    if action in ('drop', 'merge'):
+        # id cluster adalah posisi anggota pertama, sehingga source_id wakil cluster diambil dari posisi tersebut.
+        decisions = df.assign(
+            decision='drop',
+            representative_id=df['source_id'].to_numpy()[cluster_ids]
+        )[~representative]
+        if action == 'merge':
+            relabelled = representative & ~((df['sentiment_pakar'] == original_labels) |
+                                            (df['sentiment_pakar'].isna() & original_labels.isna()))
+            merged = df[relabelled].assign(decision='merge', representative_id=df.loc[relabelled, 'source_id'])
+            decisions = pd.concat([decisions, merged])
+        decisions = decisions[NEAR_DUP_DECISION_COLUMNS]
+        # keep='first' menyimpan wakil cluster.
+        df = df[representative]
+        logger.info(f"Menghapus {stats['near_duplicate_rows']} baris near-duplicate, tersisa {len(df)} baris.")
+    return df.drop(columns=['near_duplicate_cluster']), stats, decisions
+
+# --- Status Near-duplicate untuk Mode Inkremental ---
+# Pengaturan near-duplicate run penuh terakhir (threshold, aksi) dan keputusan per baris sumber:
+# 'drop' = baris dihapus sebagai anggota cluster, 'merge' = wakil cluster yang labelnya diganti label mayoritas.
+NEAR_DUP_SETTING_TABLE = 'status_near_duplicate'
+NEAR_DUP_DECISION_TABLE = 'keputusan_near_duplicate'
+NEAR_DUP_DECISION_COLUMNS = ['source_id', 'text_hash', 'decision', 'representative_id', 'sentiment_pakar']
+
+# Fungsi untuk menormalkan pengaturan near-duplicate; aksi 'flag' tidak mengubah data sehingga setara dengan nonaktif.
+def resolve_near_dup_setting(threshold, action):
+    if threshold and action in ('drop', 'merge'):
+        return (round(float(threshold), 6), action)
+    return None
+
+# Fungsi untuk menyimpan pengaturan dan keputusan near-duplicate (menggantikan status run sebelumnya).
+def save_near_duplicate_state(setting, decisions=None):
+    if decisions is None:
+        decisions = pd.DataFrame(columns=NEAR_DUP_DECISION_COLUMNS)
+    setting_df = pd.DataFrame([{
+        'threshold': setting[0] if setting else None,
+        'action': setting[1] if setting else None,
+        'updated_at': pd.Timestamp.now()
+    }])
+    setting_df.to_sql(name=NEAR_DUP_SETTING_TABLE, con=engine, if_exists='replace', index=False)
+    decisions.to_sql(name=NEAR_DUP_DECISION_TABLE, con=engine, if_exists='replace', index=False,
+                     method='multi', chunksize=WRITE_BATCH_SIZE)
+
+# Fungsi untuk membaca status near-duplicate run penuh terakhir; None jika belum pernah disimpan.
+def load_near_duplicate_state():
+    try:
+        setting_df = pd.read_sql(f"SELECT threshold, action FROM {NEAR_DUP_SETTING_TABLE}", engine)
+        decisions = pd.read_sql(f"SELECT {', '.join(NEAR_DUP_DECISION_COLUMNS)} FROM {NEAR_DUP_DECISION_TABLE}", engine)
+    except Exception as e:
+        logger.warning(f"Status near-duplicate tidak dapat dibaca: {e}")
+        return None
+    if setting_df.empty:
+        return None
+    row = setting_df.iloc[0]
+    return resolve_near_dup_setting(row['threshold'], row['action']), decisions
+
+# Fungsi untuk menerapkan keputusan near-duplicate run penuh terakhir pada data sumber (mode inkremental):
+# baris 'drop' dikeluarkan dan label baris 'merge' diganti label hasil penggabungan.
+# Keputusan hanya berlaku selama teks baris tersebut tidak berubah dan wakil cluster-nya masih ada di sumber.
+def apply_near_duplicate_decisions(df, decisions):
+    if decisions.empty:
+        return df, decisions
+    source_hashes = df.set_index('source_id')['text_hash']
+    valid = decisions[
+        (decisions['text_hash'].values == source_hashes.reindex(decisions['source_id']).values) &
+        decisions['representative_id'].isin(source_hashes.index)
+    ]
+    dropped_ids = valid.loc[valid['decision'] == 'drop', 'source_id']
+    merged_labels = valid[valid['decision'] == 'merge'].set_index('source_id')['sentiment_pakar']
+    df = df[~df['source_id'].isin(dropped_ids)].copy()
+    override = df['source_id'].map(merged_labels)
+    df['sentiment_pakar'] = override.where(df['source_id'].isin(merged_labels.index), df['sentiment_pakar'])
+    logger.info(f"Near-duplicate: {len(dropped_ids)} baris tetap dikeluarkan, {len(merged_labels)} label hasil penggabungan dipertahankan, "
+                f"{len(decisions) - len(valid)} keputusan tidak berlaku lagi.")
+    return df, valid
+
+# --- Mode Inkremental ---
+# Kolom yang disimpan ke tabel 'preprocessing'. source_id dan text_hash dipakai mode inkremental.
+RESULT_COLUMNS = [
+    'source_id', 'text_hash', 'full_text', 'case_folding', 'cleansing', 'tokenizing',
+    'normalized', 'stopwords', 'stemming', 'sentiment_pakar'
+]
+# Kolom mode ringkas: hanya teks sumber dan hasil stemming (yang dipakai pembagian data).
+COMPACT_RESULT_COLUMNS = ['source_id', 'text_hash', 'full_text', 'stemming', 'sentiment_pakar']
+# Jumlah baris per batch untuk upsert dan delete.
+WRITE_BATCH_SIZE = 1000
+
+# Fungsi untuk menghitung hash isi teks asli sebagai penanda perubahan baris sumber.
+def compute_text_hash(text):
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+# Fungsi untuk memilih daftar kolom yang disimpan sesuai mode penyimpanan.
+def get_result_columns(compact):
+    return COMPACT_RESULT_COLUMNS if compact else RESULT_COLUMNS
+
+# Fungsi untuk memeriksa apakah tabel 'preprocessing' disimpan dalam mode ringkas.
+def is_compact_table():
+    columns = pd.read_sql("SELECT * FROM preprocessing LIMIT 0", engine).columns
+    return 'case_folding' not in columns
+
+# Fungsi untuk membaca status tabel 'preprocessing' yang sudah ada (id sumber, hash, label).
+def load_existing_state(compact):
+    try:
+        # Upsert hanya mungkin jika tata letak kolom tabel sama dengan mode penyimpanan yang diminta.
+        if is_compact_table() != compact:
+            logger.info("Mode penyimpanan berbeda dengan tabel 'preprocessing' yang ada, beralih ke mode penuh.")
+            return None
+        return pd.read_sql("SELECT source_id, text_hash, sentiment_pakar FROM preprocessing", engine)
+    # Tabel belum ada atau dibuat oleh versi lama tanpa kolom source_id/text_hash.
+    except Exception as e:
+        logger.warning(f"Status tabel 'preprocessing' tidak dapat dibaca, beralih ke mode penuh: {e}")
+        return None
+
+# Fungsi untuk mengubah DataFrame menjadi list dict yang aman untuk parameter SQL (NaN -> None).
+def to_records(df):
+    return df.astype(object).where(pd.notnull(df), None).to_dict('records')
+
+# Fungsi untuk menyimpan (insert/update) baris hasil preprocessing berdasarkan source_id.
+def upsert_results(result_df, result_columns):
+    columns = ', '.join(result_columns)
+    placeholders = ', '.join(f":{column}" for column in result_columns)
+    updates = ', '.join(f"{column} = VALUES({column})" for column in result_columns if column != 'source_id')
+    sql = text(f"INSERT INTO preprocessing ({columns}) VALUES ({placeholders}) ON DUPLICATE KEY UPDATE {updates}")
+    records = to_records(result_df[result_columns])
+    with engine.begin() as conn:
+        for i in range(0, len(records), WRITE_BATCH_SIZE):
+            conn.execute(sql, records[i:i + WRITE_BATCH_SIZE])
+
+# Fungsi untuk memperbarui label saja pada baris yang teksnya tidak berubah.
+def update_labels(label_df):
+    sql = text("UPDATE preprocessing SET sentiment_pakar = :sentiment_pakar WHERE source_id = :source_id")
+    records = to_records(label_df[['source_id', 'sentiment_pakar']])
+    with engine.begin() as conn:
+        for i in range(0, len(records), WRITE_BATCH_SIZE):
+            conn.execute(sql, records[i:i + WRITE_BATCH_SIZE])
+
+# Fungsi untuk menghapus baris yang sumbernya sudah tidak ada di 'data_efesiensi'.
+def delete_results(source_ids):
+    sql = text("DELETE FROM preprocessing WHERE source_id IN :ids").bindparams(bindparam('ids', expanding=True))
+    with engine.begin() as conn:
+        for i in range(0, len(source_ids), WRITE_BATCH_SIZE):
+            conn.execute(sql, {'ids': source_ids[i:i + WRITE_BATCH_SIZE]})
+
+# Fungsi untuk menjalankan preprocessing hanya pada baris baru atau yang teksnya berubah.
+def run_incremental(df, existing, pipeline, n_workers, compact):
+    existing = existing.set_index('source_id')
+    current = df.set_index('source_id', drop=False)
+
+    # Baris yang sudah tidak ada di sumber (atau kini menjadi duplikat) dihapus.
+    removed_ids = [int(i) for i in existing.index.difference(current.index)]
+    # Baris baru atau yang hash teksnya berbeda diproses ulang.
+    known_hash = existing['text_hash'].reindex(current.index)
+    changed_mask = known_hash.isna() | (known_hash != current['text_hash'])
+    changed_df = current[changed_mask].copy()
+    # Baris yang teksnya sama tetapi labelnya berubah cukup diperbarui labelnya.
+    unchanged = current[~changed_mask]
+    old_labels = existing['sentiment_pakar'].reindex(unchanged.index)
+    relabel_mask = ~((old_labels == unchanged['sentiment_pakar']) | (old_labels.isna() & unchanged['sentiment_pakar'].isna()))
+    relabelled_df = unchanged[relabel_mask]
+
+    logger.info(
+        f"Mode inkremental: {len(changed_df)} baris baru/berubah, {len(relabelled_df)} baris label berubah, "
+        f"{len(removed_ids)} baris dihapus, {len(unchanged) - len(relabelled_df)} baris tidak berubah."
+    )
+
+    if not changed_df.empty:
+        changed_df = run_stages(changed_df, pipeline, n_workers, compact=compact)
+    write_start = time.perf_counter()
+    if not changed_df.empty:
+        upsert_results(changed_df, get_result_columns(compact))
+    if not relabelled_df.empty:
+        update_labels(relabelled_df)
+    if removed_ids:
+        delete_results(removed_ids)
+    record_stage('db_write', time.perf_counter() - write_start, len(changed_df) + len(relabelled_df) + len(removed_ids))
+
+    return {
+        'processed_count': len(changed_df),
+        'relabelled_count': len(relabelled_df),
+        'deleted_count': len(removed_ids),
+        'unchanged_count': len(unchanged) - len(relabelled_df)
+    }
+
+# --- Mode Streaming (Per Chunk) ---
+# Query sumber bersama untuk mode batch dan streaming (diurutkan agar duplikat pertama konsisten).
+SOURCE_QUERY = "SELECT id AS source_id, full_text, sentiment_pakar FROM data_efesiensi ORDER BY id"
+
+# Fungsi untuk menambahkan primary key source_id setelah tabel 'preprocessing' dibuat ulang.
+def add_result_primary_key():
+    # source_id menjadi primary key agar mode inkremental bisa melakukan upsert.
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE preprocessing ADD PRIMARY KEY (source_id)"))
+
+# Fungsi untuk menulis satu chunk hasil ke tabel 'preprocessing' dengan insert multi-baris.
+def write_chunk(result_df, if_exists):
+    write_start = time.perf_counter()
+    result_df.to_sql(
+        name='preprocessing',
+        con=engine,
+        if_exists=if_exists,
+        index=False,
+        method='multi',  # Satu INSERT berisi banyak baris, bukan satu INSERT per baris.
+        chunksize=WRITE_BATCH_SIZE
+    )
+    # Dipanggil dari thread penulis; waktu ini tumpang tindih dengan pemrosesan chunk berikutnya.
+    # VmHWM milik seluruh proses, sehingga puncak memori penulisan ikut tercatat pada tahap proses utama yang berjalan bersamaan.
+    record_stage('db_write', time.perf_counter() - write_start, len(result_df), measure_memory=False)
+
+# Fungsi untuk membaca (server-side cursor), memproses, dan menulis data per chunk.
+# Penulisan chunk sebelumnya berjalan di thread terpisah selama chunk berikutnya dibaca dan diproses.
+def run_streaming(pipeline, n_workers, chunk_size, compact):
+    n_workers = resolve_workers(n_workers)
+    result_columns = get_result_columns(compact)
+    # Hash teks yang sudah dilihat, untuk membuang duplikat lintas chunk.
+    seen_hashes = set()
+    # Hash hasil stemming yang sudah dilihat, untuk menghitung duplikat hasil stemming.
+    seen_stem_hashes = set()
+    stats = {'original_count': 0, 'final_count': 0, 'chunk_count': 0, 'stem_duplicate_count': 0}
+
+    executor = create_worker_pool(pipeline, n_workers) if n_workers > 1 else None
+    writer = ThreadPoolExecutor(max_workers=1)
+    pending_write = None
+    try:
+        # stream_results=True membuat driver memakai server-side cursor sehingga tabel tidak dimuat sekaligus.
+        with engine.connect().execution_options(stream_results=True) as conn:
+            reader = iter(pd.read_sql(text(SOURCE_QUERY), conn, chunksize=chunk_size))
+            while True:
+                # Waktu baca diukur per chunk karena data diambil dari cursor secara bertahap.
+                read_start = time.perf_counter()
+                chunk = next(reader, None)
+                if chunk is None:
+                    break
+                read_rows = len(chunk)
+                record_stage('db_read', time.perf_counter() - read_start, read_rows)
+
+                # Membersihkan baris kosong dan duplikat teks asli, sama seperti mode batch.
+                dedup_start = time.perf_counter()
+                chunk = chunk.dropna(subset=['full_text'])
+                chunk = chunk[chunk['full_text'].astype(str).str.strip() != '']
+                stats['original_count'] += len(chunk)
+                chunk = chunk.drop_duplicates(subset=['full_text']).copy()
+                chunk['text_hash'] = chunk['full_text'].astype(str).apply(compute_text_hash)
+                chunk = chunk[~chunk['text_hash'].isin(seen_hashes)]
+                seen_hashes.update(chunk['text_hash'])
+                record_stage('dedup', time.perf_counter() - dedup_start, read_rows)
+                if chunk.empty:
+                    continue
+
+                chunk = run_stages(chunk, pipeline, n_workers, executor=executor, compact=compact)
+
+                # Menghitung duplikat hasil stemming di dalam chunk maupun terhadap chunk sebelumnya.
+                stem_dedup_start = time.perf_counter()
+                stem_hashes = chunk['stemming'].apply(compute_text_hash)
+                stats['stem_duplicate_count'] += int((stem_hashes.duplicated() | stem_hashes.isin(seen_stem_hashes)).sum())
+                seen_stem_hashes.update(stem_hashes)
+                record_stage('stem_dedup', time.perf_counter() - stem_dedup_start, len(chunk))
+
+                result_df = chunk[result_columns]
+                # Paling banyak satu chunk menunggu ditulis agar memori tetap datar.
+                if pending_write is not None:
+                    pending_write.result()
+                if_exists = 'replace' if stats['chunk_count'] == 0 else 'append'
+                pending_write = writer.submit(write_chunk, result_df, if_exists)
+                stats['chunk_count'] += 1
+                stats['final_count'] += len(result_df)
+                logger.info(f"Chunk {stats['chunk_count']}: {len(result_df)} baris diproses, total {stats['final_count']} baris.")
+
+        if pending_write is not None:
+            pending_write.result()
+    finally:
+        writer.shutdown(wait=True)
+        if executor is not None:
+            executor.shutdown()
+
+    if stats['chunk_count'] > 0:
+        add_result_primary_key()
+        # Tabel dibuat ulang tanpa near-duplicate, sehingga keputusan run sebelumnya tidak berlaku lagi.
+        save_near_duplicate_state(None)
+    logger.info(f"Ditemukan {stats['stem_duplicate_count']} baris duplikat berdasarkan hasil stemming (tidak dihapus).")
+    return stats
+
+# Fungsi untuk membaca seluruh data sekaligus lalu memproses dalam mode penuh atau inkremental.
+def run_batch(pipeline, n_workers, incremental, compact, near_dup_threshold=None, near_dup_action='drop'):
+    # Langkah 0: Membaca data mentah dari database.
+    logger.info("Langkah 0: Membaca data dari database...")
+    # Menjalankan query dan memuat hasilnya ke dalam DataFrame pandas.
+    read_start = time.perf_counter()
+    df = pd.read_sql(SOURCE_QUERY, engine)
+    record_stage('db_read', time.perf_counter() - read_start, len(df))
+    # Mencatat jumlah baris data yang berhasil dibaca.
+    logger.info(f"Berhasil membaca {len(df)} baris data mentah dari tabel.")
+
+    # Memeriksa apakah DataFrame kosong setelah dibaca.
+    if df.empty:
+        # Jika kosong, beri peringatan dan hentikan proses.
+        logger.warning("Tidak ada data di tabel 'data_efesiensi' untuk diproses.")
+        logger.warning("Proses preprocessing dihentikan.")
+        # Mengembalikan status kegagalan.
+        return {
+            'success': False,
+            'error': "Tidak ada data di tabel 'data_efesiensi' untuk diproses."
+        }
+
+    # Menampilkan 2 baris pertama dari data mentah sebagai sampel.
+    logger.info("Contoh data mentah:\n" + df.head(2).to_string())
+
+    # Membersihkan DataFrame dari baris yang kosong dan duplikat teks asli.
+    dedup_start = time.perf_counter()
+    read_rows = len(df)
+    df = df.dropna(subset=['full_text'])
+    df = df[df['full_text'].astype(str).str.strip() != '']
+
+    count_before_deduplication = len(df)
+    logger.info(f"Jumlah data sebelum penghapusan duplikat teks asli: {count_before_deduplication}")
+    df = df.drop_duplicates(subset=['full_text'])
+    duplicates_removed = count_before_deduplication - len(df)
+    logger.info(f"Menghapus {duplicates_removed} duplikat berdasarkan teks asli.")
+    logger.info(f"Jumlah data setelah pembersihan awal: {len(df)}")
+
+    # Memeriksa lagi jika DataFrame menjadi kosong setelah dibersihkan.
+    if df.empty:
+        logger.warning("Setelah dibersihkan, tidak ada data valid yang tersisa untuk diproses.")
+        return {
+            'success': False,
+            'error': 'Setelah dibersihkan, tidak ada data valid yang tersisa.'
+        }
+
+    # Menandai setiap baris sumber dengan hash teks aslinya.
+    df = df.copy()
+    df['text_hash'] = df['full_text'].astype(str).apply(compute_text_hash)
+    record_stage('dedup', time.perf_counter() - dedup_start, read_rows)
+
+    near_dup_setting = resolve_near_dup_setting(near_dup_threshold, near_dup_action)
+    existing = None
+    if incremental:
+        read_start = time.perf_counter()
+        existing = load_existing_state(compact)
+        near_dup_state = load_near_duplicate_state() if existing is not None else None
+        record_stage('db_read', time.perf_counter() - read_start, len(existing) if existing is not None else 0)
+        # Hasil tersimpan hanya bisa diperbarui per baris jika dibuat dengan pengaturan near-duplicate yang sama.
+        previous_setting = near_dup_state[0] if near_dup_state else None
+        if existing is not None and previous_setting != near_dup_setting:
+            logger.info(f"Pengaturan near-duplicate berubah ({previous_setting} -> {near_dup_setting}), beralih ke mode penuh.")
+            existing = None
+    if existing is not None:
+        # --- Mode inkremental: hanya memproses delta ---
+        near_dup_decisions = near_dup_state[1] if near_dup_state else pd.DataFrame(columns=NEAR_DUP_DECISION_COLUMNS)
+        df, valid_decisions = apply_near_duplicate_decisions(df, near_dup_decisions)
+        if len(valid_decisions) != len(near_dup_decisions):
+            save_near_duplicate_state(near_dup_setting, valid_decisions)
+        if near_dup_setting:
+            logger.warning("Baris baru/berubah tidak diperiksa near-duplicate terhadap data lama; jalankan mode penuh untuk mengelompokkan ulang.")
+        return {
+            'success': True,
+            'mode': 'incremental',
+            'original_count': count_before_deduplication,
+            'final_count': len(df),
+            'near_duplicate_excluded': int((valid_decisions['decision'] == 'drop').sum()),
+            **run_incremental(df, existing, pipeline, n_workers, compact)
+        }
+
+    # --- Mode penuh: memproses semua baris dan mengganti tabel ---
+    df = run_stages(df, pipeline, n_workers, compact=compact)
+    stem_dedup_start = time.perf_counter()
+    stem_dedup_rows = len(df)
+    duplicate_stats = summarize_stem_duplicates(df)
+    near_dup_decisions = None
+    if near_dup_threshold:
+        df, near_dup_stats, near_dup_decisions = resolve_near_duplicates(df, near_dup_threshold, near_dup_action)
+        duplicate_stats.update(near_dup_stats)
+    record_stage('stem_dedup', time.perf_counter() - stem_dedup_start, stem_dedup_rows)
+
+    # --- Tahap 8: Menyimpan hasil ke database ---
+    logger.info("\n--- Langkah 8: Menyimpan hasil ke database ---")
+    # Memilih kolom-kolom yang relevan untuk disimpan ke database.
+    result_df = df[get_result_columns(compact)]
+
+    # Menyimpan DataFrame hasil ke tabel 'preprocessing' di database.
+    write_start = time.perf_counter()
+    result_df.to_sql(
+        name='preprocessing',  # Nama tabel tujuan.
+        con=engine,  # Engine koneksi database yang digunakan.
+        if_exists='replace',  # Jika tabel sudah ada, ganti dengan yang baru.
+        index=False  # Tidak menyertakan indeks DataFrame sebagai kolom di tabel.
+    )
+    add_result_primary_key()
+    save_near_duplicate_state(near_dup_setting, near_dup_decisions)
+    record_stage('db_write', time.perf_counter() - write_start, len(result_df))
+    # Mencatat informasi jumlah baris yang berhasil disimpan.
+    logger.info(f"Berhasil menyimpan {len(result_df)} baris ke tabel 'preprocessing'.")
+
+    return {
+        'success': True,
+        'mode': 'full',
+        'original_count': count_before_deduplication, # Menggunakan hitungan sebelum duplikasi awal
+        'final_count': len(result_df),
+        'processed_count': len(result_df),
+        **duplicate_stats
+    }
 
 # --- Fungsi Utama Preprocessing ---
 
 # Fungsi utama yang menjalankan seluruh alur kerja preprocessing.
-def run_preprocessing():
+# n_workers > 1 menjalankan tahap per baris di process pool; hasilnya identik dengan jalur serial.
+# incremental=True hanya memproses baris yang baru/berubah dan menyimpan hasilnya dengan upsert.
+# chunk_size > 0 membaca, memproses, dan menulis data per chunk sehingga memori tidak bergantung pada ukuran data.
+# compact=True hanya menyimpan teks sumber dan hasil stemming; tahap antara dihitung ulang saat ditampilkan.
+# near_dup_threshold (0-1) mengaktifkan deteksi near-duplicate MinHash/LSH dengan aksi 'drop', 'merge', atau 'flag'.
+def run_preprocessing(n_workers=1, incremental=False, chunk_size=None, compact=False,
+                      near_dup_threshold=None, near_dup_action='drop'):
+    # Mode streaming selalu memproses ulang seluruh data; kombinasi dengan mode inkremental ditolak
+    # agar pemanggil tidak mengira hanya tweet baru/berubah yang diproses.
+    if chunk_size and incremental:
+        logger.warning("Mode inkremental tidak didukung bersama chunk_size (mode streaming).")
+        return {'success': False, 'error': "Mode inkremental tidak bisa digabung dengan chunk_size (mode streaming). "
+                                           "Nonaktifkan salah satunya."}
     try:
         # Mencatat waktu mulai proses.
-        start_time = time.time()
+        start_time = time.perf_counter()
+        # Mereset statistik cache stemming dan statistik per tahap untuk run ini.
+        stem_cache_stats['hits'] = 0
+        stem_cache_stats['misses'] = 0
+        stage_metrics.clear()
+        start_memory_tracking()
+        run_id = uuid.uuid4().hex
         # Mencetak header untuk menandakan proses dimulai.
         logger.info("="*50)
         logger.info("MEMULAI PROSES PREPROCESSING DATA")
         logger.info("="*50)
 
-        # Langkah 0: Membaca data mentah dari database.
-        logger.info("Langkah 0: Membaca data dari database...")
-        # Query SQL untuk mengambil kolom yang dibutuhkan dari tabel.
-        query = "SELECT full_text, sentiment_pakar FROM data_efesiensi"
-        # Menjalankan query dan memuat hasilnya ke dalam DataFrame pandas.
-        df = pd.read_sql(query, engine)
-        # Mencatat jumlah baris data yang berhasil dibaca.
-        logger.info(f"Berhasil membaca {len(df)} baris data mentah dari tabel.")
-
-        # Memeriksa apakah DataFrame kosong setelah dibaca.
-        if df.empty:
-            # Jika kosong, beri peringatan dan hentikan proses.
-            logger.warning("Tidak ada data di tabel 'data_efesiensi' untuk diproses.")
-            logger.warning("Proses preprocessing dihentikan.")
-            # Mengembalikan status kegagalan.
-            return {
-                'success': False,
-                'error': "Tidak ada data di tabel 'data_efesiensi' untuk diproses."
-            }
-        
-        # Menampilkan 2 baris pertama dari data mentah sebagai sampel.
-        logger.info("Contoh data mentah:\n" + df.head(2).to_string())
-
-        # Membersihkan DataFrame dari baris yang kosong dan duplikat teks asli.
-        df = df.dropna(subset=['full_text'])
-        df = df[df['full_text'].astype(str).str.strip() != '']
-        
-        count_before_deduplication = len(df)
-        logger.info(f"Jumlah data sebelum penghapusan duplikat teks asli: {count_before_deduplication}")
-        df = df.drop_duplicates(subset=['full_text'])
-        duplicates_removed = count_before_deduplication - len(df)
-        logger.info(f"Menghapus {duplicates_removed} duplikat berdasarkan teks asli.")
-        logger.info(f"Jumlah data setelah pembersihan awal: {len(df)}")
-
-        # Memeriksa lagi jika DataFrame menjadi kosong setelah dibersihkan.
-        if df.empty:
-            logger.warning("Setelah dibersihkan, tidak ada data valid yang tersisa untuk diproses.")
-            return {
-                'success': False,
-                'error': 'Setelah dibersihkan, tidak ada data valid yang tersisa.'
-            }
-
-        # Menentukan indeks sampel untuk ditampilkan di log.
-        sample_index = 0 if not df.empty else None
-
-        # --- Tahap 1: Case Folding ---
-        logger.info("\n--- Langkah 1: Case Folding ---")
-        df['case_folding'] = df['full_text'].apply(case_folding)
-        if sample_index is not None:
-            logger.info("Contoh: " + df['case_folding'].iloc[sample_index])
-
-        # --- Tahap 2: Cleansing ---
-        logger.info("\n--- Langkah 2: Cleansing ---")
-        df['cleansing'] = df['case_folding'].apply(cleansing)
-        if sample_index is not None:
-            logger.info("Contoh: " + df['cleansing'].iloc[sample_index])
-
-        # --- Tahap 3: Tokenizing ---
-        logger.info("\n--- Langkah 3: Tokenizing ---")
-        df['tokens'] = df['cleansing'].apply(tokenize)
-        if sample_index is not None:
-            logger.info("Contoh: " + str(df['tokens'].iloc[sample_index]))
-
-        # --- Tahap 4: Normalisasi ---
-        logger.info("\n--- Langkah 4: Normalisasi ---")
-        norm_dict = load_normalization_dict('kamus/normalisasi.txt')
-        df['normalized_tokens'] = df['tokens'].apply(lambda t: normalize_tokens(t, norm_dict))
-        if sample_index is not None:
-            logger.info("Contoh: " + str(df['normalized_tokens'].iloc[sample_index]))
-
-        # --- Tahap 5: Stopword Removal ---
-        logger.info("\n--- Langkah 5: Stopword Removal ---")
-        df['stopwords_tokens'] = df['normalized_tokens'].apply(remove_stopwords)
-        if sample_index is not None:
-            logger.info("Contoh: " + str(df['stopwords_tokens'].iloc[sample_index]))
-
-        # --- Tahap 6: Stemming ---
-        logger.info("\n--- Langkah 6: Stemming ---")
-        df['stemming_tokens'] = df['stopwords_tokens'].apply(apply_stemmer)
-        if sample_index is not None:
-            logger.info("Contoh: " + str(df['stemming_tokens'].iloc[sample_index]))
-
-        # --- Tahap 7: Menggabungkan kembali token menjadi string ---
-        logger.info("\n--- Langkah 7: Menggabungkan token menjadi string ---")
-        df['tokenizing'] = df['tokens'].apply(lambda x: ' '.join(x) if isinstance(x, list) else '')
-        df['normalized'] = df['normalized_tokens'].apply(lambda x: ' '.join(x) if isinstance(x, list) else '')
-        df['stopwords'] = df['stopwords_tokens'].apply(lambda x: ' '.join(x) if isinstance(x, list) else '')
-        df['stemming'] = df['stemming_tokens'].apply(lambda x: ' '.join(x) if isinstance(x, list) else '')
-        logger.info("Penggabungan token selesai.")
-
-        # --- PERUBAHAN BARU: Menampilkan detail duplikat SEBELUM menghapus ---
-        logger.info("\n--- Menganalisis duplikat berdasarkan hasil stemming ---")
-        
-        # Cari semua baris yang merupakan duplikat berdasarkan kolom 'stemming'
-        # keep=False menandai SEMUA kemunculan duplikat sebagai True
-        is_duplicate = df.duplicated(subset=['stemming'], keep=False)
-        
-        # Filter DataFrame untuk hanya mendapatkan baris-baris yang duplikat
-        duplicated_df = df[is_duplicate]
-        
-        if not duplicated_df.empty:
-            # Hitung jumlah unik duplikat untuk dilaporkan
-            num_duplicates_to_remove = len(duplicated_df[duplicated_df.duplicated(subset=['stemming'])])
-            logger.warning(f"Ditemukan {num_duplicates_to_remove} baris duplikat yang akan dihapus. Rincian:")
-            
-            # Kelompokkan berdasarkan teks stemming untuk menampilkannya bersama-sama
-            for stemmed_text, group in duplicated_df.groupby('stemming'):
-                # Hanya tampilkan jika ada lebih dari satu teks asli dalam grup
-                if len(group) > 1:
-                    logger.info(f"\n- Teks Stemming Duplikat: '{stemmed_text}'")
-                    logger.info("  Dihasilkan dari Teks Asli berikut:")
-                    for i, original_text in enumerate(group['full_text'], 1):
-                        logger.info(f"    {i}. {original_text}")
+        # Membuat pipeline dengan kamus normalisasi dan stopword dari leksikon terkompilasi, sekali untuk semua mode.
+        pipeline = create_pipeline()
+
+        if chunk_size:
+            logger.info(f"Mode streaming: memproses data per {chunk_size} baris.")
+            if near_dup_threshold:
+                logger.warning("Deteksi near-duplicate membutuhkan seluruh data dan dilewati pada mode streaming.")
+            result = {'success': True, 'mode': 'streaming', **run_streaming(pipeline, n_workers, chunk_size, compact)}
+            if result['final_count'] == 0:
+                logger.warning("Tidak ada data valid di tabel 'data_efesiensi' untuk diproses.")
+                return {'success': False, 'error': "Tidak ada data valid di tabel 'data_efesiensi' untuk diproses."}
         else:
-            logger.info("Tidak ada duplikat yang ditemukan berdasarkan hasil stemming.")
-        # --- AKHIR PERUBAHAN BARU ---
-
-        # Lanjutkan dengan proses penghapusan duplikat
-        count_before_stem_deduplication = len(df)
-        # df = df.drop_duplicates(subset=['stemming'], keep='first')
-        count_after_stem_deduplication = len(df)
-        stem_duplicates_removed = count_before_stem_deduplication - count_after_stem_deduplication
-        logger.info(f"\nProses penghapusan: {stem_duplicates_removed} duplikat berdasarkan hasil stemming telah dihapus.")
-        logger.info(f"Jumlah data final: {count_after_stem_deduplication}")
-        
-        # --- Tahap 8: Menyimpan hasil ke database ---
-        logger.info("\n--- Langkah 8: Menyimpan hasil ke database ---")
-        # Memilih kolom-kolom yang relevan untuk disimpan ke database.
-        result_df = df[[
-            'full_text', 'case_folding', 'cleansing', 'tokenizing',
-            'normalized', 'stopwords', 'stemming', 'sentiment_pakar'
-        ]]
-                
-        # Menyimpan DataFrame hasil ke tabel 'preprocessing' di database.
-        result_df.to_sql(
-            name='preprocessing',  # Nama tabel tujuan.
-            con=engine,  # Engine koneksi database yang digunakan.
-            if_exists='replace',  # Jika tabel sudah ada, ganti dengan yang baru.
-            index=False  # Tidak menyertakan indeks DataFrame sebagai kolom di tabel.
-        )
-        # Mencatat informasi jumlah baris yang berhasil disimpan.
-        logger.info(f"Berhasil menyimpan {len(result_df)} baris ke tabel 'preprocessing'.")
+            result = run_batch(pipeline, n_workers, incremental, compact, near_dup_threshold, near_dup_action)
+            if not result['success']:
+                return result
+
+        logger.info(f"Cache stemming: {stem_cache_stats['hits']} hit, {stem_cache_stats['misses']} miss.")
+        # Menyimpan kata-kata baru ke cache di disk agar run berikutnya tidak perlu men-stem ulang.
+        save_stem_cache(new_stems)
+        new_stems.clear()
 
         # Mencatat waktu selesai proses.
-        end_time = time.time()
+        end_time = time.perf_counter()
         # Menghitung total waktu pemrosesan.
         processing_time = round(end_time - start_time, 2)
         # Mencetak footer sebagai penanda proses selesai beserta total waktunya.
@@ -301,13 +917,28 @@ def run_preprocessing():
         logger.info(f"PROSES PREPROCESSING SELESAI dalam {processing_time} detik.")
         logger.info("="*50)
 
-        # Mengembalikan dictionary yang berisi ringkasan hasil proses.
-        return {
-            'success': True,
-            'original_count': count_before_deduplication, # Menggunakan hitungan sebelum duplikasi awal
-            'final_count': len(result_df),
-            'time_taken': processing_time
+        # Menyusun ringkasan hasil proses beserta statistik per tahap.
+        summary = {
+            **result,
+            'run_id': run_id,
+            'storage': 'compact' if compact else 'full',
+            'time_taken': processing_time,
+            'rows_per_sec': round(result['final_count'] / processing_time, 1) if processing_time > 0 else None,
+            'stages': summarize_stage_metrics(),
+            # Puncak seluruh run: maksimum puncak per tahap ditambah sisa waktu setelah tahap terakhir.
+            'peak_memory_mb': max_or_none(run_memory['peak_mb'], take_peak_memory_mb()),
+            'worker_peak_memory_mb': run_memory['worker_peak_mb'],
+            'stem_cache_hits': stem_cache_stats['hits'],
+            'stem_cache_misses': stem_cache_stats['misses']
         }
+        for stage in summary['stages']:
+            logger.info(f"Tahap {stage['stage']}: {stage['seconds']} detik, {stage['rows']} baris, "
+                        f"{stage['rows_per_sec']} baris/detik, {stage['tokens']} token, "
+                        f"puncak memori {stage['peak_memory_mb']} MB.")
+        save_run_history(run_id, summary, resolve_workers(n_workers))
+
+        # Mengembalikan dictionary yang berisi ringkasan hasil proses.
+        return summary
 
     # Menangkap dan menangani kesalahan fatal yang mungkin terjadi selama proses utama.
     except Exception as e:
@@ -1,4 +1,11 @@
 import os
+import pickle
+
+# Lokasi artefak leksikon terkompilasi (kamus normalisasi + stopword) yang dimuat oleh lexicon.py
+LEXICON_SOURCE = os.path.join('kamus', 'normalisasi.txt')
+LEXICON_ARTIFACT = os.path.join('cache', 'lexicon.pkl')
+# Versi format artefak; naikkan jika struktur isi pickle berubah
+LEXICON_FORMAT_VERSION = 1
 
 def remove_duplicate_lines(lines):
     """Menghapus baris duplikat dari list string"""
@@ -15,43 +22,86 @@ def validate_line(line):
     parts = line.strip().split('\t')
     return len(parts) == 2
 
-folder = 'kamus'
+def convert_kamus_folder(folder='kamus'):
+    """Mengubah pemisah koma menjadi tab untuk semua file kamus (*.txt -> *_tab.txt)"""
+    for filename in os.listdir(folder):
+        if filename.endswith('.txt') and not filename.endswith('_tab.txt'):
+            input_path = os.path.join(folder, filename)
+            output_path = os.path.join(folder, filename.replace('.txt', '_tab.txt'))
+
+            with open(input_path, 'r', encoding='utf-8') as f:
+                content = f.readlines()
+
+            # Hapus baris kosong & whitespace
+            cleaned_content = [line.strip() for line in content if line.strip()]
+
+            # Hapus baris duplikat
+            unique_content = remove_duplicate_lines(cleaned_content)
 
-for filename in os.listdir(folder):
-    if filename.endswith('.txt') and not filename.endswith('_tab.txt'):
-        input_path = os.path.join(folder, filename)
-        output_path = os.path.join(folder, filename.replace('.txt', '_tab.txt'))
+            # Validasi jumlah kolom dan hapus yang tidak sesuai
+            valid_content = []
+            invalid_lines = []
 
-        with open(input_path, 'r', encoding='utf-8') as f:
-            content = f.readlines()
+            for line in unique_content:
+                if validate_line(line):
+                    valid_content.append(line)
+                else:
+                    invalid_lines.append(line)
 
-        # Hapus baris kosong & whitespace
-        cleaned_content = [line.strip() for line in content if line.strip()]
+            # Jika ada baris tidak valid, tampilkan pesan
+            if invalid_lines:
+                print(f"\n[⚠️ Baris tidak valid di {filename}]")
+                for line in invalid_lines:
+                    print(f"→ {line}")
 
-        # Hapus baris duplikat
-        unique_content = remove_duplicate_lines(cleaned_content)
+            # Ganti koma jadi tab
+            modified_content = [line.replace(',', '\t') for line in valid_content]
 
-        # Validasi jumlah kolom dan hapus yang tidak sesuai
-        valid_content = []
-        invalid_lines = []
+            # Simpan ke file baru
+            with open(output_path, 'w', encoding='utf-8') as f:
+                f.write('\n'.join(modified_content) + '\n')
 
-        for line in unique_content:
-            if validate_line(line):
-                valid_content.append(line)
-            else:
-                invalid_lines.append(line)
+            print(f"\n✅ File diproses dan duplikasi dihapus: {output_path}")
 
-        # Jika ada baris tidak valid, tampilkan pesan
-        if invalid_lines:
-            print(f"\n[⚠️ Baris tidak valid di {filename}]")
-            for line in invalid_lines:
-                print(f"→ {line}")
+def parse_normalization_file(filepath):
+    """Membaca kamus normalisasi berformat 'slang<TAB>baku' menjadi dictionary"""
+    norm_dict = {}
+    with open(filepath, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line and '\t' in line:
+                slang, formal = line.split('\t', 1)
+                norm_dict[slang] = formal
+    return norm_dict
 
-        # Ganti koma jadi tab
-        modified_content = [line.replace(',', '\t') for line in valid_content]
+def load_sastrawi_stopwords():
+    """Mengambil daftar stopword bawaan Sastrawi sebagai frozenset"""
+    from Sastrawi.StopWordRemover.StopWordRemoverFactory import StopWordRemoverFactory
+    return frozenset(StopWordRemoverFactory().get_stop_words())
 
-        # Simpan ke file baru
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(modified_content) + '\n')
+def build_lexicon_artifact(source_path=LEXICON_SOURCE, artifact_path=LEXICON_ARTIFACT):
+    """
+    Mengompilasi kamus normalisasi dan stopword menjadi satu file pickle.
+    mtime file sumber ikut disimpan agar loader tahu kapan artefak harus dibangun ulang.
+    """
+    source_mtime = os.stat(source_path).st_mtime_ns
+    payload = {
+        'format_version': LEXICON_FORMAT_VERSION,
+        'source_path': source_path,
+        'source_mtime': source_mtime,
+        'normalization': parse_normalization_file(source_path),
+        'stopwords': load_sastrawi_stopwords()
+    }
+    os.makedirs(os.path.dirname(artifact_path), exist_ok=True)
+    # Tulis ke file sementara lalu ganti secara atomik agar pembaca lain tidak melihat file setengah jadi
+    tmp_path = f"{artifact_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, artifact_path)
+    return payload
 
-        print(f"\n✅ File diproses dan duplikasi dihapus: {output_path}")
\ No newline at end of file
+if __name__ == '__main__':
+    convert_kamus_folder('kamus')
+    payload = build_lexicon_artifact()
+    print(f"\n✅ Artefak leksikon dibuat: {LEXICON_ARTIFACT} "
+          f"({len(payload['normalization'])} kata normalisasi, {len(payload['stopwords'])} stopword)")
@@ -0,0 +1,206 @@
+# --- Indeks Statistik Term (Eksplorasi Fitur) ---
+# Dibangun sekali per ekstraksi dari matriks TF-IDF data latih (sebelum penyeimbangan) dengan operasi sparse
+# tervektorisasi: document frequency per term, total bobot per kelas, serta top-k term per dokumen dan per kelas.
+# Endpoint eksplorasi di app.py hanya membaca indeks ini (paginasi), tanpa menghitung ulang dari matriks.
+import os
+import time
+import pickle
+import logging
+import threading
+import numpy as np
+import scipy.sparse as sp
+
+logger = logging.getLogger(__name__)
+
+TERM_INDEX_PATH = os.path.join('cache', 'term_index.pkl')
+# Jumlah term teratas yang disimpan per dokumen dan per kelas.
+TERM_INDEX_TOP_K = 10
+# Batas ukuran halaman untuk endpoint eksplorasi.
+MAX_PER_PAGE = 200
+
+def top_k_positions_per_row(indptr, values, k):
+    """
+    Posisi top-k nilai per baris (struktur indptr CSR) tanpa loop Python: entri diurutkan berdasarkan
+    (baris, nilai menurun), lalu peringkat di dalam baris dihitung dari posisi terhadap indptr.
+    Mengembalikan (indptr hasil, posisi entri terpilih).
+    """
+    row_lengths = np.diff(indptr)
+    row_ids = np.repeat(np.arange(len(row_lengths)), row_lengths)
+    order = np.lexsort((-values, row_ids))
+    rank = np.arange(len(order)) - indptr[row_ids[order]]
+    return np.concatenate(([0], np.cumsum(np.minimum(row_lengths, k)))), order[rank < k]
+
+def top_k_per_row(X, k):
+    """Top-k entri per baris matriks CSR; mengembalikan (indptr, kolom, bobot) dalam format mirip CSR."""
+    indptr, keep = top_k_positions_per_row(X.indptr, X.data, k)
+    return indptr, X.indices[keep], X.data[keep]
+
+def top_k_per_dense_row(values, k):
+    """Indeks top-k per baris array dense (urut menurun) memakai argpartition."""
+    k = min(k, values.shape[1])
+    if k == 0:
+        return np.empty((values.shape[0], 0), dtype=np.int64)
+    candidates = np.argpartition(-values, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(values, candidates, axis=1), axis=1, kind='stable')
+    return np.take_along_axis(candidates, order, axis=1)
+
+def build_term_index(X, labels, texts, feature_names, key=None, top_k=TERM_INDEX_TOP_K):
+    """Membangun indeks statistik term dari matriks TF-IDF (baris = dokumen latih)."""
+    start_time = time.perf_counter()
+    X = sp.csr_matrix(X, dtype=np.float64)
+    labels = np.asarray(labels)
+    classes, label_ids = np.unique(labels, return_inverse=True)
+    n_docs = X.shape[0]
+
+    X_csc = X.tocsc()
+    X_csc.sort_indices()
+    # Matriks indikator kelas x dokumen: satu perkalian sparse menghasilkan total per kelas untuk semua term.
+    indicator = sp.csr_matrix((np.ones(n_docs), (label_ids, np.arange(n_docs))), shape=(len(classes), n_docs))
+    presence = X.copy()
+    presence.data = np.ones_like(presence.data)
+    class_totals = (indicator @ X).toarray()
+    class_document_frequency = (indicator @ presence).toarray().astype(np.int64)
+
+    doc_top_indptr, doc_top_terms, doc_top_scores = top_k_per_row(X, top_k)
+    document_frequency = np.diff(X_csc.indptr)
+    term_totals = np.asarray(X.sum(axis=0)).ravel()
+
+    index = {
+        'key': key,
+        'created_at': time.time(),
+        'top_k': top_k,
+        'classes': classes,
+        'feature_names': np.asarray(feature_names, dtype=str),
+        'document_frequency': document_frequency,
+        'term_totals': term_totals,
+        'class_totals': class_totals,
+        'class_document_frequency': class_document_frequency,
+        'class_document_counts': np.bincount(label_ids, minlength=len(classes)),
+        'class_top_terms': top_k_per_dense_row(class_totals, top_k),
+        'doc_top_indptr': doc_top_indptr,
+        'doc_top_terms': doc_top_terms,
+        'doc_top_scores': doc_top_scores,
+        'doc_labels': label_ids,
+        'texts': list(texts),
+        # Struktur CSC dipakai untuk mencari dokumen yang memuat suatu term.
+        'term_doc_indptr': X_csc.indptr,
+        'term_doc_ids': X_csc.indices,
+        'term_doc_scores': X_csc.data,
+        # Urutan term yang sudah diurutkan untuk paginasi.
+        'term_orders': {
+            'df': np.argsort(-document_frequency, kind='stable'),
+            'total': np.argsort(-term_totals, kind='stable')
+        }
+    }
+    logger.info(f"Indeks term dibangun: {len(index['feature_names'])} term, {n_docs} dokumen "
+                f"({time.perf_counter() - start_time:.3f} detik).")
+    return index
+
+def save_term_index(index, path=TERM_INDEX_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+_loaded = None
+_lock = threading.Lock()
+
+def load_term_index(path=TERM_INDEX_PATH):
+    """Memuat indeks (disimpan di memori selama file tidak berubah); None jika belum ada ekstraksi."""
+    global _loaded
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    with _lock:
+        if _loaded is None or _loaded[0] != mtime:
+            with open(path, 'rb') as f:
+                _loaded = (mtime, pickle.load(f))
+        return _loaded[1]
+
+def get_term_index_key():
+    index = load_term_index()
+    return index['key'] if index is not None else None
+
+def paginate(total, page, per_page):
+    """Menghitung batas slice dan metadata halaman (page dimulai dari 1)."""
+    per_page = max(1, min(int(per_page), MAX_PER_PAGE))
+    page = max(1, int(page))
+    start = (page - 1) * per_page
+    return start, min(start + per_page, total), {'page': page, 'per_page': per_page, 'total': int(total)}
+
+def _class_values(index, values):
+    return {str(label): float(value) for label, value in zip(index['classes'], values)}
+
+def _term_summary(index, term_id):
+    return {
+        'term_id': int(term_id),
+        'term': str(index['feature_names'][term_id]),
+        'document_frequency': int(index['document_frequency'][term_id]),
+        'total_tfidf': round(float(index['term_totals'][term_id]), 6),
+        'class_totals': _class_values(index, np.round(index['class_totals'][:, term_id], 6)),
+        'class_document_frequency': {str(label): int(count) for label, count
+                                     in zip(index['classes'], index['class_document_frequency'][:, term_id])}
+    }
+
+def _document_top_terms(index, doc_id):
+    start, end = index['doc_top_indptr'][doc_id], index['doc_top_indptr'][doc_id + 1]
+    return [{'term': str(index['feature_names'][term_id]), 'score': round(float(score), 6)}
+            for term_id, score in zip(index['doc_top_terms'][start:end], index['doc_top_scores'][start:end])]
+
+def query_terms(index, page=1, per_page=50, sort='df', q=None):
+    """Daftar term dengan statistiknya; sort 'df', 'total', atau 'term', q = filter substring."""
+    order = index['term_orders'].get(sort)
+    if order is None:
+        order = np.arange(len(index['feature_names']))
+    if q:
+        matches = np.char.find(index['feature_names'][order], q.lower()) >= 0
+        order = order[matches]
+    start, end, meta = paginate(len(order), page, per_page)
+    return {**meta, 'items': [_term_summary(index, term_id) for term_id in order[start:end]]}
+
+def query_term(index, term, page=1, per_page=50):
+    """Statistik satu term beserta dokumen yang memuatnya (urut bobot TF-IDF menurun); None jika tidak ada."""
+    names = index['feature_names']
+    # Nama fitur TF-IDF sudah terurut sehingga pencarian cukup dengan binary search.
+    term_id = int(np.searchsorted(names, term))
+    if term_id >= len(names) or names[term_id] != term:
+        return None
+    begin, finish = index['term_doc_indptr'][term_id], index['term_doc_indptr'][term_id + 1]
+    doc_ids = index['term_doc_ids'][begin:finish]
+    scores = index['term_doc_scores'][begin:finish]
+    order = np.argsort(-scores, kind='stable')
+    start, end, meta = paginate(len(order), page, per_page)
+    documents = [{
+        'doc_id': int(doc_ids[i]),
+        'text': index['texts'][doc_ids[i]],
+        'label': str(index['classes'][index['doc_labels'][doc_ids[i]]]),
+        'score': round(float(scores[i]), 6)
+    } for i in order[start:end]]
+    return {**_term_summary(index, term_id), 'documents': {**meta, 'items': documents}}
+
+def query_documents(index, page=1, per_page=50, label=None):
+    """Daftar dokumen latih beserta label dan top-k term-nya; label = filter kelas."""
+    doc_ids = np.arange(len(index['texts']))
+    if label:
+        matches = np.flatnonzero(index['classes'] == label)
+        doc_ids = doc_ids[index['doc_labels'] == matches[0]] if len(matches) else doc_ids[:0]
+    start, end, meta = paginate(len(doc_ids), page, per_page)
+    items = [{
+        'doc_id': int(doc_id),
+        'text': index['texts'][doc_id],
+        'label': str(index['classes'][index['doc_labels'][doc_id]]),
+        'top_terms': _document_top_terms(index, doc_id)
+    } for doc_id in doc_ids[start:end]]
+    return {**meta, 'items': items}
+
+def query_classes(index):
+    """Ringkasan per kelas: jumlah dokumen dan top-k term berdasarkan total bobot TF-IDF."""
+    return [{
+        'label': str(label),
+        'document_count': int(index['class_document_counts'][class_id]),
+        'top_terms': [{'term': str(index['feature_names'][term_id]),
+                       'total_tfidf': round(float(index['class_totals'][class_id, term_id]), 6)}
+                      for term_id in index['class_top_terms'][class_id]]
+    } for class_id, label in enumerate(index['classes'])]
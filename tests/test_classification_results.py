@@ -0,0 +1,74 @@
+import pytest
+from sqlalchemy import create_engine, text
+
+import classification_results
+from classification_results import MAX_RESULT_PAGE_SIZE, RESULTS_TABLE, query_results
+
+LABELS = ['positif', 'negatif', 'netral']
+RUN_ID = 'run-a'
+
+@pytest.fixture
+def results(tmp_path, monkeypatch):
+    # Skema MySQL memakai KEY di dalam CREATE TABLE; untuk SQLite cukup tabel dengan primary key yang sama.
+    engine = create_engine(f"sqlite:///{tmp_path / 'hasil.db'}")
+    with engine.begin() as conn:
+        conn.execute(text(f"""
+            CREATE TABLE {RESULTS_TABLE} (
+                run_id VARCHAR(32) NOT NULL,
+                row_no INT NOT NULL,
+                teks TEXT NOT NULL,
+                sentimen_aktual VARCHAR(32) NOT NULL,
+                sentimen_prediksi VARCHAR(32) NOT NULL,
+                benar TINYINT(1) NOT NULL,
+                PRIMARY KEY (run_id, row_no)
+            )
+        """))
+        rows = []
+        for run_id, n_rows in ((RUN_ID, 23), ('run-b', 5)):
+            for row_no in range(n_rows):
+                actual, predicted = LABELS[row_no % 3], LABELS[row_no % 2]
+                rows.append({'run_id': run_id, 'row_no': row_no, 'teks': f'teks {run_id} {row_no}',
+                             'actual': actual, 'predicted': predicted, 'benar': int(actual == predicted)})
+        conn.execute(text(f"INSERT INTO {RESULTS_TABLE} VALUES (:run_id, :row_no, :teks, :actual, :predicted, :benar)"),
+                     rows)
+    monkeypatch.setattr(classification_results, 'get_results_engine', lambda: engine)
+    return engine
+
+def read_all_pages(limit, **filters):
+    pages, after = [], None
+    while True:
+        page = query_results(RUN_ID, after=after, limit=limit, **filters)
+        pages.append(page['items'])
+        after = page['next_after']
+        if after is None:
+            return pages
+
+@pytest.mark.parametrize('limit', [1, 5, 22, 23, 50])
+def test_pages_cover_run_once_in_order(results, limit):
+    pages = read_all_pages(limit)
+    row_numbers = [item['row_no'] for page in pages for item in page]
+    assert row_numbers == list(range(23))
+    assert all(len(page) == limit for page in pages[:-1]) and 0 < len(pages[-1]) <= limit
+
+def test_next_after_is_none_on_exact_last_page(results):
+    page = query_results(RUN_ID, after=17, limit=5)
+    assert [item['row_no'] for item in page['items']] == [18, 19, 20, 21, 22]
+    assert page['next_after'] is None
+    assert query_results(RUN_ID, after=22) == {'items': [], 'next_after': None}
+
+def test_filters_page_through_matching_rows_only(results):
+    items = [item for page in read_all_pages(3, actual='positif', misclassified=True) for item in page]
+    assert items and all(item['actual'] == 'positif' and not item['correct'] for item in items)
+    assert [item['row_no'] for item in items] == [row_no for row_no in range(23)
+                                                  if row_no % 3 == 0 and row_no % 2 == 1]
+
+    predicted = [item for page in read_all_pages(4, predicted='negatif') for item in page]
+    assert [item['row_no'] for item in predicted] == list(range(1, 23, 2))
+
+def test_limit_is_clamped(results):
+    assert len(query_results(RUN_ID, limit=0)['items']) == 1
+    assert len(query_results(RUN_ID, limit=MAX_RESULT_PAGE_SIZE + 1000)['items']) == 23
+
+def test_item_fields(results):
+    item = query_results('run-b', limit=1)['items'][0]
+    assert item == {'row_no': 0, 'text': 'teks run-b 0', 'actual': 'positif', 'predicted': 'positif', 'correct': True}
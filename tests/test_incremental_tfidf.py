@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from incremental_tfidf import (MIN_DF_ADMIT, IncrementalTfidf, load_incremental_extractor,
+                               update_incremental_features)
+
+def make_corpus(seed, n_docs, n_words=300):
+    rng = np.random.default_rng(seed)
+    words = [f'w{i}' for i in range(n_words)]
+    return [' '.join(rng.choice(words, rng.integers(1, 8))) for _ in range(n_docs)]
+
+def vocabulary_of(extractor):
+    return [extractor.terms[term_id] for term_id in extractor.vocab_ids]
+
+@pytest.mark.parametrize('seed', range(10))
+@pytest.mark.parametrize('max_features', [None, 25, 137])
+def test_initial_fit_matches_tfidf_vectorizer(seed, max_features):
+    # Korpus kecil dengan banyak frekuensi kembar di batas max_features.
+    docs = make_corpus(seed, 150) + ['']
+    extractor = IncrementalTfidf(ngram_range=(1, 2), max_features=max_features)
+    extractor.update(docs)
+    reference = TfidfVectorizer(ngram_range=(1, 2), max_features=max_features)
+    expected = reference.fit_transform(docs)
+
+    assert vocabulary_of(extractor) == list(reference.get_feature_names_out())
+    np.testing.assert_allclose(extractor.idf_applied, reference.idf_)
+    np.testing.assert_allclose(extractor.transform_documents(docs).toarray(), expected.toarray(), atol=1e-12)
+
+def test_exact_update_matches_refit_with_same_vocabulary():
+    first = make_corpus(1, 200)
+    second = first[50:] + make_corpus(2, 80) + first[:5]
+    extractor = IncrementalTfidf(ngram_range=(1, 2), max_features=100, reweight_tolerance=0)
+    extractor.update(first)
+    stats = extractor.update(second)
+
+    assert stats['removed_documents'] > 0 and stats['new_documents'] > 0
+    reference = TfidfVectorizer(ngram_range=(1, 2), vocabulary=vocabulary_of(extractor))
+    expected = reference.fit_transform(second)
+    np.testing.assert_allclose(extractor.idf_applied, reference.idf_)
+    np.testing.assert_allclose(extractor.transform_documents(second).toarray(), expected.toarray(), atol=1e-12)
+
+def test_tolerant_update_stays_within_tolerance_and_reweights_fewer_rows():
+    first = make_corpus(3, 400)
+    second = first + make_corpus(4, 5)
+    extractor = IncrementalTfidf(ngram_range=(1, 1), max_features=200, reweight_tolerance=0.05)
+    extractor.update(first)
+    stats = extractor.update(second)
+
+    assert stats['reweighted_rows'] < stats['unique_documents']
+    reference = TfidfVectorizer(vocabulary=vocabulary_of(extractor)).fit(second)
+    relative = np.abs(extractor.idf_applied - reference.idf_) / reference.idf_
+    assert relative.max() <= 0.05 + 1e-12
+
+def test_vocabulary_growth_is_capped_and_requires_min_df():
+    extractor = IncrementalTfidf(ngram_range=(1, 1), max_features=3, max_vocabulary=5)
+    extractor.update(['aa bb cc dd', 'aa bb cc', 'aa bb', 'aa'])
+    assert vocabulary_of(extractor) == ['aa', 'bb', 'cc']
+
+    docs = ['aa bb cc dd', 'aa bb cc', 'aa bb', 'aa'] + ['baru lain'] * MIN_DF_ADMIT + ['sekali'] + ['tambah'] * MIN_DF_ADMIT
+    stats = extractor.update(docs)
+    vocabulary = vocabulary_of(extractor)
+    assert len(vocabulary) == 5 and stats['admitted_terms'] == 2
+    assert 'sekali' not in vocabulary
+    assert vocabulary == sorted(vocabulary)
+
+def test_vectorizer_reproduces_training_rows():
+    docs = make_corpus(5, 120)
+    extractor = IncrementalTfidf(ngram_range=(1, 2), max_features=80)
+    extractor.update(docs)
+    transformed = extractor.get_vectorizer().transform(docs)
+    np.testing.assert_allclose(transformed.toarray(), extractor.transform_documents(docs).toarray(), atol=1e-12)
+
+def test_state_round_trip_and_parameter_change(tmp_path):
+    directory = str(tmp_path / 'state')
+    docs = make_corpus(6, 100)
+    X, _, stats = update_incremental_features(docs, (1, 2), 50, max_vocabulary=50, directory=directory)
+    assert stats['new_documents'] == 100
+
+    # Data yang sama: tidak ada dokumen yang ditokenisasi atau diberi bobot ulang.
+    X_again, _, stats = update_incremental_features(docs, (1, 2), 50, max_vocabulary=50, directory=directory)
+    assert stats['new_documents'] == 0 and stats['reweighted_rows'] == 0
+    np.testing.assert_allclose(X_again.toarray(), X.toarray())
+
+    # Parameter berbeda tidak memakai state lama.
+    assert load_incremental_extractor((1, 2), 50, max_vocabulary=50, directory=directory).n_docs == 100
+    assert load_incremental_extractor((1, 1), 50, max_vocabulary=50, directory=directory).n_docs == 0
@@ -0,0 +1,150 @@
+import pickle
+
+import numpy as np
+import pytest
+import scipy.sparse as sp
+from sklearn.naive_bayes import MultinomialNB
+
+from model_naive_bayes import MultinomialNBFromScratch
+
+CLASSES = np.array(['negatif', 'netral', 'positif'])
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    X = sp.random(400, 60, density=0.1, random_state=1, format='csr', dtype=np.float64)
+    y = CLASSES[rng.integers(0, 3, 400)]
+    weights = rng.random(400) + 0.5
+    return X, y, weights
+
+def assert_matches_sklearn(model, reference, X):
+    np.testing.assert_allclose(model.feature_log_prob_, reference.feature_log_prob_, rtol=1e-10)
+    np.testing.assert_allclose(model.class_priors_, reference.class_log_prior_, rtol=1e-10)
+    np.testing.assert_allclose(model.predict_log_proba(X), reference.predict_log_proba(X), rtol=1e-8, atol=1e-10)
+    np.testing.assert_allclose(model.predict_proba(X), reference.predict_proba(X), rtol=1e-8, atol=1e-12)
+    assert (model.predict(X) == reference.predict(X)).all()
+
+def test_fit_matches_sklearn(data):
+    X, y, _ = data
+    assert_matches_sklearn(MultinomialNBFromScratch(alpha=0.5).fit(X, y), MultinomialNB(alpha=0.5).fit(X, y), X)
+
+def test_sample_weight_matches_sklearn(data):
+    X, y, weights = data
+    model = MultinomialNBFromScratch().fit(X, y, sample_weight=weights)
+    assert_matches_sklearn(model, MultinomialNB().fit(X, y, sample_weight=weights), X)
+
+def test_class_prior_modes_match_sklearn(data):
+    X, y, _ = data
+    assert_matches_sklearn(MultinomialNBFromScratch(class_prior='uniform').fit(X, y),
+                           MultinomialNB(fit_prior=False).fit(X, y), X)
+    prior = [0.2, 0.3, 0.5]
+    assert_matches_sklearn(MultinomialNBFromScratch(class_prior=prior).fit(X, y),
+                           MultinomialNB(class_prior=prior).fit(X, y), X)
+
+def test_partial_fit_chunks_equal_single_fit(data):
+    X, y, weights = data
+    full = MultinomialNBFromScratch().fit(X, y, sample_weight=weights)
+    chunked = MultinomialNBFromScratch()
+    for start in range(0, X.shape[0], 70):
+        chunked.partial_fit(X[start:start + 70], y[start:start + 70], classes=CLASSES,
+                            sample_weight=weights[start:start + 70])
+    np.testing.assert_allclose(chunked.feature_log_prob_, full.feature_log_prob_)
+    np.testing.assert_allclose(chunked.class_counts_, full.class_counts_)
+
+def test_partial_fit_builds_log_probs_lazily(data):
+    X, y, _ = data
+    model = MultinomialNBFromScratch()
+    model.partial_fit(X[:100], y[:100], classes=CLASSES)
+    model.partial_fit(X[100:], y[100:])
+    assert '_feature_log_prob' not in model.__dict__
+    first = model.feature_log_prob_
+    assert model.feature_log_prob_ is first
+    model.partial_fit(X[:10], y[:10])
+    assert model.feature_log_prob_ is not first
+
+def test_partial_fit_validates_classes(data):
+    X, y, _ = data
+    with pytest.raises(ValueError):
+        MultinomialNBFromScratch().partial_fit(X, y)
+    model = MultinomialNBFromScratch().partial_fit(X[:10], y[:10], classes=CLASSES)
+    with pytest.raises(ValueError):
+        model.partial_fit(X[:1], np.array(['lainnya']))
+
+def test_float32_input_keeps_float32_parameters(data):
+    X, y, _ = data
+    model = MultinomialNBFromScratch().fit(X.astype(np.float32), y)
+    assert model.feature_log_prob_.dtype == np.float32
+    reference = MultinomialNBFromScratch().fit(X, y)
+    np.testing.assert_allclose(model.feature_log_prob_, reference.feature_log_prob_, rtol=1e-5)
+
+def test_feature_counts_alias_and_pickle_round_trip(data):
+    X, y, _ = data
+    model = MultinomialNBFromScratch(alpha=0.5).fit(X, y)
+    reference = MultinomialNB(alpha=0.5).fit(X, y)
+    np.testing.assert_allclose(model.feature_counts_, reference.feature_count_ + 0.5)
+
+    restored = pickle.loads(pickle.dumps(model))
+    np.testing.assert_allclose(restored.predict_proba(X), model.predict_proba(X))
+
+def test_state_from_older_pickles_is_migrated(data):
+    X, y, _ = data
+    model = MultinomialNBFromScratch().fit(X, y)
+    # Bentuk atribut versi lama: hitungan dense + alpha, log-probabilitas sebagai atribut biasa.
+    legacy_state = {
+        'alpha': 1.0,
+        'classes_': model.classes_,
+        'class_counts_': model.class_counts_,
+        'feature_counts_': model.feature_counts_,
+        'feature_log_prob_': model.feature_log_prob_,
+        'class_priors_': model.class_priors_,
+    }
+    legacy = MultinomialNBFromScratch.__new__(MultinomialNBFromScratch)
+    legacy.__setstate__(legacy_state)
+    np.testing.assert_allclose(legacy.predict_proba(X), model.predict_proba(X))
+    np.testing.assert_allclose(legacy.raw_feature_counts_.toarray(), model.raw_feature_counts_.toarray())
+
+def dense_contributions(model, row):
+    # Definisi kontribusi di explain(): x_j * (log P(j|c) - rata-rata log P(j|kelas lain)), dihitung dense.
+    centered = model.feature_log_prob_ - model.feature_log_prob_.mean(axis=0)
+    return row[np.newaxis, :] * centered
+
+def test_predict_proba_is_stable_for_long_documents(data):
+    X, y, _ = data
+    model = MultinomialNBFromScratch().fit(X, y)
+    # Log-likelihood gabungan sangat negatif: exp langsung akan underflow menjadi 0/0.
+    long_document = sp.csr_matrix(X[:3].toarray() * 5000)
+    probabilities = model.predict_proba(long_document)
+    assert np.isfinite(probabilities).all()
+    np.testing.assert_allclose(probabilities.sum(axis=1), 1.0)
+    assert (CLASSES[probabilities.argmax(axis=1)] == model.predict(long_document)).all()
+
+def test_explain_matches_dense_contributions(data):
+    X, y, _ = data
+    model = MultinomialNBFromScratch().fit(X, y)
+    feature_names = np.array([f'term{j}' for j in range(X.shape[1])], dtype=object)
+    explanations = model.explain(X[:20], feature_names=feature_names, top_k=3)
+    probabilities = model.predict_proba(X[:20])
+
+    assert len(explanations) == 20
+    for row, explanation in enumerate(explanations):
+        dense_row = X[row].toarray().ravel()
+        contributions = dense_contributions(model, dense_row)
+        assert explanation['predicted'] == str(model.predict(X[row])[0])
+        assert explanation['probabilities'] == pytest.approx(
+            {str(c): p for c, p in zip(CLASSES, probabilities[row])}, abs=1e-6)
+        for i, c in enumerate(CLASSES):
+            terms = explanation['top_terms'][str(c)]
+            nonzero = np.flatnonzero(dense_row)
+            expected = nonzero[np.argsort(-contributions[i, nonzero], kind='stable')][:3]
+            assert [term['term'] for term in terms] == [feature_names[j] for j in expected]
+            for term, j in zip(terms, expected):
+                assert term['weight'] == pytest.approx(dense_row[j], abs=1e-6)
+                assert term['contribution'] == pytest.approx(contributions[i, j], abs=1e-6)
+
+def test_explain_without_feature_names_and_empty_rows(data):
+    X, y, _ = data
+    model = MultinomialNBFromScratch().fit(X, y)
+    empty = sp.csr_matrix((2, X.shape[1]))
+    explanations = model.explain(sp.vstack([X[:1], empty]), top_k=2)
+    assert all(isinstance(term['term'], int) for term in explanations[0]['top_terms']['positif'])
+    assert explanations[1]['top_terms'] == {str(c): [] for c in CLASSES}
@@ -0,0 +1,116 @@
+import json
+import os
+
+import numpy as np
+import pytest
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+
+import model_registry
+from model_naive_bayes import MultinomialNBFromScratch
+from model_registry import (get_model_metadata, hash_training_data, list_model_versions,
+                            load_active_model, load_model_version, promote_model, register_model, rollback_model)
+from vectorizer_artifact import VectorizerArtifact
+
+TEXTS = ['aplikasi bagus sekali', 'pelayanan buruk dan lambat', 'biasa saja tidak istimewa', 'bagus dan cepat']
+LABELS = np.array(['positif', 'negatif', 'netral', 'positif'])
+METRICS = {'accuracy': 1.0}
+
+@pytest.fixture
+def root(tmp_path, monkeypatch):
+    # Cache versi aktif bersifat global per proses; setiap test memulai dari cache kosong.
+    monkeypatch.setattr(model_registry, '_loaded', None)
+    return str(tmp_path / 'models')
+
+@pytest.fixture
+def trained():
+    vectorizer = TfidfVectorizer().fit(TEXTS)
+    model = MultinomialNBFromScratch().fit(vectorizer.transform(TEXTS), LABELS)
+    return model, vectorizer
+
+def test_register_assigns_sequential_versions_and_activates(root, trained):
+    model, vectorizer = trained
+    assert register_model(model, vectorizer, METRICS, params={'alpha': 1.0}, data_hash='abc', root=root) == 'v0001'
+    assert register_model(model, vectorizer, METRICS, root=root) == 'v0002'
+
+    metadata = get_model_metadata(root=root)
+    assert metadata['version'] == 'v0002' and metadata['vectorizer_format'] == 'artifact'
+    assert get_model_metadata('v0001', root=root)['params'] == {'alpha': 1.0}
+    assert [entry['version'] for entry in list_model_versions(root)] == ['v0002', 'v0001']
+    assert [entry['active'] for entry in list_model_versions(root)] == [True, False]
+    assert not [name for name in os.listdir(root) if name.startswith('.tmp')]
+
+def test_loaded_version_predicts_like_the_trained_model(root, trained):
+    model, vectorizer = trained
+    version = register_model(model, vectorizer, METRICS, root=root)
+    loaded = load_model_version(version, root)
+    assert isinstance(loaded['vectorizer'], VectorizerArtifact)
+    X = loaded['vectorizer'].transform(TEXTS)
+    np.testing.assert_allclose(loaded['model'].predict_proba(X), model.predict_proba(vectorizer.transform(TEXTS)))
+
+def test_vectorizer_without_vocabulary_is_pickled(root):
+    vectorizer = HashingVectorizer(n_features=64)
+    model = MultinomialNBFromScratch().fit(vectorizer.transform(TEXTS), LABELS)
+    version = register_model(model, vectorizer, METRICS, root=root)
+    assert get_model_metadata(version, root)['vectorizer_format'] == 'pickle'
+    assert isinstance(load_model_version(version, root)['vectorizer'], HashingVectorizer)
+
+def test_model_without_vectorizer_cannot_be_promoted(root, trained):
+    model, vectorizer = trained
+    register_model(model, vectorizer, METRICS, root=root)
+    version = register_model(model, None, METRICS, activate=False, root=root)
+    assert [entry['servable'] for entry in list_model_versions(root)] == [False, True]
+    with pytest.raises(ValueError):
+        promote_model(version, root)
+    with pytest.raises(ValueError):
+        promote_model('v9999', root)
+    assert get_model_metadata(root=root)['version'] == 'v0001'
+
+def test_promote_and_rollback_follow_activation_history(root, trained):
+    model, vectorizer = trained
+    for _ in range(3):
+        register_model(model, vectorizer, METRICS, root=root)
+    promote_model('v0001', root)
+    assert get_model_metadata(root=root)['version'] == 'v0001'
+
+    assert rollback_model(root) == 'v0003'
+    assert rollback_model(root) == 'v0002'
+    assert rollback_model(root) == 'v0001'
+    with pytest.raises(ValueError):
+        rollback_model(root)
+
+def test_rollback_skips_versions_without_vectorizer(root, trained):
+    model, vectorizer = trained
+    register_model(model, vectorizer, METRICS, root=root)
+    register_model(model, vectorizer, METRICS, root=root)
+    # Registry lama yang sempat mengaktifkan versi tanpa vectorizer.
+    register_model(model, None, METRICS, activate=False, root=root)
+    registry_path = os.path.join(root, 'registry.json')
+    with open(registry_path, encoding='utf-8') as f:
+        registry = json.load(f)
+    registry['history'].append('v0003')
+    registry['active'] = 'v0003'
+    with open(registry_path, 'w', encoding='utf-8') as f:
+        json.dump(registry, f)
+    assert rollback_model(root) == 'v0001'
+
+def test_active_model_is_cached_until_registry_changes(root, trained):
+    model, vectorizer = trained
+    assert load_active_model(root) is None
+    register_model(model, vectorizer, METRICS, root=root)
+    first = load_active_model(root)
+    assert first['version'] == 'v0001'
+    assert load_active_model(root) is first
+
+    register_model(model, vectorizer, METRICS, root=root)
+    registry_path = os.path.join(root, 'registry.json')
+    stat = os.stat(registry_path)
+    os.utime(registry_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    assert load_active_model(root)['version'] == 'v0002'
+
+def test_data_hash_depends_on_features_and_labels():
+    X = sp.random(30, 10, density=0.3, random_state=0, format='csr')
+    y = np.array(['a', 'b', 'c'] * 10)
+    assert hash_training_data(X, y) == hash_training_data(X.copy(), y.copy())
+    assert hash_training_data(X, y) != hash_training_data(X, y[::-1])
+    assert hash_training_data(X, y) != hash_training_data(X * 2, y)
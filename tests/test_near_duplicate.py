@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+
+from near_duplicate import compute_signatures, find_near_duplicates, optimal_bands, shingle_hashes
+from preprocessing import apply_near_duplicate_decisions, compute_text_hash, resolve_near_duplicates
+
+BASE = 'pemerintah memangkas anggaran perjalanan dinas demi efisiensi belanja negara tahun ini'
+
+def test_optimal_bands_divides_num_perm():
+    bands, rows = optimal_bands(0.8, 128)
+    assert bands * rows == 128
+    assert abs((1 / bands) ** (1 / rows) - 0.8) < 0.1
+
+def test_shingles_are_deterministic_and_empty_text_has_none():
+    assert np.array_equal(np.sort(shingle_hashes(BASE)), np.sort(shingle_hashes(BASE)))
+    assert len(shingle_hashes('')) == 0
+    assert len(shingle_hashes(None)) == 0
+
+def test_signatures_mark_documents_without_shingles():
+    _, has_shingles = compute_signatures([BASE, '', 'satu'])
+    assert has_shingles.tolist() == [True, False, True]
+
+def test_near_duplicates_share_the_first_members_cluster():
+    texts = [
+        BASE,
+        'harga cabai naik tajam di pasar tradisional menjelang lebaran',
+        BASE + ' rt',
+        BASE,
+        'sekolah gratis mulai diterapkan di beberapa daerah',
+        '',
+        '',
+    ]
+    clusters = find_near_duplicates(texts, threshold=0.7)
+    assert clusters.tolist() == [0, 1, 0, 0, 4, 5, 6]
+
+def test_unrelated_documents_are_not_grouped():
+    rng = np.random.default_rng(0)
+    words = [f'kata{i}' for i in range(5000)]
+    texts = [' '.join(rng.choice(words, 12)) for _ in range(300)]
+    assert find_near_duplicates(texts, threshold=0.8).tolist() == list(range(300))
+
+def _frame(texts, labels):
+    return pd.DataFrame({
+        'source_id': np.arange(10, 10 + len(texts)),
+        'full_text': texts,
+        'text_hash': [compute_text_hash(text) for text in texts],
+        'stemming': texts,
+        'sentiment_pakar': labels,
+    })
+
+def test_drop_keeps_representatives_and_records_dropped_rows():
+    df = _frame([BASE, BASE + ' rt', 'harga cabai naik tajam di pasar tradisional'], ['positif', 'negatif', 'netral'])
+    result, stats, decisions = resolve_near_duplicates(df, 0.7, 'drop')
+    assert result['source_id'].tolist() == [10, 12]
+    assert stats['near_duplicate_clusters'] == 1 and stats['near_duplicate_rows'] == 1
+    assert decisions[['source_id', 'decision', 'representative_id']].values.tolist() == [[11, 'drop', 10]]
+
+def test_merge_relabels_representative_with_majority_label():
+    df = _frame([BASE, BASE + ' rt', BASE + ' rt rt'], ['positif', 'negatif', 'negatif'])
+    result, _, decisions = resolve_near_duplicates(df, 0.6, 'merge')
+    assert result[['source_id', 'sentiment_pakar']].values.tolist() == [[10, 'negatif']]
+    assert sorted(decisions['decision']) == ['drop', 'drop', 'merge']
+
+def test_flag_changes_nothing():
+    df = _frame([BASE, BASE + ' rt'], ['positif', 'negatif'])
+    result, _, decisions = resolve_near_duplicates(df, 0.7, 'flag')
+    assert result['source_id'].tolist() == [10, 11]
+    assert decisions.empty
+
+def test_decisions_replayed_only_while_text_and_representative_are_unchanged():
+    df = _frame([BASE, BASE + ' rt', BASE + ' rt rt'], ['positif', 'negatif', 'negatif'])
+    _, _, decisions = resolve_near_duplicates(df, 0.6, 'merge')
+
+    # Sumber tidak berubah: baris yang dihapus tetap keluar dan label gabungan dipertahankan.
+    replayed, valid = apply_near_duplicate_decisions(df, decisions)
+    assert replayed[['source_id', 'sentiment_pakar']].values.tolist() == [[10, 'negatif']]
+    assert len(valid) == len(decisions)
+
+    # Teks salah satu anggota berubah: keputusan untuk baris itu tidak berlaku lagi.
+    edited = df.copy()
+    edited.loc[edited['source_id'] == 12, 'text_hash'] = compute_text_hash('teks baru')
+    replayed, valid = apply_near_duplicate_decisions(edited, decisions)
+    assert replayed['source_id'].tolist() == [10, 12]
+    assert len(valid) == len(decisions) - 1
+
+    # Wakil cluster dihapus dari sumber: anggota yang dulu dihapus kembali diproses.
+    without_representative = df[df['source_id'] != 10]
+    replayed, valid = apply_near_duplicate_decisions(without_representative, decisions)
+    assert replayed['source_id'].tolist() == [11, 12]
+    assert valid.empty
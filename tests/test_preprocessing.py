@@ -0,0 +1,128 @@
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, text
+
+import preprocessing
+from benchmark_text_cleaner import load_upload_texts
+from preprocessing import STAGE_COLUMNS, create_pipeline, run_stages
+
+@pytest.fixture(scope='module')
+def source_texts():
+    texts = load_upload_texts()[:25]
+    assert texts, "Tidak ada CSV dengan kolom 'full_text' di uploads/."
+    return texts + ['', 'RT @akun: http://t.co/x #tagar 123', None]
+
+def test_parallel_stages_are_identical_to_serial(source_texts):
+    pipeline = create_pipeline()
+    frame = pd.DataFrame({'full_text': source_texts})
+    serial = run_stages(frame.copy(), pipeline, n_workers=1)
+    parallel = run_stages(frame.copy(), pipeline, n_workers=3)
+    for column in STAGE_COLUMNS + ['tokenizing', 'normalized', 'stopwords', 'stemming']:
+        assert serial[column].tolist() == parallel[column].tolist(), column
+    assert serial.index.equals(parallel.index)
+
+def test_parallel_run_merges_worker_stems_into_cache(source_texts, monkeypatch):
+    monkeypatch.setattr(preprocessing, 'stem_cache', {})
+    monkeypatch.setattr(preprocessing, 'new_stems', {})
+    monkeypatch.setattr(preprocessing, 'stem_cache_stats', {'hits': 0, 'misses': 0})
+    frame = pd.DataFrame({'full_text': source_texts[:15]})
+    result = run_stages(frame, create_pipeline(), n_workers=2)
+    stemmed_words = {word for tokens in result['stemming_tokens'] for word in tokens}
+    assert preprocessing.stem_cache_stats['misses'] > 0
+    assert set(preprocessing.new_stems.values()) >= stemmed_words
+
+# --- Mode inkremental dan streaming terhadap database SQLite sementara ---
+# SQL khusus MySQL (ALTER TABLE ... ADD PRIMARY KEY, ON DUPLICATE KEY UPDATE) diganti padanan SQLite-nya;
+# logika delta, dedup, dan penulisan per chunk tetap kode preprocessing yang sebenarnya.
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'preprocessing.db'}")
+    # Mode streaming membaca sumber sambil menulis hasil dari koneksi lain; WAL mencegah kunci baca-tulis di SQLite.
+    with engine.connect() as conn:
+        conn.exec_driver_sql('PRAGMA journal_mode=WAL')
+    monkeypatch.setattr(preprocessing, 'engine', engine)
+
+    def add_unique_source_id():
+        with engine.begin() as conn:
+            conn.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS idx_preprocessing_source ON preprocessing (source_id)"))
+
+    def sqlite_upsert(result_df, result_columns):
+        updates = ', '.join(f"{column} = excluded.{column}" for column in result_columns if column != 'source_id')
+        sql = text(f"INSERT INTO preprocessing ({', '.join(result_columns)}) "
+                   f"VALUES ({', '.join(':' + column for column in result_columns)}) "
+                   f"ON CONFLICT(source_id) DO UPDATE SET {updates}")
+        with engine.begin() as conn:
+            conn.execute(sql, preprocessing.to_records(result_df[result_columns]))
+
+    monkeypatch.setattr(preprocessing, 'add_result_primary_key', add_unique_source_id)
+    monkeypatch.setattr(preprocessing, 'upsert_results', sqlite_upsert)
+    return engine
+
+def write_source(engine, rows):
+    pd.DataFrame(rows, columns=['id', 'full_text', 'sentiment_pakar']).to_sql(
+        'data_efesiensi', engine, if_exists='replace', index=False)
+
+def read_results(engine):
+    return pd.read_sql('SELECT * FROM preprocessing ORDER BY source_id', engine).reset_index(drop=True)
+
+SOURCE_ROWS = [
+    (1, 'Anggaran perjalanan dinas dipangkas, bagus!', 'positif'),
+    (2, 'Honorer belum digaji sejak Januari @pemda', 'negatif'),
+    (3, 'Anggaran perjalanan dinas dipangkas, bagus!', 'positif'),
+    (4, '   ', 'netral'),
+    (5, 'Efisiensi anggaran https://x.co/abc #APBN 2025', 'netral'),
+    (6, None, 'netral'),
+    (7, 'Sekolah gratis mulai berlaku di daerah', 'positif'),
+]
+
+def test_incremental_run_matches_full_run(database):
+    pipeline = create_pipeline()
+    write_source(database, SOURCE_ROWS)
+    assert preprocessing.run_batch(pipeline, 1, incremental=False, compact=False)['mode'] == 'full'
+
+    # Satu baris berubah teks, satu berubah label, satu dihapus, satu baru.
+    updated_rows = [row for row in SOURCE_ROWS if row[0] != 7]
+    updated_rows[1] = (2, 'Honorer akhirnya digaji bulan ini', 'positif')
+    updated_rows[4] = (5, SOURCE_ROWS[4][1], 'negatif')
+    updated_rows.append((8, 'Harga cabai naik menjelang lebaran', 'negatif'))
+    write_source(database, updated_rows)
+    result = preprocessing.run_batch(pipeline, 1, incremental=True, compact=False)
+    assert result['mode'] == 'incremental'
+    assert (result['processed_count'], result['relabelled_count'], result['deleted_count'],
+            result['unchanged_count']) == (2, 1, 1, 1)
+    incremental = read_results(database)
+
+    preprocessing.run_batch(pipeline, 1, incremental=False, compact=False)
+    full = read_results(database)
+    pd.testing.assert_frame_equal(incremental[full.columns], full, check_dtype=False)
+
+def test_incremental_run_without_changes_processes_nothing(database):
+    pipeline = create_pipeline()
+    write_source(database, SOURCE_ROWS)
+    preprocessing.run_batch(pipeline, 1, incremental=False, compact=True)
+    result = preprocessing.run_batch(pipeline, 1, incremental=True, compact=True)
+    assert (result['processed_count'], result['relabelled_count'], result['deleted_count']) == (0, 0, 0)
+
+def test_incremental_falls_back_to_full_when_storage_mode_changes(database):
+    pipeline = create_pipeline()
+    write_source(database, SOURCE_ROWS)
+    preprocessing.run_batch(pipeline, 1, incremental=False, compact=True)
+    assert preprocessing.run_batch(pipeline, 1, incremental=True, compact=False)['mode'] == 'full'
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 100])
+@pytest.mark.parametrize('n_workers', [1, 2])
+def test_streaming_matches_batch(database, chunk_size, n_workers):
+    pipeline = create_pipeline()
+    write_source(database, SOURCE_ROWS)
+    preprocessing.run_batch(pipeline, 1, incremental=False, compact=False)
+    batch = read_results(database)
+
+    stats = preprocessing.run_streaming(pipeline, n_workers, chunk_size, compact=False)
+    streamed = read_results(database)
+    pd.testing.assert_frame_equal(streamed[batch.columns], batch, check_dtype=False)
+    assert stats['final_count'] == len(batch)
+
+def test_streaming_rejects_incremental_flag():
+    result = preprocessing.run_preprocessing(incremental=True, chunk_size=10)
+    assert not result['success'] and 'chunk_size' in result['error']
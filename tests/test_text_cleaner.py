@@ -0,0 +1,49 @@
+import pandas as pd
+import pytest
+
+from benchmark_text_cleaner import load_upload_texts
+from text_cleaner import clean_text, fold_and_clean, fold_and_clean_series, legacy_clean
+
+EDGE_CASES = [
+    # URL yang menempel pada tanda baca
+    'cek (https://contoh.id/a?b=1), lalu www.situs.com.',
+    'lihat:https://x.co/abc!',
+    '"http://a.b/c"',
+    # @ dan # di dalam kata, di depan URL, dan berdiri sendiri
+    'email saya budi@mail.com #tagar#kedua',
+    'halo@https://x.co dan #https://y.co',
+    '@ # @@ ## @_ #_ a@b#c',
+    # Karakter non-ASCII
+    'Kopi ☕ enak sekali 😀 naïve café',
+    'ＡＢＣ １２３ ünïcödé',
+    # Angka di dalam token
+    'covid19 ke-2 2025 r2d2 10rb',
+    # Spasi berlebih, baris baru, tab, dan teks kosong
+    '  banyak   spasi\n\tdan\r\nbaris  ',
+    '',
+    '!!!???',
+]
+
+@pytest.mark.parametrize('text', EDGE_CASES)
+def test_fused_cleaner_matches_legacy_on_edge_cases(text):
+    assert clean_text(text) == legacy_clean(text)
+
+def test_fused_cleaner_matches_legacy_on_uploads():
+    texts = load_upload_texts()
+    assert texts, "Tidak ada CSV dengan kolom 'full_text' di uploads/; golden test tidak punya data."
+    mismatches = [text for text in texts if clean_text(text) != legacy_clean(text)]
+    assert not mismatches, f"{len(mismatches)} teks berbeda, contoh: {mismatches[0]!r}"
+
+def test_fold_and_clean_returns_both_stages():
+    assert fold_and_clean('Halo @Budi, Apa KABAR?') == ('halo @budi, apa kabar?', 'halo apa kabar')
+    assert fold_and_clean(None) == ('', '')
+
+def test_series_mode_matches_per_text_mode():
+    texts = EDGE_CASES + load_upload_texts()[:500]
+    case_folded, cleaned = fold_and_clean_series(pd.Series(texts))
+    assert list(zip(case_folded, cleaned)) == [fold_and_clean(text) for text in texts]
+
+def test_series_mode_handles_non_string_values():
+    case_folded, cleaned = fold_and_clean_series(pd.Series([None, float('nan'), 12, 'OK!']))
+    assert case_folded.tolist() == ['', '', '', 'ok!']
+    assert cleaned.tolist() == ['', '', '', 'ok']
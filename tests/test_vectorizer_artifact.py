@@ -0,0 +1,70 @@
+import os
+
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+
+from vectorizer_artifact import VectorizerArtifact, load_vectorizer_artifact, save_vectorizer_artifact
+
+TRAIN = [
+    'aplikasi bagus sekali sangat membantu',
+    'pelayanan lambat dan sering error',
+    'harga terjangkau tapi pengiriman lama',
+    'kopi enak di kafe ûnïcödé',
+    'angka 2025 dan covid19 tetap jadi token',
+]
+TEST = TRAIN + ['kata baru yang tidak dikenal', '', 'Bagus BAGUS bagus', 'a b c']
+
+@pytest.mark.parametrize('params', [
+    {},
+    {'ngram_range': (1, 2)},
+    {'ngram_range': (2, 3)},
+    {'sublinear_tf': True, 'norm': 'l1'},
+    {'binary': True, 'norm': None},
+    {'lowercase': False, 'max_features': 10},
+])
+def test_artifact_transform_matches_tfidf_vectorizer(tmp_path, params):
+    vectorizer = TfidfVectorizer(**params).fit(TRAIN)
+    path = str(tmp_path / 'vectorizer.bin')
+    save_vectorizer_artifact(vectorizer, path)
+    artifact = VectorizerArtifact(path)
+
+    assert list(artifact.get_feature_names_out()) == list(vectorizer.get_feature_names_out())
+    np.testing.assert_allclose(artifact.idf_, vectorizer.idf_)
+    np.testing.assert_allclose(artifact.transform(TEST).toarray(), vectorizer.transform(TEST).toarray(), atol=1e-12)
+
+def test_lookup_returns_column_or_none(tmp_path):
+    vectorizer = TfidfVectorizer().fit(TRAIN)
+    path = str(tmp_path / 'vectorizer.bin')
+    save_vectorizer_artifact(vectorizer, path)
+    artifact = VectorizerArtifact(path)
+    assert artifact.lookup('bagus') == vectorizer.vocabulary_['bagus']
+    assert artifact.lookup('tidakada') is None
+
+def test_unsupported_vectorizers_are_rejected(tmp_path):
+    path = str(tmp_path / 'vectorizer.bin')
+    with pytest.raises(ValueError):
+        save_vectorizer_artifact(TfidfVectorizer(stop_words=['dan']).fit(TRAIN), path)
+    with pytest.raises(ValueError):
+        save_vectorizer_artifact(TfidfVectorizer(analyzer='char').fit(TRAIN), path)
+    with pytest.raises(AttributeError):
+        save_vectorizer_artifact(HashingVectorizer(), path)
+    assert not os.path.exists(path)
+
+def test_invalid_file_is_rejected(tmp_path):
+    path = tmp_path / 'bukan.bin'
+    path.write_bytes(b'x' * 64)
+    with pytest.raises(ValueError):
+        VectorizerArtifact(str(path))
+
+def test_loader_reuses_mapping_until_file_changes(tmp_path):
+    path = str(tmp_path / 'vectorizer.bin')
+    save_vectorizer_artifact(TfidfVectorizer().fit(TRAIN), path)
+    first = load_vectorizer_artifact(path)
+    assert load_vectorizer_artifact(path) is first
+
+    save_vectorizer_artifact(TfidfVectorizer(ngram_range=(1, 2)).fit(TRAIN), path)
+    os.utime(path, ns=(os.stat(path).st_atime_ns, os.stat(path).st_mtime_ns + 1))
+    second = load_vectorizer_artifact(path)
+    assert second is not first
+    assert second.ngram_range == (1, 2)
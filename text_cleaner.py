@@ -0,0 +1,76 @@
+# --- Mesin Pembersih Teks (Case Folding + Cleansing) ---
+# Modul ini dipakai bersama oleh preprocessing.py (batch) dan app1.py (teks tunggal)
+# agar kedua jalur menghasilkan teks bersih yang sama persis.
+import re  # Pustaka untuk Regular Expressions.
+
+# Pola URL (http, https, www) serta mention (@username) dan hashtag (#topic) dalam satu regex, sehingga teks
+# cukup dipindai sekali. Hasilnya sama dengan menghapus URL lebih dulu lalu mention/hashtag: mention berhenti tepat
+# sebelum awal URL (lookahead), karena pada urutan dua pass '@user' yang menempel di depan URL tidak ikut menelan
+# URL tersebut dan '#' yang langsung diikuti URL tertinggal sebagai tanda baca.
+NOISE_PATTERN = re.compile(r'https?://\S+|www\.\S+|[@#](?:(?!https?://\S|www\.\S)\w)+')
+
+# Tabel translate untuk karakter ASCII: tanda baca -> spasi, angka -> dihapus.
+# Dibangun dari pola asli ([^\w\s] dan \d) sehingga himpunan karakternya identik dengan versi re.sub.
+_PUNCTUATION_PATTERN = re.compile(r'[^\w\s]')
+_DIGIT_PATTERN = re.compile(r'\d')
+CLEANSING_TABLE = {}
+for _code in range(128):
+    _char = chr(_code)
+    if _PUNCTUATION_PATTERN.match(_char):
+        CLEANSING_TABLE[_code] = ' '
+    elif _DIGIT_PATTERN.match(_char):
+        CLEANSING_TABLE[_code] = None
+
+# Fungsi untuk mengubah semua teks menjadi huruf kecil (case folding).
+def case_folding(text):
+    if not isinstance(text, str): return ""
+    return text.lower()
+
+# Fungsi untuk membersihkan teks dari karakter yang tidak diinginkan (tanpa case folding).
+def cleansing(text):
+    if not isinstance(text, str): return ""
+    # Menghapus karakter non-ASCII untuk menghindari masalah encoding.
+    text = text.encode('ascii', 'ignore').decode('ascii')
+    # Satu pass regex: menghapus URL, mention, dan hashtag.
+    text = NOISE_PATTERN.sub('', text)
+    # Tanda baca menjadi spasi dan angka dihapus dalam satu translate (tanpa regex).
+    text = text.translate(CLEANSING_TABLE)
+    # Mengganti spasi ganda menjadi satu spasi dan menghapus spasi di awal/akhir.
+    return ' '.join(text.split())
+
+# Fungsi gabungan case folding + cleansing dalam satu panggilan; mengembalikan kedua tahap
+# (teks huruf kecil dan teks bersih) karena tabel preprocessing menampilkan keduanya.
+def fold_and_clean(text):
+    if not isinstance(text, str): return "", ""
+    case_folded = text.lower()
+    return case_folded, cleansing(case_folded)
+
+# Fungsi gabungan case folding + cleansing untuk satu teks (hanya teks bersih).
+def clean_text(text):
+    return fold_and_clean(text)[1]
+
+# Fungsi versi kolom (vektor) dari fold_and_clean untuk pandas Series berisi teks; mengembalikan dua Series
+# (teks huruf kecil dan teks bersih) dengan hasil yang sama seperti fold_and_clean per elemen.
+# Nilai non-string menjadi string kosong. TextPipeline tetap memakai fold_and_clean per dokumen.
+def fold_and_clean_series(texts):
+    case_folded = texts.astype(object).str.lower()
+    cleaned = (
+        case_folded.str.encode('ascii', 'ignore').str.decode('ascii')
+        .str.replace(NOISE_PATTERN, '', regex=True)
+        .str.translate(CLEANSING_TABLE)
+        .str.split().str.join(' ')
+    )
+    return case_folded.fillna(''), cleaned.fillna('')
+
+# Implementasi lama (case_folding lalu cleansing dengan enam re.sub berurutan), disimpan hanya sebagai acuan
+# untuk golden test (tests/test_text_cleaner.py) dan benchmark (benchmark_text_cleaner.py).
+def legacy_clean(text):
+    text = text.lower()
+    text = text.encode('ascii', 'ignore').decode('ascii')
+    text = re.sub(r'https?://\S+|www\.\S+', '', text)
+    text = re.sub(r'@\w+', '', text)
+    text = re.sub(r'#\w+', '', text)
+    text = re.sub(r'[^\w\s]', ' ', text)
+    text = re.sub(r'\d+', '', text)
+    text = re.sub(r'\s+', ' ', text).strip()
+    return text
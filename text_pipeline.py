@@ -0,0 +1,104 @@
+# --- Pipeline Teks Terpadu ---
+# Satu implementasi alur case folding -> cleansing -> tokenizing -> normalisasi -> stopword -> stemming
+# yang dipakai bersama oleh preprocessing batch (run_preprocessing) dan pemrosesan satu teks (app1.py).
+# Pipeline bekerja per dokumen dan menghasilkan keluaran secara lazy (generator), tanpa DataFrame.
+import time
+from collections import namedtuple
+
+from text_cleaner import fold_and_clean
+from lexicon import get_lexicon
+
+# Urutan tahap keluaran pipeline; nama field sama dengan kolom DataFrame di preprocessing.py.
+STAGES = ('case_folding', 'cleansing', 'tokens', 'normalized_tokens', 'stopwords_tokens', 'stemming_tokens')
+PipelineStages = namedtuple('PipelineStages', STAGES)
+# Nama tahap untuk pengukuran waktu (process(..., timings=dict)), sesuai urutan eksekusi.
+# Case folding dan cleansing dijalankan bersama oleh fold_and_clean sehingga diukur sebagai satu tahap.
+TIMED_STAGES = ('case_folding_cleansing', 'tokenizing', 'normalization', 'stopword_removal', 'stemming')
+
+# Fungsi untuk memecah kalimat menjadi daftar kata (tokenizing).
+def tokenize(text):
+    if not isinstance(text, str) or text.strip() == '': return []
+    return text.split()
+
+# Fungsi untuk menormalisasi token menggunakan kamus slang -> kata baku.
+def normalize_tokens(tokens, norm_dict):
+    if not isinstance(tokens, list): return []
+    return [norm_dict.get(token, token) for token in tokens]
+
+# Fungsi untuk menghapus stopwords dari daftar token.
+def remove_stopwords(tokens, stopwords):
+    if not isinstance(tokens, list): return []
+    return [word for word in tokens if word not in stopwords]
+
+class TextPipeline:
+    """
+    Pipeline preprocessing per dokumen.
+
+    normalization/stopwords: jika None, diambil dari get_lexicon() setiap kali process() dipanggil
+    sehingga perubahan file kamus langsung berlaku.
+    stemmer: fungsi list token -> list token (mis. preprocessing.apply_stemmer); None berarti
+    pipeline berhenti setelah stopword removal dan stemming_tokens sama dengan stopwords_tokens.
+    """
+    def __init__(self, normalization=None, stopwords=None, stemmer=None):
+        self.normalization = normalization
+        self.stopwords = stopwords
+        self.stemmer = stemmer
+
+    def _resolve_lexicon(self):
+        if self.normalization is not None and self.stopwords is not None:
+            return self.normalization, self.stopwords
+        lexicon = get_lexicon()
+        return (
+            lexicon.normalization if self.normalization is None else self.normalization,
+            lexicon.stopwords if self.stopwords is None else self.stopwords
+        )
+
+    def _run(self, text, norm_dict, stopwords):
+        case_folded, cleaned = fold_and_clean(text)
+        tokens = tokenize(cleaned)
+        normalized = normalize_tokens(tokens, norm_dict)
+        without_stopwords = remove_stopwords(normalized, stopwords)
+        stemmed = self.stemmer(without_stopwords) if self.stemmer else without_stopwords
+        return PipelineStages(case_folded, cleaned, tokens, normalized, without_stopwords, stemmed)
+
+    def _run_timed(self, text, norm_dict, stopwords, timings):
+        # Sama dengan _run, tetapi durasi setiap tahap ditambahkan ke timings (detik).
+        clock = time.perf_counter
+        t1 = clock()
+        case_folded, cleaned = fold_and_clean(text)
+        t2 = clock()
+        tokens = tokenize(cleaned)
+        t3 = clock()
+        normalized = normalize_tokens(tokens, norm_dict)
+        t4 = clock()
+        without_stopwords = remove_stopwords(normalized, stopwords)
+        t5 = clock()
+        stemmed = self.stemmer(without_stopwords) if self.stemmer else without_stopwords
+        t6 = clock()
+        timings['case_folding_cleansing'] += t2 - t1
+        timings['tokenizing'] += t3 - t2
+        timings['normalization'] += t4 - t3
+        timings['stopword_removal'] += t5 - t4
+        timings['stemming'] += t6 - t5
+        return PipelineStages(case_folded, cleaned, tokens, normalized, without_stopwords, stemmed)
+
+    def process(self, texts, with_stages=False, timings=None):
+        """
+        Memproses iterable teks secara lazy. Menghasilkan list token akhir per dokumen,
+        atau PipelineStages berisi semua tahap antara jika with_stages=True.
+        timings: dict opsional yang diisi total detik per tahap (kunci TIMED_STAGES).
+        """
+        norm_dict, stopwords = self._resolve_lexicon()
+        if timings is not None:
+            for stage in TIMED_STAGES:
+                timings.setdefault(stage, 0.0)
+        for text in texts:
+            if timings is None:
+                stages = self._run(text, norm_dict, stopwords)
+            else:
+                stages = self._run_timed(text, norm_dict, stopwords, timings)
+            yield stages if with_stages else stages.stemming_tokens
+
+    def __call__(self, text, with_stages=False):
+        """Jalur latensi rendah untuk satu teks."""
+        return next(self.process((text,), with_stages=with_stages))
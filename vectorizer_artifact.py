@@ -0,0 +1,243 @@
+# --- Artefak Vectorizer Ringkas (Memory-Mappable) ---
+# Pengganti tfidf_vectorizer.pkl. Vocabulary disimpan sebagai string terurut (satu blok byte UTF-8 + offset)
+# dan IDF sebagai array float64 datar dalam satu file biner. File dibuka dengan np.memmap sehingga halaman
+# memorinya dibagi oleh semua proses (page cache OS), dan transformasi teks tidak membutuhkan scikit-learn.
+#
+# Tata letak file (little-endian):
+#   magic (8 byte) | versi (uint32) | panjang header (uint32) | header JSON (dipad ke kelipatan 8)
+#   offsets uint64[n_terms + 1] | idf float64[n_terms] | vocabulary bytes (UTF-8, terurut)
+import os
+import re
+import json
+import bisect
+import struct
+import logging
+import threading
+from collections import Counter
+import numpy as np
+import scipy.sparse as sp
+
+logger = logging.getLogger(__name__)
+
+VECTORIZER_ARTIFACT_PATH = 'tfidf_vectorizer.bin'
+ARTIFACT_MAGIC = b'TFIDFVA\x00'
+ARTIFACT_VERSION = 1
+_PREFIX = struct.Struct('<8sII')
+
+def _pad8(length):
+    return (-length) % 8
+
+def save_vectorizer_artifact(vectorizer, path=VECTORIZER_ARTIFACT_PATH):
+    """
+    Menulis TfidfVectorizer yang sudah di-fit ke format artefak ringkas.
+    Hanya konfigurasi analyzer 'word' bawaan yang didukung karena loader menirukan tokenisasinya tanpa scikit-learn.
+    """
+    if vectorizer.analyzer != 'word' or vectorizer.tokenizer is not None or vectorizer.preprocessor is not None:
+        raise ValueError("Artefak vectorizer hanya mendukung analyzer 'word' tanpa tokenizer/preprocessor kustom.")
+    if vectorizer.stop_words is not None or vectorizer.strip_accents is not None:
+        raise ValueError("Artefak vectorizer tidak mendukung stop_words atau strip_accents.")
+
+    # scikit-learn memberi nomor kolom sesuai urutan term terurut; urutan byte UTF-8 sama dengan urutan code point,
+    # sehingga posisi term pada blok byte terurut juga merupakan nomor kolomnya.
+    terms = sorted(vectorizer.vocabulary_, key=vectorizer.vocabulary_.get)
+    if terms != sorted(terms):
+        raise ValueError("Nomor kolom vocabulary tidak sesuai urutan term.")
+    encoded = [term.encode('utf-8') for term in terms]
+    offsets = np.zeros(len(encoded) + 1, dtype='<u8')
+    offsets[1:] = np.cumsum([len(term) for term in encoded])
+    idf = np.asarray(vectorizer.idf_, dtype='<f8')
+
+    header = json.dumps({
+        'n_terms': len(terms),
+        'ngram_range': list(vectorizer.ngram_range),
+        'lowercase': bool(vectorizer.lowercase),
+        'token_pattern': vectorizer.token_pattern,
+        'norm': vectorizer.norm,
+        'sublinear_tf': bool(vectorizer.sublinear_tf),
+        'binary': bool(vectorizer.binary)
+    }).encode('utf-8')
+    header += b' ' * _pad8(_PREFIX.size + len(header))
+
+    # Ditulis ke file sementara lalu diganti secara atomik agar proses lain tidak memetakan file setengah jadi.
+    # Pemetaan lama di proses ini dilepas lebih dulu karena Windows menolak mengganti file yang sedang di-mmap.
+    _loaded.pop(path, None)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(_PREFIX.pack(ARTIFACT_MAGIC, ARTIFACT_VERSION, len(header)))
+        f.write(header)
+        f.write(offsets.tobytes())
+        f.write(idf.tobytes())
+        f.write(b''.join(encoded))
+    os.replace(tmp_path, path)
+    logger.info(f"Artefak vectorizer disimpan: {path} ({len(terms)} term, {os.path.getsize(path)} byte).")
+
+class _SortedTerms:
+    """Tampilan urutan term di atas blok byte mmap, cukup untuk bisect tanpa membuat list string."""
+    def __init__(self, offsets, blob):
+        self._offsets = offsets
+        self._blob = blob
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        return self._blob[self._offsets[i]:self._offsets[i + 1]].tobytes()
+
+class VectorizerArtifact:
+    """Vectorizer TF-IDF read-only yang dimuat dari artefak ringkas."""
+    def __init__(self, path=VECTORIZER_ARTIFACT_PATH):
+        self.path = path
+        raw = np.memmap(path, dtype=np.uint8, mode='r')
+        magic, version, header_length = _PREFIX.unpack(raw[:_PREFIX.size].tobytes())
+        if magic != ARTIFACT_MAGIC or version != ARTIFACT_VERSION:
+            raise ValueError(f"'{path}' bukan artefak vectorizer versi {ARTIFACT_VERSION}.")
+        position = _PREFIX.size
+        self.params = json.loads(raw[position:position + header_length].tobytes())
+        position += header_length
+
+        n_terms = self.params['n_terms']
+        self.offsets = raw[position:position + 8 * (n_terms + 1)].view('<u8')
+        position += 8 * (n_terms + 1)
+        self.idf_ = raw[position:position + 8 * n_terms].view('<f8')
+        position += 8 * n_terms
+        self._terms = _SortedTerms(self.offsets, raw[position:])
+
+        self.ngram_range = tuple(self.params['ngram_range'])
+        self._token_pattern = re.compile(self.params['token_pattern'])
+
+    def __len__(self):
+        return len(self._terms)
+
+    def get_feature_names_out(self):
+        return np.array([self._terms[i].decode('utf-8') for i in range(len(self._terms))], dtype=object)
+
+    def lookup(self, term):
+        """Nomor kolom untuk satu term, atau None jika term tidak ada di vocabulary (binary search)."""
+        key = term.encode('utf-8')
+        index = bisect.bisect_left(self._terms, key)
+        if index < len(self._terms) and self._terms[index] == key:
+            return index
+        return None
+
+    def analyze(self, text):
+        """Tokenisasi + n-gram dengan aturan yang sama seperti analyzer 'word' scikit-learn."""
+        if self.params['lowercase']:
+            text = text.lower()
+        tokens = self._token_pattern.findall(text)
+        min_n, max_n = self.ngram_range
+        if max_n == 1:
+            return tokens
+        grams = list(tokens) if min_n == 1 else []
+        for n in range(max(min_n, 2), max_n + 1):
+            grams.extend(' '.join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+        return grams
+
+    def transform(self, texts):
+        """Mengubah list teks menjadi matriks TF-IDF CSR (sama dengan TfidfVectorizer.transform)."""
+        indptr = [0]
+        indices = []
+        data = []
+        for text in texts:
+            counts = Counter()
+            for gram in self.analyze(text if isinstance(text, str) else ''):
+                column = self.lookup(gram)
+                if column is not None:
+                    counts[column] += 1
+            columns = sorted(counts)
+            indices.extend(columns)
+            data.extend(counts[column] for column in columns)
+            indptr.append(len(indices))
+
+        data = np.asarray(data, dtype=np.float64)
+        indices = np.asarray(indices, dtype=np.int32)
+        if self.params['binary']:
+            data[:] = 1.0
+        elif self.params['sublinear_tf']:
+            np.log(data, out=data)
+            data += 1
+        data *= self.idf_[indices]
+        X = sp.csr_matrix((data, indices, np.asarray(indptr, dtype=np.int32)), shape=(len(indptr) - 1, len(self)))
+
+        norm = self.params['norm']
+        if norm:
+            if norm == 'l2':
+                row_norms = np.sqrt(np.asarray(X.multiply(X).sum(axis=1)).ravel())
+            else:
+                row_norms = np.asarray(abs(X).sum(axis=1)).ravel()
+            row_norms[row_norms == 0] = 1.0
+            X.data /= np.repeat(row_norms, np.diff(X.indptr))
+        return X
+
+_loaded = {}
+_lock = threading.Lock()
+
+def load_vectorizer_artifact(path=VECTORIZER_ARTIFACT_PATH):
+    """Memuat artefak (dipakai ulang selama file tidak berubah); memetakan ulang file jika mtime berubah."""
+    mtime = os.stat(path).st_mtime_ns
+    cached = _loaded.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    with _lock:
+        cached = _loaded.get(path)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, VectorizerArtifact(path))
+            _loaded[path] = cached
+        return cached[1]
+
+
+# Blok ini membandingkan waktu muat dan RSS artefak ringkas dengan tfidf_vectorizer.pkl.
+# Setiap pengukuran dijalankan di interpreter baru sebelum proses ini memuat scikit-learn atau vectorizer pickle,
+# dan puncak memori dibaca dari VmHWM (/proc/self/status) milik proses pengukur sendiri. ru_maxrss tidak dipakai
+# karena nilainya ikut terwarisi dari proses induk sehingga kedua loader tampak sama besar.
+if __name__ == '__main__':
+    import pickle
+    import subprocess
+    import sys
+
+    legacy_path = 'tfidf_vectorizer.pkl'
+    if not os.path.exists(legacy_path):
+        raise SystemExit(f"'{legacy_path}' tidak ditemukan; jalankan ekstraksi fitur terlebih dahulu.")
+    bench_path = 'tfidf_vectorizer.bench.bin'
+    # Artefak dibuat di proses terpisah agar proses ini belum memuat scikit-learn saat pengukuran.
+    subprocess.run([sys.executable, '-c', (
+        "import pickle\n"
+        "from vectorizer_artifact import save_vectorizer_artifact\n"
+        f"save_vectorizer_artifact(pickle.load(open({legacy_path!r}, 'rb')), {bench_path!r})\n"
+    )], check=True)
+
+    probe = (
+        "import time\n"
+        "start = time.perf_counter()\n"
+        "{load}\n"
+        "elapsed = time.perf_counter() - start\n"
+        "try:\n"
+        "    with open('/proc/self/status') as f:\n"
+        "        peak_kb = next(int(line.split()[1]) for line in f if line.startswith('VmHWM:'))\n"
+        "except OSError:\n"
+        "    import resource\n"
+        "    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss\n"
+        "print(elapsed, peak_kb)\n"
+    )
+    loaders = {
+        'pickle (scikit-learn)': f"import pickle\nv = pickle.load(open({legacy_path!r}, 'rb'))\nv.transform(['aplikasi bagus'])",
+        'artefak mmap': f"from vectorizer_artifact import VectorizerArtifact\nv = VectorizerArtifact({bench_path!r})\nv.transform(['aplikasi bagus'])"
+    }
+    print(f"Ukuran file: pickle {os.path.getsize(legacy_path)} byte | artefak {os.path.getsize(bench_path)} byte")
+    for name, load in loaders.items():
+        runs = []
+        for _ in range(5):
+            output = subprocess.run([sys.executable, '-c', probe.format(load=load)], capture_output=True, text=True, check=True)
+            elapsed, peak_kb = output.stdout.split()
+            runs.append((float(elapsed), int(peak_kb)))
+        best_time = min(run[0] for run in runs)
+        rss_mb = min(run[1] for run in runs) / 1024
+        print(f"{name}: muat + transform {best_time * 1000:.1f} ms | RSS puncak {rss_mb:.1f} MB")
+
+    # Golden check (setelah pengukuran): hasil transform harus sama dengan scikit-learn.
+    with open(legacy_path, 'rb') as f:
+        legacy_vectorizer = pickle.load(f)
+    sample = ['aplikasi bagus sekali', 'harga mahal tidak bagus', '', 'kata yang tidak dikenal sama sekali']
+    expected = legacy_vectorizer.transform(sample)
+    actual = VectorizerArtifact(bench_path).transform(sample)
+    print(f"Selisih maksimum transform: {abs(expected - actual).max():.2e}")
+    os.remove(bench_path)